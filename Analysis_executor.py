@@ -1,7 +1,17 @@
 """
 Analysis Executor - Core Data Analysis Engine
 Created: February 9, 2026
-Last Updated: February 9, 2026
+Last Updated: October 18, 2026
+
+CHANGELOG:
+- October 18, 2026: Compact dtypes on load
+  * load_and_validate() reads through dataframe_loader.read_excel_compact().
+    Department, building and employee columns become category, text dates
+    are parsed, and small integers become int32. The memory before/after
+    is printed.
+  * Groupbys on those columns pass observed=True. After a department
+    filter, employees and buildings from other departments would
+    otherwise come back as empty groups.
 
 This module performs the actual analysis calculations on labor data.
 It reads Excel files, calculates metrics, and prepares data for visualization.
@@ -18,6 +28,8 @@ import os
 from pathlib import Path
 import traceback
 
+from dataframe_loader import read_excel_compact
+
 
 class LaborDataAnalyzer:
     """
@@ -58,8 +70,8 @@ class LaborDataAnalyzer:
             Dictionary with validation results and file info
         """
         try:
-            # Read Excel file
-            self.df = pd.read_excel(self.file_path)
+            # Read Excel file (compact dtypes: category, datetime, int32)
+            self.df = read_excel_compact(self.file_path)
             
             # Detect column names (flexible matching)
             self._detect_columns()
@@ -215,7 +227,7 @@ class LaborDataAnalyzer:
         weekly_ot['OT_Pct'] = (weekly_ot[self.ot_column] / weekly_ot[self.total_column] * 100).round(1)
         
         # Employees with high OT
-        emp_ot = df.groupby(self.emp_column).agg({
+        emp_ot = df.groupby(self.emp_column, observed=True).agg({
             self.total_column: 'sum',
             self.ot_column: 'sum'
         })
@@ -233,10 +245,10 @@ class LaborDataAnalyzer:
     def _analyze_headcount(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze headcount patterns"""
         # Daily headcount
-        daily_hc = df.groupby(self.date_column)[self.emp_column].nunique()
+        daily_hc = df.groupby(self.date_column, observed=True)[self.emp_column].nunique()
         
         # Average hours per employee
-        emp_hours = df.groupby(self.emp_column)[self.total_column].sum()
+        emp_hours = df.groupby(self.emp_column, observed=True)[self.total_column].sum()
         
         return {
             'avg_daily_headcount': round(daily_hc.mean(), 0),
@@ -270,7 +282,7 @@ class LaborDataAnalyzer:
         if self.bldg_column not in df.columns:
             return None
         
-        bldg_summary = df.groupby(self.bldg_column).agg({
+        bldg_summary = df.groupby(self.bldg_column, observed=True).agg({
             self.emp_column: 'nunique',
             self.total_column: 'sum',
             self.ot_column: 'sum'
@@ -287,7 +299,7 @@ class LaborDataAnalyzer:
     
     def _analyze_employee_distribution(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze employee work patterns"""
-        emp_summary = df.groupby(self.emp_column).agg({
+        emp_summary = df.groupby(self.emp_column, observed=True).agg({
             self.total_column: 'sum',
             self.date_column: 'count'  # Days worked
         })
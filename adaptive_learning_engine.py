@@ -1,7 +1,27 @@
 """
 ADAPTIVE LEARNING ENGINE - Phase 1
 Created: February 2, 2026
-Last Updated: February 2, 2026
+Last Updated: October 18, 2026 - INCREMENTAL SQL-AGGREGATE LEARNING CYCLES
+
+CHANGELOG:
+
+- October 18, 2026: INCREMENTAL SQL-AGGREGATE LEARNING CYCLES
+  PROBLEM: run_learning_cycle() loaded every unlearned outcome row of the
+    last 30 days into Python dicts (a full scan of outcome_tracking), and
+    each of the five _analyze_* passes re-grouped the same list with nested
+    defaultdicts and statistics.mean. mark_outcomes_learned() then sent all
+    of their ids in one IN (...) list.
+  FIX: One GROUP BY over outcome_tracking returns count and score sum per
+    (task_type, ai_used, consensus, escalation, KB, specialist) combination.
+    All five analyses read that small OutcomeAggregate. A watermark in
+    learning_watermarks holds the last outcome id a cycle learned from, so
+    the next cycle only reads ids above it through the primary key. The
+    learned range is marked with a single ranged UPDATE. A cycle costs
+    O(new outcomes) however long the history grows.
+  Pattern thresholds, confidences and descriptions are unchanged.
+  analyze_patterns(outcomes) still accepts a list of outcome dicts.
+  record_outcome() also feeds each new outcome to task_sequence_model.py
+    (next-task n-gram counts) in the same transaction.
 
 This module implements true learning loops for the AI Swarm Orchestrator.
 It tracks task outcomes, identifies patterns, and automatically adjusts
@@ -23,7 +43,70 @@ import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
-import statistics
+
+from task_sequence_model import OUTCOME_SEQUENCES, fetch_outcome_rows
+
+# Columns the pattern analyses group by, with the defaults the analyses
+# used for missing values
+GROUP_FIELDS = ('task_type', 'ai_used', 'consensus_enabled', 'escalated_to_opus',
+                'knowledge_base_used', 'specialist_used')
+FIELD_DEFAULTS = {'task_type': 'general', 'ai_used': 'unknown'}
+DEFAULT_SUCCESS_SCORE = 0.5
+
+LEARNING_WATERMARK = 'learning_cycle'
+
+# SQLite's default limit on bound variables per statement is 999
+MAX_SQL_VARIABLES = 900
+
+
+class OutcomeAggregate:
+    """
+    Outcome counts and success-score sums per GROUP_FIELDS combination.
+    Built by one SQL GROUP BY (OutcomeTracker.aggregate_new_outcomes) or from
+    a list of outcome dicts (from_outcomes).
+    """
+
+    def __init__(self, groups=None, first_id=0, last_id=0, cutoff=None):
+        # {(task_type, ai_used, consensus, escalated, kb, specialist): [count, score_sum]}
+        self.groups = groups or {}
+        self.first_id = first_id    # exclusive
+        self.last_id = last_id      # inclusive
+        self.cutoff = cutoff        # created_at lower bound (isoformat)
+
+    @classmethod
+    def from_outcomes(cls, outcomes: List[Dict]) -> 'OutcomeAggregate':
+        groups = defaultdict(lambda: [0, 0.0])
+        for outcome in outcomes:
+            key = tuple(outcome.get(field, FIELD_DEFAULTS.get(field)) for field in GROUP_FIELDS)
+            score = outcome.get('success_score', DEFAULT_SUCCESS_SCORE)
+            group = groups[key]
+            group[0] += 1
+            group[1] += DEFAULT_SUCCESS_SCORE if score is None else score
+        return cls(dict(groups))
+
+    @property
+    def count(self) -> int:
+        return sum(n for n, _ in self.groups.values())
+
+    def rollup(self, key, where=None) -> Dict[Any, Tuple[int, float]]:
+        """
+        {key(group): (count, mean success)} over the groups passing where.
+        key and where receive a dict of the group's GROUP_FIELDS values.
+        """
+        totals = defaultdict(lambda: [0, 0.0])
+        for values, (n, score_sum) in self.groups.items():
+            group = dict(zip(GROUP_FIELDS, values))
+            if where is not None and not where(group):
+                continue
+            total = totals[key(group)]
+            total[0] += n
+            total[1] += score_sum
+        return {k: (n, score_sum / n) for k, (n, score_sum) in totals.items()}
+
+    def split(self, field) -> Tuple[Tuple[int, float], Tuple[int, float]]:
+        """(count, mean) for outcomes with field truthy, and with it falsy"""
+        parts = self.rollup(lambda g: bool(g[field]))
+        return parts.get(True, (0, 0.0)), parts.get(False, (0, 0.0))
 
 
 class OutcomeTracker:
@@ -106,6 +189,15 @@ class OutcomeTracker:
             )
         ''')
         
+        # Last outcome id each incremental consumer has processed
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS learning_watermarks (
+                name TEXT PRIMARY KEY,
+                last_outcome_id INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         # Optimization history
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS optimization_history (
@@ -176,6 +268,18 @@ class OutcomeTracker:
         ))
         
         outcome_id = cursor.lastrowid
+        
+        # Extend the task-type n-gram counts in the same transaction, so
+        # predictions see this outcome immediately. The earlier history is
+        # counted by migration 14, never here.
+        try:
+            db.execute('SAVEPOINT task_sequences')
+            OUTCOME_SEQUENCES.update(db, fetch_outcome_rows, require_state=True)
+            db.execute('RELEASE task_sequences')
+        except Exception as e:
+            db.execute('ROLLBACK TO task_sequences')
+            print(f"⚠️ Task sequence update failed (non-critical): {e}")
+        
         db.commit()
         db.close()
         
@@ -258,13 +362,75 @@ class OutcomeTracker:
         db = sqlite3.connect(self.db_path)
         cursor = db.cursor()
         
-        placeholders = ','.join('?' * len(outcome_ids))
-        cursor.execute(f'''
+        for start in range(0, len(outcome_ids), MAX_SQL_VARIABLES):
+            chunk = outcome_ids[start:start + MAX_SQL_VARIABLES]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                UPDATE outcome_tracking
+                SET learned_from = 1
+                WHERE id IN ({placeholders})
+            ''', chunk)
+        
+        db.commit()
+        db.close()
+    
+    def get_watermark(self, name: str = LEARNING_WATERMARK) -> int:
+        """Last outcome id already processed by the named consumer"""
+        db = sqlite3.connect(self.db_path)
+        row = db.execute('SELECT last_outcome_id FROM learning_watermarks WHERE name = ?',
+                         (name,)).fetchone()
+        db.close()
+        return row[0] if row else 0
+    
+    def aggregate_new_outcomes(self, days_back: int = 30,
+                               name: str = LEARNING_WATERMARK) -> OutcomeAggregate:
+        """
+        Aggregate the unlearned outcomes above the watermark in one GROUP BY.
+        
+        Only ids in (watermark, current max id] are read, by primary-key
+        range, so the cost follows the number of new outcomes rather than
+        the size of outcome_tracking.
+        """
+        first_id = self.get_watermark(name)
+        cutoff = (datetime.now() - timedelta(days=days_back)).isoformat()
+        
+        db = sqlite3.connect(self.db_path)
+        last_id = db.execute('SELECT COALESCE(MAX(id), 0) FROM outcome_tracking').fetchone()[0]
+        rows = db.execute(f'''
+            SELECT {', '.join(GROUP_FIELDS)},
+                   COUNT(*), SUM(COALESCE(success_score, ?))
+            FROM outcome_tracking
+            WHERE id > ? AND id <= ?
+            AND learned_from = 0
+            AND created_at >= ?
+            GROUP BY {', '.join(GROUP_FIELDS)}
+        ''', (DEFAULT_SUCCESS_SCORE, first_id, last_id, cutoff)).fetchall()
+        db.close()
+        
+        groups = {tuple(row[:len(GROUP_FIELDS)]): [row[-2], row[-1]] for row in rows}
+        return OutcomeAggregate(groups, first_id=first_id, last_id=last_id, cutoff=cutoff)
+    
+    def mark_aggregate_learned(self, aggregate: OutcomeAggregate, name: str = LEARNING_WATERMARK):
+        """
+        Mark the outcomes counted in aggregate as learned and move the
+        watermark to its last id. Outcomes in that range that were too old
+        for the cycle are passed over, as they could never qualify later.
+        """
+        db = sqlite3.connect(self.db_path)
+        db.execute('''
             UPDATE outcome_tracking
             SET learned_from = 1
-            WHERE id IN ({placeholders})
-        ''', outcome_ids)
-        
+            WHERE id > ? AND id <= ?
+            AND learned_from = 0
+            AND created_at >= ?
+        ''', (aggregate.first_id, aggregate.last_id, aggregate.cutoff))
+        db.execute('''
+            INSERT INTO learning_watermarks (name, last_outcome_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(name) DO UPDATE SET
+                last_outcome_id = excluded.last_outcome_id,
+                updated_at = excluded.updated_at
+        ''', (name, aggregate.last_id))
         db.commit()
         db.close()
 
@@ -287,57 +453,49 @@ class PatternRecognizer:
         Returns:
             List of discovered patterns with confidence scores
         """
-        if len(outcomes) < self.min_observations:
+        return self.analyze_aggregate(OutcomeAggregate.from_outcomes(outcomes))
+    
+    def analyze_aggregate(self, aggregate: OutcomeAggregate) -> List[Dict[str, Any]]:
+        """Same as analyze_patterns(), from pre-aggregated outcomes"""
+        if aggregate.count < self.min_observations:
             return []
         
         patterns = []
         
         # Pattern 1: Which AI works best for which task types?
-        ai_performance_patterns = self._analyze_ai_performance(outcomes)
-        patterns.extend(ai_performance_patterns)
+        patterns.extend(self._analyze_ai_performance(aggregate))
         
         # Pattern 2: Does consensus actually improve results?
-        consensus_patterns = self._analyze_consensus_value(outcomes)
-        patterns.extend(consensus_patterns)
+        patterns.extend(self._analyze_consensus_value(aggregate))
         
         # Pattern 3: When should we escalate to Opus?
-        escalation_patterns = self._analyze_escalation_effectiveness(outcomes)
-        patterns.extend(escalation_patterns)
+        patterns.extend(self._analyze_escalation_effectiveness(aggregate))
         
         # Pattern 4: Does knowledge base usage correlate with success?
-        kb_patterns = self._analyze_kb_correlation(outcomes)
-        patterns.extend(kb_patterns)
+        patterns.extend(self._analyze_kb_correlation(aggregate))
         
         # Pattern 5: Specialist effectiveness
-        specialist_patterns = self._analyze_specialist_performance(outcomes)
-        patterns.extend(specialist_patterns)
+        patterns.extend(self._analyze_specialist_performance(aggregate))
         
         return patterns
     
-    def _analyze_ai_performance(self, outcomes: List[Dict]) -> List[Dict]:
+    def _analyze_ai_performance(self, aggregate: OutcomeAggregate) -> List[Dict]:
         """Analyze which AI performs best for different task types"""
         patterns = []
         
         # Group by task_type and ai_used
-        performance_by_type = defaultdict(lambda: defaultdict(list))
-        
-        for outcome in outcomes:
-            task_type = outcome.get('task_type', 'general')
-            ai_used = outcome.get('ai_used', 'unknown')
-            success_score = outcome.get('success_score', 0.5)
-            
-            performance_by_type[task_type][ai_used].append(success_score)
+        performance_by_type = defaultdict(dict)
+        for (task_type, ai_used), stats in aggregate.rollup(
+                lambda g: (g['task_type'], g['ai_used'])).items():
+            performance_by_type[task_type][ai_used] = stats
         
         # Analyze each task type
-        for task_type, ai_scores in performance_by_type.items():
-            if len(ai_scores) < 2:  # Need multiple AIs to compare
+        for task_type, ai_stats in performance_by_type.items():
+            if len(ai_stats) < 2:  # Need multiple AIs to compare
                 continue
             
-            # Calculate average performance for each AI
-            ai_averages = {}
-            for ai, scores in ai_scores.items():
-                if len(scores) >= 3:  # Need at least 3 observations
-                    ai_averages[ai] = statistics.mean(scores)
+            # Average performance for each AI with at least 3 observations
+            ai_averages = {ai: mean for ai, (n, mean) in ai_stats.items() if n >= 3}
             
             if len(ai_averages) >= 2:
                 # Find best performer
@@ -355,7 +513,7 @@ class PatternRecognizer:
                         'description': f'For {task_type} tasks, {best_ai[0]} outperforms {worst_ai[0]} by {performance_diff*100:.1f}%',
                         'recommendation': f'Route {task_type} tasks to {best_ai[0]}',
                         'confidence': confidence,
-                        'evidence_count': len(ai_scores[best_ai[0]]),
+                        'evidence_count': ai_stats[best_ai[0]][0],
                         'metadata': {
                             'task_type': task_type,
                             'best_ai': best_ai[0],
@@ -367,17 +525,13 @@ class PatternRecognizer:
         
         return patterns
     
-    def _analyze_consensus_value(self, outcomes: List[Dict]) -> List[Dict]:
+    def _analyze_consensus_value(self, aggregate: OutcomeAggregate) -> List[Dict]:
         """Analyze whether consensus validation actually improves results"""
         patterns = []
         
-        with_consensus = [o for o in outcomes if o.get('consensus_enabled')]
-        without_consensus = [o for o in outcomes if not o.get('consensus_enabled')]
+        (with_count, avg_with), (without_count, avg_without) = aggregate.split('consensus_enabled')
         
-        if len(with_consensus) >= 10 and len(without_consensus) >= 10:
-            avg_with = statistics.mean([o.get('success_score', 0.5) for o in with_consensus])
-            avg_without = statistics.mean([o.get('success_score', 0.5) for o in without_consensus])
-            
+        if with_count >= 10 and without_count >= 10:
             difference = avg_with - avg_without
             
             if abs(difference) > 0.05:  # 5% difference threshold
@@ -395,7 +549,7 @@ class PatternRecognizer:
                     'description': description,
                     'recommendation': recommendation,
                     'confidence': confidence,
-                    'evidence_count': len(with_consensus) + len(without_consensus),
+                    'evidence_count': with_count + without_count,
                     'metadata': {
                         'avg_with_consensus': avg_with,
                         'avg_without_consensus': avg_without,
@@ -405,19 +559,13 @@ class PatternRecognizer:
         
         return patterns
     
-    def _analyze_escalation_effectiveness(self, outcomes: List[Dict]) -> List[Dict]:
+    def _analyze_escalation_effectiveness(self, aggregate: OutcomeAggregate) -> List[Dict]:
         """Analyze when escalation to Opus is worth it"""
         patterns = []
         
-        escalated = [o for o in outcomes if o.get('escalated_to_opus')]
-        not_escalated = [o for o in outcomes if not o.get('escalated_to_opus')]
+        (escalated_count, avg_escalated), _ = aggregate.split('escalated_to_opus')
         
-        if len(escalated) >= 5:  # Need decent sample
-            avg_escalated = statistics.mean([o.get('success_score', 0.5) for o in escalated])
-            
-            # What kinds of tasks were escalated?
-            escalated_contexts = [json.loads(o.get('task_context', '{}')) for o in escalated]
-            
+        if escalated_count >= 5:  # Need decent sample
             # If escalated tasks have high success, escalation is working
             if avg_escalated > 0.75:
                 patterns.append({
@@ -425,26 +573,22 @@ class PatternRecognizer:
                     'description': f'Escalation to Opus achieves {avg_escalated*100:.1f}% success rate',
                     'recommendation': 'Current escalation criteria working well',
                     'confidence': 0.80,
-                    'evidence_count': len(escalated),
+                    'evidence_count': escalated_count,
                     'metadata': {
                         'avg_success': avg_escalated,
-                        'escalation_count': len(escalated)
+                        'escalation_count': escalated_count
                     }
                 })
         
         return patterns
     
-    def _analyze_kb_correlation(self, outcomes: List[Dict]) -> List[Dict]:
+    def _analyze_kb_correlation(self, aggregate: OutcomeAggregate) -> List[Dict]:
         """Analyze knowledge base usage correlation with success"""
         patterns = []
         
-        with_kb = [o for o in outcomes if o.get('knowledge_base_used')]
-        without_kb = [o for o in outcomes if not o.get('knowledge_base_used')]
+        (with_kb_count, avg_with_kb), (without_kb_count, avg_without_kb) = aggregate.split('knowledge_base_used')
         
-        if len(with_kb) >= 10 and len(without_kb) >= 10:
-            avg_with_kb = statistics.mean([o.get('success_score', 0.5) for o in with_kb])
-            avg_without_kb = statistics.mean([o.get('success_score', 0.5) for o in without_kb])
-            
+        if with_kb_count >= 10 and without_kb_count >= 10:
             difference = avg_with_kb - avg_without_kb
             
             if difference > 0.10:  # 10% improvement
@@ -453,7 +597,7 @@ class PatternRecognizer:
                     'description': f'Knowledge base usage improves outcomes by {difference*100:.1f}%',
                     'recommendation': 'Increase knowledge base usage in routing logic',
                     'confidence': 0.85,
-                    'evidence_count': len(with_kb) + len(without_kb),
+                    'evidence_count': with_kb_count + without_kb_count,
                     'metadata': {
                         'avg_with_kb': avg_with_kb,
                         'avg_without_kb': avg_without_kb,
@@ -463,35 +607,27 @@ class PatternRecognizer:
         
         return patterns
     
-    def _analyze_specialist_performance(self, outcomes: List[Dict]) -> List[Dict]:
+    def _analyze_specialist_performance(self, aggregate: OutcomeAggregate) -> List[Dict]:
         """Analyze which specialists perform well"""
         patterns = []
         
-        specialist_outcomes = [o for o in outcomes if o.get('specialist_used')]
+        by_specialist = aggregate.rollup(lambda g: g['specialist_used'],
+                                         where=lambda g: g['specialist_used'])
         
-        if len(specialist_outcomes) >= 10:
-            by_specialist = defaultdict(list)
-            
-            for outcome in specialist_outcomes:
-                specialist = outcome.get('specialist_used')
-                success = outcome.get('success_score', 0.5)
-                by_specialist[specialist].append(success)
-            
-            for specialist, scores in by_specialist.items():
-                if len(scores) >= 5:
-                    avg_score = statistics.mean(scores)
-                    
+        if sum(n for n, _ in by_specialist.values()) >= 10:
+            for specialist, (usage_count, avg_score) in by_specialist.items():
+                if usage_count >= 5:
                     if avg_score > 0.75:
                         patterns.append({
                             'type': 'specialist_performance',
                             'description': f'{specialist} specialist achieves {avg_score*100:.1f}% success rate',
                             'recommendation': f'Continue using {specialist} for appropriate tasks',
                             'confidence': 0.80,
-                            'evidence_count': len(scores),
+                            'evidence_count': usage_count,
                             'metadata': {
                                 'specialist': specialist,
                                 'avg_success': avg_score,
-                                'usage_count': len(scores)
+                                'usage_count': usage_count
                             }
                         })
                     elif avg_score < 0.50:
@@ -500,11 +636,11 @@ class PatternRecognizer:
                             'description': f'{specialist} specialist only achieves {avg_score*100:.1f}% success rate',
                             'recommendation': f'Review {specialist} usage - may need reconfiguration',
                             'confidence': 0.75,
-                            'evidence_count': len(scores),
+                            'evidence_count': usage_count,
                             'metadata': {
                                 'specialist': specialist,
                                 'avg_success': avg_score,
-                                'usage_count': len(scores)
+                                'usage_count': usage_count
                             }
                         })
         
@@ -715,7 +851,7 @@ class AdaptiveLearningEngine:
     def run_learning_cycle(self, min_observations: int = 10) -> Dict[str, Any]:
         """
         Run a complete learning cycle:
-        1. Gather recent outcomes
+        1. Aggregate the outcomes recorded since the last cycle
         2. Analyze for patterns
         3. Generate adjustment suggestions
         
@@ -727,22 +863,23 @@ class AdaptiveLearningEngine:
         """
         print(f"🧠 Starting learning cycle...")
         
-        # Step 1: Gather outcomes
-        outcomes = self.outcome_tracker.get_outcomes_for_analysis(min_observations)
+        # Step 1: Aggregate outcomes above the watermark (one GROUP BY)
+        aggregate = self.outcome_tracker.aggregate_new_outcomes()
+        outcome_count = aggregate.count
         
-        if len(outcomes) < min_observations:
+        if outcome_count < min_observations:
             return {
                 'status': 'insufficient_data',
-                'outcomes_available': len(outcomes),
+                'outcomes_available': outcome_count,
                 'outcomes_needed': min_observations,
                 'patterns_found': [],
                 'adjustments_suggested': []
             }
         
-        print(f"📊 Analyzing {len(outcomes)} outcomes...")
+        print(f"📊 Analyzing {outcome_count} outcomes...")
         
         # Step 2: Recognize patterns
-        patterns = self.pattern_recognizer.analyze_patterns(outcomes)
+        patterns = self.pattern_recognizer.analyze_aggregate(aggregate)
         high_confidence = [p for p in patterns if p['confidence'] >= 0.75]
         
         print(f"🔍 Found {len(patterns)} patterns ({len(high_confidence)} high-confidence)")
@@ -762,13 +899,12 @@ class AdaptiveLearningEngine:
             adj_id = self.behavior_modifier.log_adjustment(suggestion)
             suggestion_ids.append(adj_id)
         
-        # Step 6: Mark outcomes as learned
-        outcome_ids = [o['id'] for o in outcomes]
-        self.outcome_tracker.mark_outcomes_learned(outcome_ids)
+        # Step 6: Mark outcomes as learned and advance the watermark
+        self.outcome_tracker.mark_aggregate_learned(aggregate)
         
         return {
             'status': 'success',
-            'outcomes_analyzed': len(outcomes),
+            'outcomes_analyzed': outcome_count,
             'patterns_found': len(patterns),
             'high_confidence_patterns': len(high_confidence),
             'adjustments_suggested': len(suggestions),
@@ -19,11 +19,14 @@ import sqlite3
 import os
 
 
-def add_blog_posts_table():
+def add_blog_posts_table(conn=None):
     """
     Create the blog_posts table with SEO fields if it doesn't exist.
     If table exists but is missing SEO columns, add them.
     Safe to run multiple times.
+
+    When conn is given (schema_migrations), the caller's transaction is used
+    and errors are raised instead of returning False.
     """
     
     # Import DATABASE from config to use the SAME path as the app
@@ -31,8 +34,10 @@ def add_blog_posts_table():
     
     print(f"📊 Blog Posts Migration: Checking {DATABASE}...")
     
+    own_conn = conn is None
     try:
-        conn = sqlite3.connect(DATABASE)
+        if own_conn:
+            conn = sqlite3.connect(DATABASE)
         cursor = conn.cursor()
         
         # Check if table exists
@@ -77,7 +82,8 @@ def add_blog_posts_table():
                 ON blog_posts(url_slug)
             ''')
             
-            conn.commit()
+            if own_conn:
+                conn.commit()
             print("✅ blog_posts table created with SEO fields")
             print("   Columns: id, topic, topic_display, title, url_slug, meta_description, content, angle, created_at, updated_at")
             
@@ -123,17 +129,21 @@ def add_blog_posts_table():
                     CREATE INDEX IF NOT EXISTS idx_blog_posts_slug
                     ON blog_posts(url_slug)
                 ''')
-                conn.commit()
+                if own_conn:
+                    conn.commit()
                 print("✅ blog_posts table updated with SEO columns")
             else:
                 print("✅ blog_posts table already has all SEO columns")
         
         print("✅ Blog Posts table migration complete!")
-        conn.close()
+        if own_conn:
+            conn.close()
         return True
         
     except Exception as e:
         print(f"❌ Error with blog_posts migration: {e}")
+        if not own_conn:
+            raise
         import traceback
         print(traceback.format_exc())
         return False
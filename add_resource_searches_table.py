@@ -7,9 +7,11 @@ Adds resource_searches table to track proactive web searches.
 
 from database import get_db
 
-def add_resource_searches_table():
+def add_resource_searches_table(db=None):
     """Add resource_searches table for tracking proactive searches"""
-    db = get_db()
+    own_db = db is None
+    if own_db:
+        db = get_db()
     
     try:
         # Create resource_searches table
@@ -36,14 +38,18 @@ def add_resource_searches_table():
             ON resource_searches(searched_at)
         ''')
         
-        db.commit()
+        if own_db:
+            db.commit()
         print("✅ resource_searches table created!")
         
     except Exception as e:
         print(f"Error creating table: {e}")
+        if not own_db:
+            raise
         db.rollback()
     finally:
-        db.close()
+        if own_db:
+            db.close()
 
 if __name__ == '__main__':
     add_resource_searches_table()
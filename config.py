@@ -1,9 +1,27 @@
 """
 AI SWARM ORCHESTRATOR - Configuration
 Created: January 18, 2026
-Last Updated: January 31, 2026 - FIXED DATABASE PATH FOR PERSISTENCE
+Last Updated: October 18, 2026 - ADDED DATAFRAME_CACHE_DIR
 
 CHANGES IN THIS VERSION:
+- October 18, 2026: ADDED DATAFRAME_CACHE_DIR
+  * Private directory for dataframe_cache.py sidecars on the persistent
+    disk (was /tmp/dataframe_cache, which any local user could create first)
+  * Defaults to /mnt/project/dataframe_cache, override with DATAFRAME_CACHE_DIR
+
+- October 18, 2026: ADDED LAZY BLUEPRINT SETTINGS
+  * LAZY_BLUEPRINTS: defer blueprint module imports until first request
+  * EAGER_BLUEPRINTS: modules that are always imported at boot
+
+- October 18, 2026: ADDED CONTEXT TOKEN BUDGETS
+  * CONTEXT_TOKEN_BUDGETS: per-model token budget for the context blocks
+    orchestrate() packs into a prompt (see orchestration/context_packer.py)
+  * CONTEXT_HISTORY_TOKENS: budget for the conversation messages sent to the API
+
+- October 18, 2026: ADDED KB_INDEX_DIR
+  * Directory for the persisted knowledge index (manifest + data file)
+  * Defaults to /mnt/project/kb_index, override with KB_INDEX_DIR env var
+
 - January 31, 2026: FIXED DATABASE PATH FOR PERSISTENCE
   * Changed DATABASE from 'swarm_intelligence.db' (ephemeral) 
   * To '/mnt/project/swarm_intelligence.db' (persistent disk)
@@ -128,6 +146,16 @@ DEFAULT_MAX_TOKENS = 4000
 SONNET_MAX_TOKENS = 4000
 OPUS_MAX_TOKENS = 4000
 
+# Prompt context budgets (Added October 18, 2026)
+# Upper bound on the estimated tokens of context blocks (knowledge, learning,
+# history, project, files...) packed into one orchestrate() prompt.
+CONTEXT_TOKEN_BUDGETS = {
+    'sonnet': int(os.environ.get('CONTEXT_BUDGET_SONNET', 24000)),
+    'opus': int(os.environ.get('CONTEXT_BUDGET_OPUS', 32000)),
+    'default': 24000,
+}
+CONTEXT_HISTORY_TOKENS = int(os.environ.get('CONTEXT_HISTORY_TOKENS', 8000))
+
 # ============================================================================
 # ESCALATION THRESHOLDS
 # ============================================================================
@@ -158,6 +186,15 @@ KNOWLEDGE_BASE_PATHS = [
     "./project_files"
 ]
 
+# Persisted knowledge index (Added October 18, 2026)
+# Lives on the persistent disk so deploys and worker recycles reuse it and only
+# re-extract files whose contents changed. See knowledge_index_store.py.
+KB_INDEX_DIR = os.environ.get('KB_INDEX_DIR', '/mnt/project/kb_index')
+
+# Columnar sidecars of loaded workbooks (Added October 18, 2026)
+# Created mode 0700 and owner-checked before use. See dataframe_cache.py.
+DATAFRAME_CACHE_DIR = os.environ.get('DATAFRAME_CACHE_DIR', '/mnt/project/dataframe_cache')
+
 # ============================================================================
 # OPTIONAL INTEGRATIONS
 # ============================================================================
@@ -187,4 +224,23 @@ MAX_ALERTS_PER_CATEGORY = 5
 # Days to keep dismissed alerts before cleanup
 DISMISSED_ALERT_RETENTION_DAYS = 30
 
+# ============================================================================
+# BLUEPRINT LOADING (Added October 18, 2026)
+# ============================================================================
+
+# Register routes at boot but import blueprint modules on their first request
+# (see lazy_blueprints.py). Set LAZY_BLUEPRINTS=0 to import everything at boot.
+LAZY_BLUEPRINTS = os.environ.get('LAZY_BLUEPRINTS', '1') != '0'
+
+# Hot paths stay eager: with preload_app they are imported once in the
+# gunicorn master and shared by every forked worker.
+EAGER_BLUEPRINTS = [
+    'routes.core',
+    'routes.analysis',
+    'routes.survey',
+    'routes.orchestration_handler',
+    'routes.projects_bulletproof',
+    'routes.voice',
+]
+
 # I did no harm and this file is not truncated
@@ -1,74 +1,209 @@
 """
 Conversation Summarizer - Fix #6
 Created: February 4, 2026
-Updated: February 5, 2026 - Fixed IndentationError at line 26
+Updated: October 18, 2026 - Older multi-part summaries folded before they are pruned
 
 Compresses long conversations into key facts for context.
+
+CHANGELOG:
+- October 18, 2026: Older multi-part summaries folded before they are pruned
+  * Rows written before the rolling summaries (last_message_id 0) are
+    parts, each summarizing its own window. The next fold now passes all of
+    them to the AI together with the latest rolling summary, and deletes a
+    part only in the transaction that stores the summary it was folded into.
+    Previously the first fold after deploy pruned them unread.
+  * Pruning to KEEP_SUMMARY_ROWS counts rolling summaries only
+  * get_conversation_context() shows the parts not yet folded after the
+    rolling summary, as it did before the rolling summaries
+
+- October 18, 2026: Incremental rolling summaries in a background worker
+  * should_summarize() runs one COUNT(*) over messages newer than the last
+    summary instead of loading 100 rows
+  * summarize_conversation() folds only the messages after the previous
+    summary's message_range into that summary. It no longer re-summarizes
+    the last 100 messages truncated to 500 chars each.
+  * summarize_in_background() queues the check + fold on a single worker
+    thread, so orchestrate() returns its response without waiting for the
+    extra Sonnet call every tenth turn
+  * get_conversation_context() returns the latest rolling summary, which
+    already covers the whole conversation
+  * Schema: add_conversation_summaries_table.py (last_message_id column)
+
+- February 5, 2026: Fixed IndentationError at line 26
 """
 
 import json
-from datetime import datetime
-from database import get_db, get_messages
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from database import get_db
+
+SUMMARY_THRESHOLD = 10        # Fold after this many unsummarized messages
+MAX_MESSAGE_CHARS = 2000      # Per message, when building the fold prompt
+FOLD_CHAR_BUDGET = 24000      # New-message text per fold (~6k tokens)
+MAX_FOLD_MESSAGES = 200       # Rows read per fold
+KEEP_SUMMARY_ROWS = 2         # Latest rolling summary + the one before it
+CONTEXT_SUMMARY_PARTS = 3     # Unfolded older parts shown in the context
 
 
 class ConversationSummarizer:
     """Summarizes conversations for long-term context"""
-    
+
     def __init__(self):
-        self.summary_threshold = 10  # Summarize after 10 messages
-    
-    def should_summarize(self, conversation_id):
-        """Check if conversation needs summarization"""
-        messages = get_messages(conversation_id, limit=100)
-        
-        # Check if we have unsummarized messages
-        db = get_db()
-        last_summary = db.execute('''
-            SELECT message_range FROM conversation_summaries
+        self.summary_threshold = SUMMARY_THRESHOLD
+        self._columns = None
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._executor = None
+        self._executor_pid = None
+
+    # =========================================================================
+    # STATE
+    # =========================================================================
+
+    def _table_columns(self, db):
+        if self._columns is None:
+            rows = db.execute("PRAGMA table_info(conversation_summaries)").fetchall()
+            self._columns = set(row[1] for row in rows)
+        return self._columns
+
+    def _latest_summary(self, db, conversation_id):
+        return db.execute('''
+            SELECT * FROM conversation_summaries
             WHERE conversation_id = ?
-            ORDER BY created_at DESC
+            ORDER BY id DESC
             LIMIT 1
         ''', (conversation_id,)).fetchone()
-        db.close()
-        
-        if not last_summary:
-            return len(messages) >= self.summary_threshold
-        
-        # Check if enough new messages since last summary
-        last_range = last_summary['message_range']
-        last_msg_id = int(last_range.split('-')[-1]) if '-' in last_range else 0
-        
-        new_messages = [m for m in messages if m['id'] > last_msg_id]
-        return len(new_messages) >= self.summary_threshold
-    
+
+    def _fold_base(self, db, conversation_id):
+        """
+        (latest rolling summary or None, older parts not yet folded into one)
+
+        Rolling summaries set last_message_id; rows from before them leave it
+        at 0 and each covers only its own window, so they are all kept until
+        a fold has read them.
+        """
+        base = db.execute('''
+            SELECT * FROM conversation_summaries
+            WHERE conversation_id = ? AND last_message_id > 0
+            ORDER BY id DESC
+            LIMIT 1
+        ''', (conversation_id,)).fetchone()
+        parts = db.execute('''
+            SELECT * FROM conversation_summaries
+            WHERE conversation_id = ? AND COALESCE(last_message_id, 0) = 0
+            ORDER BY id
+        ''', (conversation_id,)).fetchall()
+        return base, parts
+
+    @staticmethod
+    def _summary_field(row, *names):
+        keys = row.keys()
+        for name in names:
+            if name in keys and row[name]:
+                return row[name]
+        return None
+
+    def _range_of(self, row):
+        """(first message id, last message id) covered by a summary row"""
+        if row is None:
+            return None, 0
+        first_id = None
+        last_id = self._summary_field(row, 'last_message_id') or 0
+        message_range = self._summary_field(row, 'message_range')
+        if message_range and '-' in message_range:
+            start, _, end = message_range.partition('-')
+            try:
+                first_id = int(start)
+                last_id = last_id or int(end)
+            except ValueError:
+                pass
+        return first_id, last_id
+
+    def count_unsummarized(self, conversation_id, db=None):
+        """Messages newer than the latest summary (index range count, no rows loaded)"""
+        own_db = db is None
+        if own_db:
+            db = get_db()
+        try:
+            _, last_id = self._range_of(self._latest_summary(db, conversation_id))
+            row = db.execute('''
+                SELECT COUNT(*) FROM conversation_messages
+                WHERE conversation_id = ? AND id > ?
+            ''', (conversation_id, last_id)).fetchone()
+            return row[0]
+        finally:
+            if own_db:
+                db.close()
+
+    def should_summarize(self, conversation_id):
+        """Check if conversation needs summarization"""
+        return self.count_unsummarized(conversation_id) >= self.summary_threshold
+
+    # =========================================================================
+    # FOLD
+    # =========================================================================
+
     def summarize_conversation(self, conversation_id, ai_summarize_func):
         """
-        Create summary of conversation.
-        
+        Fold messages newer than the last summary into it.
+
         Args:
             conversation_id: Conversation to summarize
             ai_summarize_func: AI function to generate summary
-            
+
         Returns:
             Summary dict
         """
-        messages = get_messages(conversation_id, limit=100)
-        
+        db = get_db()
+        try:
+            previous, parts = self._fold_base(db, conversation_id)
+            first_id, last_id = self._range_of(previous)
+            for part in parts:
+                part_first, part_last = self._range_of(part)
+                if part_first and (first_id is None or part_first < first_id):
+                    first_id = part_first
+                last_id = max(last_id, part_last)
+            messages = db.execute('''
+                SELECT id, role, content FROM conversation_messages
+                WHERE conversation_id = ? AND id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (conversation_id, last_id, MAX_FOLD_MESSAGES)).fetchall()
+        finally:
+            db.close()
+
         if not messages:
             return None
-        
-        # Build conversation text
-        conv_text = ""
+
+        # Oldest first, up to the budget; anything left over is folded next time
+        folded = []
+        used = 0
         for msg in messages:
             role = "User" if msg['role'] == 'user' else "Assistant"
-            content = msg['content'][:500]  # Truncate long messages
-            conv_text += f"{role}: {content}\n\n"
-        
-        # Generate summary using AI
-        summary_prompt = f"""Summarize this conversation into key facts:
+            content = msg['content'] or ''
+            if len(content) > MAX_MESSAGE_CHARS:
+                content = content[:MAX_MESSAGE_CHARS] + ' [...]'
+            line = f"{role}: {content}\n\n"
+            if folded and used + len(line) > FOLD_CHAR_BUDGET:
+                break
+            folded.append((msg['id'], line))
+            used += len(line)
+        conv_text = ''.join(line for _, line in folded)
+
+        previous_text, previous_entities = self._combine_summaries(previous, parts)
+
+        if previous_text:
+            summary_prompt = f"""Here is the running summary of this conversation so far:
+
+{previous_text}
+
+New messages since that summary:
 
 {conv_text}
 
+Update the running summary so it covers the whole conversation. Keep every point that is still relevant and fold in the new messages.
+
 Provide:
 1. Main topics discussed
 2. Decisions made (if any)
@@ -76,104 +211,209 @@ Provide:
 4. Next steps agreed upon
 
 Format as brief bullet points."""
-        
+        else:
+            summary_prompt = f"""Summarize this conversation into key facts:
+
+{conv_text}
+
+Provide:
+1. Main topics discussed
+2. Decisions made (if any)
+3. Important numbers/dates mentioned
+4. Next steps agreed upon
+
+Format as brief bullet points."""
+
         try:
             summary_result = ai_summarize_func(summary_prompt)
-            
+
             if isinstance(summary_result, dict):
                 summary_text = summary_result.get('content', '')
             else:
                 summary_text = str(summary_result)
-            
-            # Extract entities
-            entities = self._extract_entities(conv_text)
-            
-            # Store summary
+            if not summary_text:
+                return None
+
+            entities = dict(previous_entities)
+            entities.update(self._extract_entities(conv_text))
+
+            new_last_id = folded[-1][0]
+            values = {
+                'conversation_id': conversation_id,
+                'summary_text': summary_text,
+                'summary': summary_text,  # older table shape (NOT NULL there)
+                'key_decisions': json.dumps([]),
+                'mentioned_entities': json.dumps(entities),
+                'message_range': f"{first_id or folded[0][0]}-{new_last_id}",
+                'last_message_id': new_last_id,
+            }
+
             db = get_db()
-            
-            message_range = f"{messages[0]['id']}-{messages[-1]['id']}"
-            
-            db.execute('''
-                INSERT INTO conversation_summaries
-                (conversation_id, summary_text, key_decisions, mentioned_entities, message_range)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (conversation_id, summary_text, 
-                  json.dumps([]), 
-                  json.dumps(entities),
-                  message_range))
-            
-            db.commit()
-            db.close()
-            
+            try:
+                columns = [c for c in values if c in self._table_columns(db)]
+                db.execute(f'''
+                    INSERT INTO conversation_summaries ({', '.join(columns)})
+                    VALUES ({', '.join('?' for _ in columns)})
+                ''', [values[c] for c in columns])
+                # Each rolling row is a complete summary; older ones are redundant
+                db.execute('''
+                    DELETE FROM conversation_summaries
+                    WHERE conversation_id = ? AND last_message_id > 0 AND id NOT IN (
+                        SELECT id FROM conversation_summaries
+                        WHERE conversation_id = ? AND last_message_id > 0
+                        ORDER BY id DESC LIMIT ?
+                    )
+                ''', (conversation_id, conversation_id, KEEP_SUMMARY_ROWS))
+                # The parts read above are now in the new row; parts written
+                # since then stay for the next fold
+                if parts:
+                    db.execute(f'''
+                        DELETE FROM conversation_summaries
+                        WHERE id IN ({', '.join('?' for _ in parts)})
+                    ''', [part['id'] for part in parts])
+                db.commit()
+            finally:
+                db.close()
+
             return {
                 'summary': summary_text,
-                'entities': entities
+                'entities': entities,
+                'messages_folded': len(folded)
             }
         except Exception as e:
             print(f"⚠️ Summarization failed: {e}")
             return None
-    
+
+    def _combine_summaries(self, base, parts):
+        """Text and merged entities of a rolling summary plus older parts"""
+        sections = []
+        entities = {}
+        labelled = [(None, base)] if base is not None else []
+        labelled += [(f"Part {idx}:", part) for idx, part in enumerate(parts, 1)]
+        for label, row in labelled:
+            text = self._summary_field(row, 'summary_text', 'summary')
+            if text:
+                sections.append(f"{label}\n{text}" if label else text)
+            try:
+                entities.update(json.loads(self._summary_field(row, 'mentioned_entities') or '{}'))
+            except (TypeError, ValueError):
+                pass
+        return '\n\n'.join(sections) or None, entities
+
+    # =========================================================================
+    # BACKGROUND WORKER
+    # =========================================================================
+
+    def _get_executor(self):
+        # Threads do not survive fork - a gunicorn worker builds its own
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='conv-summarizer')
+            self._executor_pid = pid
+            self._in_flight = set()
+        return self._executor
+
+    def summarize_in_background(self, conversation_id, ai_summarize_func):
+        """
+        Queue a should_summarize() check and fold for after the response.
+
+        At most one job per conversation is queued at a time. Returns True
+        if a job was queued.
+        """
+        if not conversation_id:
+            return False
+        with self._lock:
+            executor = self._get_executor()
+            if conversation_id in self._in_flight:
+                return False
+            self._in_flight.add(conversation_id)
+        try:
+            executor.submit(self._background_fold, conversation_id, ai_summarize_func)
+            return True
+        except RuntimeError as e:  # interpreter shutting down
+            with self._lock:
+                self._in_flight.discard(conversation_id)
+            print(f"⚠️ Could not queue summarization: {e}")
+            return False
+
+    def _background_fold(self, conversation_id, ai_summarize_func):
+        try:
+            # Long backlogs fold in budget-sized chunks, oldest first
+            while self.should_summarize(conversation_id):
+                result = self.summarize_conversation(conversation_id, ai_summarize_func)
+                if not result:
+                    break
+                print(f"Conversation {conversation_id}: folded {result['messages_folded']} messages into summary")
+        except Exception as e:
+            print(f"⚠️ Background summarization failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(conversation_id)
+
+    # =========================================================================
+    # READ
+    # =========================================================================
+
     def get_conversation_context(self, conversation_id):
         """Get summarized context for a conversation"""
         try:
             db = get_db()
-            
-            summaries = db.execute('''
-                SELECT summary_text, mentioned_entities
-                FROM conversation_summaries
-                WHERE conversation_id = ?
-                ORDER BY created_at DESC
-                LIMIT 3
-            ''', (conversation_id,)).fetchall()
-            
-            db.close()
-            
-            if not summaries:
+            try:
+                summary, parts = self._fold_base(db, conversation_id)
+            finally:
+                db.close()
+
+            # Until the next fold, the newest older parts follow the rolling summary
+            summary_text, entities = self._combine_summaries(summary, parts[-CONTEXT_SUMMARY_PARTS:])
+            if not summary_text:
                 return ""
-            
+
             context = "\n\n=== CONVERSATION HISTORY SUMMARY ===\n"
-            
-            for idx, summary in enumerate(reversed(summaries), 1):
-                context += f"\nPart {idx}:\n{summary['summary_text']}\n"
-                
-                # Add entities
-                entities = json.loads(summary['mentioned_entities'])
-                if entities:
-                    context += f"Key details mentioned: "
-                    context += ", ".join([f"{k}: {v}" for k, v in entities.items()])
-                    context += "\n"
-            
+            context += f"\n{summary_text}\n"
+
+            # Add entities
+            if entities:
+                context += f"Key details mentioned: "
+                context += ", ".join([f"{k}: {v}" for k, v in entities.items()])
+                context += "\n"
+
             context += "\n=== END SUMMARY ===\n\n"
-            
+
             return context
         except Exception as e:
             print(f"⚠️ Could not get context: {e}")
             return ""
-    
+
     def _extract_entities(self, text):
         """Extract numbers, dates, and key terms"""
         import re
-        
+
         entities = {}
-        
+
         # Extract numbers (employees, shift hours, etc.)
         numbers = re.findall(r'\b(\d+)\s+(employees?|workers?|people|hours?|shifts?)\b', text.lower())
         for num, unit in numbers:
             if unit not in entities:
                 entities[unit] = num
-        
+
         # Extract industries
         industries = ['manufacturing', 'healthcare', 'mining', 'food', 'pharmaceutical']
         for industry in industries:
             if industry in text.lower():
                 entities['industry'] = industry
-        
+
         return entities
 
 
+# Singleton instance (one background worker per process)
+_summarizer = None
+
 def get_conversation_summarizer():
     """Get singleton instance"""
-    return ConversationSummarizer()
+    global _summarizer
+    if _summarizer is None:
+        _summarizer = ConversationSummarizer()
+    return _summarizer
 
 
 # I did no harm and this file is not truncated
@@ -1,7 +1,19 @@
 """
 COST OF TIME CALCULATOR MODULE
 Created: January 20, 2026
-Last Updated: January 20, 2026
+Last Updated: October 18, 2026
+
+CHANGELOG:
+- October 18, 2026: Batch scenario engine
+  * CostScenarioEngine evaluates any number of what-if scenarios (wage,
+    burden rate, OT hours, headcount, schedule pattern) as NumPy arrays
+    in one pass, using the same cost model as
+    calculate_schedule_change_impact().
+  * sweep() - full grid over any parameters; grid_table() - two-way
+    table; sensitivity() - one-way low/high swings (tornado);
+    monte_carlo() - uniform/triangular ranges, percentile summary.
+  * generate_cost_report() renders 'sensitivity', 'scenario_grid' and
+    'monte_carlo' entries of analysis_data.
 
 PURPOSE:
 Calculates the true cost of overtime and schedule changes for shift operations.
@@ -22,6 +34,28 @@ AUTHOR: Jim @ Shiftwork Solutions LLC
 
 from datetime import datetime
 import json
+import numpy as np
+
+STANDARD_ANNUAL_HOURS = 2080  # 40 hours x 52 weeks
+OVERTIME_MULTIPLIER = 1.5
+
+# Average scheduled hours per week for common patterns. Hours above 40
+# are built-in overtime, added to a scenario's ot_hours_weekly.
+SCHEDULE_PATTERN_HOURS = {
+    'current': 40,
+    '5x8': 40,
+    '4x10': 40,
+    '2-2-3': 42,
+    'pitman': 42,
+    'dupont': 42,
+    '2-3-2': 42,
+    '4-on-4-off': 42,
+    '3-on-3-off': 42,
+    'southern swing': 42,
+    'continental': 42,
+}
+
+SCENARIO_PARAMETERS = ('base_wage', 'burden_rate', 'ot_hours_weekly', 'headcount', 'schedule_pattern')
 
 
 class CostOfTimeCalculator:
@@ -263,6 +297,49 @@ FINANCIAL IMPACT:
 
 RECOMMENDATION: {analysis_data['recommendation']}
 {analysis_data['summary']}
+"""
+        
+        if analysis_data.get('sensitivity'):
+            # One-way sensitivity (tornado) table
+            rows = analysis_data['sensitivity']
+            report += f"""
+SENSITIVITY ANALYSIS (one parameter at a time):
+--------------------------------------------------------------------------------
+Baseline Annual Cost: ${rows[0]['baseline_cost']:,.2f}
+
+{'Parameter':<18}{'Low':>10}{'High':>10}{'Cost at Low':>18}{'Cost at High':>18}{'Swing':>16}
+"""
+            for row in rows:
+                report += (f"{row['parameter']:<18}{str(row['low']):>10}{str(row['high']):>10}"
+                           f"{row['cost_at_low']:>18,.2f}{row['cost_at_high']:>18,.2f}{row['swing']:>16,.2f}\n")
+        
+        if analysis_data.get('scenario_grid'):
+            # Two-way scenario grid
+            grid = analysis_data['scenario_grid']
+            header = f"{grid['row_param'] + ' / ' + grid['col_param']:<24}"
+            header += ''.join(f"{str(v):>16}" for v in grid['col_values'])
+            report += f"""
+SCENARIO GRID - TOTAL ANNUAL COST:
+--------------------------------------------------------------------------------
+Baseline Annual Cost: ${grid['baseline_cost']:,.2f}
+
+{header}
+"""
+            for row_value, costs in zip(grid['row_values'], grid['values']):
+                report += f"{str(row_value):<24}" + ''.join(f"{c:>16,.0f}" for c in costs) + "\n"
+        
+        if analysis_data.get('monte_carlo'):
+            # Monte Carlo cost range
+            mc = analysis_data['monte_carlo']
+            report += f"""
+MONTE CARLO COST RANGE ({mc['samples']:,} scenarios):
+--------------------------------------------------------------------------------
+Baseline Annual Cost:  ${mc['baseline_cost']:,.2f}
+Expected (mean):       ${mc['mean']:,.2f}
+Median:                ${mc['p50']:,.2f}
+80% range (P10-P90):   ${mc['p10']:,.2f} - ${mc['p90']:,.2f}
+90% range (P5-P95):    ${mc['p5']:,.2f} - ${mc['p95']:,.2f}
+Chance of exceeding baseline: {mc['probability_above_baseline'] * 100:.1f}%
 """
         
         report += f"""
@@ -281,6 +358,240 @@ Generated by Shiftwork Solutions LLC | {datetime.now().strftime('%B %d, %Y')}
         return report
 
 
+class CostScenarioEngine:
+    """
+    Evaluates many cost scenarios at once.
+    
+    A scenario is the five SCENARIO_PARAMETERS. Annual cost follows
+    calculate_schedule_change_impact():
+        straight time = headcount x base_wage x 2080
+        overtime      = headcount x OT hours/week x weeks x 1.5 x base_wage
+        burden        = overtime x burden_rate
+    where OT hours/week is ot_hours_weekly plus the pattern's built-in
+    overtime (average scheduled hours above 40).
+    """
+    
+    def __init__(self, calculator=None, weeks=52):
+        calculator = calculator or get_calculator()
+        self.default_burden_rate = calculator.default_burden_rate
+        self.weeks = weeks
+    
+    def _pattern_overtime(self, patterns):
+        """Built-in weekly OT hours for an array of pattern names"""
+        patterns = np.asarray(patterns, dtype=object)
+        names, inverse = np.unique(patterns.ravel().astype(str), return_inverse=True)
+        hours = []
+        for name in names:
+            key = name.lower().strip()
+            if key not in SCHEDULE_PATTERN_HOURS:
+                raise ValueError(f"Unknown schedule pattern: {name} "
+                                 f"(known: {', '.join(SCHEDULE_PATTERN_HOURS)})")
+            hours.append(max(0, SCHEDULE_PATTERN_HOURS[key] - 40))
+        return np.asarray(hours, dtype=float)[inverse].reshape(patterns.shape)
+    
+    def evaluate(self, base_wage, ot_hours_weekly, headcount, burden_rate=None,
+                 schedule_pattern='current'):
+        """
+        Annual costs for every scenario. Arguments are scalars or arrays that
+        broadcast together; each result is an array of the broadcast shape.
+        
+        Returns:
+            dict of arrays: straight_time_cost, overtime_wages, burden_cost,
+            overtime_cost, total_annual_cost, cost_per_employee
+        """
+        if burden_rate is None:
+            burden_rate = self.default_burden_rate
+        wage = np.asarray(base_wage, dtype=float)
+        burden = np.asarray(burden_rate, dtype=float)
+        headcount = np.asarray(headcount, dtype=float)
+        ot_hours = np.asarray(ot_hours_weekly, dtype=float) + self._pattern_overtime(schedule_pattern)
+        
+        straight_time = headcount * wage * STANDARD_ANNUAL_HOURS
+        overtime_wages = headcount * ot_hours * self.weeks * wage * OVERTIME_MULTIPLIER
+        burden_cost = overtime_wages * burden
+        total = straight_time + overtime_wages + burden_cost
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_employee = np.where(headcount > 0, total / headcount, 0.0)
+        
+        return {
+            'straight_time_cost': straight_time,
+            'overtime_wages': overtime_wages,
+            'burden_cost': burden_cost,
+            'overtime_cost': overtime_wages + burden_cost,
+            'total_annual_cost': total,
+            'cost_per_employee': per_employee,
+        }
+    
+    def _baseline(self, baseline):
+        scenario = {'burden_rate': self.default_burden_rate, 'schedule_pattern': 'current'}
+        scenario.update(baseline)
+        missing = [p for p in SCENARIO_PARAMETERS if p not in scenario]
+        if missing:
+            raise ValueError(f"Baseline is missing: {', '.join(missing)}")
+        return scenario
+    
+    def _evaluate_scenarios(self, scenarios):
+        return self.evaluate(**{p: scenarios[p] for p in SCENARIO_PARAMETERS})
+    
+    def baseline_cost(self, baseline):
+        """Total annual cost of the baseline scenario"""
+        return float(self._evaluate_scenarios(self._baseline(baseline))['total_annual_cost'])
+    
+    def sweep(self, baseline, ranges):
+        """
+        Full grid over the parameters in ranges; the rest stay at baseline.
+        
+        Args:
+            baseline: dict of SCENARIO_PARAMETERS (burden_rate and
+                      schedule_pattern optional)
+            ranges: {parameter: [values, ...]}
+        
+        Returns:
+            dict with 'parameters' (grid axis order), 'values', 'count',
+            'baseline_cost', arrays 'total_annual_cost' and
+            'change_vs_baseline' shaped like the grid, and 'lowest' /
+            'highest' scenarios
+        """
+        scenarios = self._baseline(baseline)
+        unknown = set(ranges) - set(SCENARIO_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+        
+        parameters = list(ranges)
+        axes = [np.asarray(ranges[p], dtype=object if p == 'schedule_pattern' else float)
+                for p in parameters]
+        # Index grids keep pattern names out of the numeric broadcasting
+        grids = np.meshgrid(*[np.arange(len(axis)) for axis in axes], indexing='ij')
+        for parameter, axis, grid in zip(parameters, axes, grids):
+            scenarios[parameter] = axis[grid]
+        
+        total = self._evaluate_scenarios(scenarios)['total_annual_cost']
+        total = np.broadcast_to(total, grids[0].shape if grids else total.shape)
+        base = self.baseline_cost(baseline)
+        
+        def scenario_at(flat_index):
+            position = np.unravel_index(flat_index, total.shape)
+            picked = {p: axis[i].item() if hasattr(axis[i], 'item') else axis[i]
+                      for p, axis, i in zip(parameters, axes, position)}
+            picked['total_annual_cost'] = round(float(total[position]), 2)
+            return picked
+        
+        return {
+            'parameters': parameters,
+            'values': {p: list(ranges[p]) for p in parameters},
+            'count': int(total.size),
+            'baseline_cost': round(base, 2),
+            'total_annual_cost': total,
+            'change_vs_baseline': total - base,
+            'lowest': scenario_at(int(np.argmin(total))),
+            'highest': scenario_at(int(np.argmax(total))),
+        }
+    
+    def grid_table(self, baseline, row_param, row_values, col_param, col_values):
+        """
+        Two-way table of total annual cost for generate_cost_report()
+        (analysis_data['scenario_grid']).
+        """
+        result = self.sweep(baseline, {row_param: row_values, col_param: col_values})
+        return {
+            'row_param': row_param,
+            'col_param': col_param,
+            'row_values': list(row_values),
+            'col_values': list(col_values),
+            'values': np.round(result['total_annual_cost'], 2).tolist(),
+            'baseline_cost': result['baseline_cost'],
+        }
+    
+    def sensitivity(self, baseline, ranges):
+        """
+        One-way sensitivity: each parameter at its low and high value with
+        the others at baseline, all evaluated in one pass.
+        
+        Args:
+            ranges: {parameter: (low, high)}
+        
+        Returns:
+            rows sorted by swing (largest first), for
+            generate_cost_report() (analysis_data['sensitivity'])
+        """
+        base = self._baseline(baseline)
+        parameters = list(ranges)
+        count = 2 * len(parameters)
+        scenarios = {p: np.full(count, base[p], dtype=object if p == 'schedule_pattern' else float)
+                     for p in SCENARIO_PARAMETERS}
+        for i, parameter in enumerate(parameters):
+            low, high = ranges[parameter]
+            scenarios[parameter][2 * i] = low
+            scenarios[parameter][2 * i + 1] = high
+        
+        total = self._evaluate_scenarios(scenarios)['total_annual_cost']
+        base_cost = self.baseline_cost(baseline)
+        
+        rows = []
+        for i, parameter in enumerate(parameters):
+            low, high = ranges[parameter]
+            cost_low, cost_high = float(total[2 * i]), float(total[2 * i + 1])
+            rows.append({
+                'parameter': parameter,
+                'baseline_value': base[parameter],
+                'low': low,
+                'high': high,
+                'cost_at_low': round(cost_low, 2),
+                'cost_at_high': round(cost_high, 2),
+                'swing': round(abs(cost_high - cost_low), 2),
+                'baseline_cost': round(base_cost, 2),
+            })
+        rows.sort(key=lambda row: row['swing'], reverse=True)
+        return rows
+    
+    def monte_carlo(self, baseline, ranges, samples=10000, seed=None):
+        """
+        Monte Carlo cost range.
+        
+        Args:
+            ranges: {parameter: spec}, spec is (low, high) for uniform,
+                    (low, mode, high) for triangular, or a list of pattern
+                    names for schedule_pattern (picked uniformly)
+            samples: number of scenarios to draw
+            seed: for repeatable results
+        
+        Returns:
+            summary dict for generate_cost_report()
+            (analysis_data['monte_carlo'])
+        """
+        rng = np.random.default_rng(seed)
+        scenarios = self._baseline(baseline)
+        for parameter, spec in ranges.items():
+            if parameter == 'schedule_pattern':
+                scenarios[parameter] = rng.choice(np.asarray(spec, dtype=object), size=samples)
+            elif len(spec) == 2:
+                scenarios[parameter] = rng.uniform(spec[0], spec[1], size=samples)
+            elif len(spec) == 3:
+                scenarios[parameter] = rng.triangular(spec[0], spec[1], spec[2], size=samples)
+            else:
+                raise ValueError(f"Range for {parameter} must be (low, high) or (low, mode, high)")
+        
+        total = np.broadcast_to(self._evaluate_scenarios(scenarios)['total_annual_cost'], (samples,))
+        base_cost = self.baseline_cost(baseline)
+        p5, p10, p50, p90, p95 = np.percentile(total, [5, 10, 50, 90, 95])
+        
+        return {
+            'samples': samples,
+            'ranges': {p: list(spec) for p, spec in ranges.items()},
+            'baseline_cost': round(base_cost, 2),
+            'mean': round(float(total.mean()), 2),
+            'std_dev': round(float(total.std()), 2),
+            'min': round(float(total.min()), 2),
+            'max': round(float(total.max()), 2),
+            'p5': round(float(p5), 2),
+            'p10': round(float(p10), 2),
+            'p50': round(float(p50), 2),
+            'p90': round(float(p90), 2),
+            'p95': round(float(p95), 2),
+            'probability_above_baseline': round(float((total > base_cost).mean()), 3),
+        }
+
+
 # Singleton instance
 _calculator = None
 
@@ -292,4 +603,14 @@ def get_calculator():
     return _calculator
 
 
+_scenario_engine = None
+
+def get_scenario_engine():
+    """Get or create the scenario engine singleton"""
+    global _scenario_engine
+    if _scenario_engine is None:
+        _scenario_engine = CostScenarioEngine(get_calculator())
+    return _scenario_engine
+
+
 # I did no harm and this file is not truncated
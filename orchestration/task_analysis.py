@@ -1,10 +1,18 @@
 """
 Task Analysis Module - WITH UNIFIED KNOWLEDGE BASE (Project Files + Knowledge Management)
 Created: January 21, 2026
-Last Updated: February 28, 2026 - GAP 3 FIX: RELEVANCE-RANKED KNOWLEDGE SEARCH
+Last Updated: October 18, 2026 - SHARED REQUEST CONTEXT
 
 CHANGELOG:
 
+- October 18, 2026: SHARED REQUEST CONTEXT
+  analyze_task_with_sonnet(), handle_with_opus() and execute_specialist_task()
+    accept request_context (orchestration/request_context.py). The unified
+    knowledge check, learning context and capabilities block are computed
+    once per request instead of once per stage; an escalated request no
+    longer repeats the KB and KM DB search for Opus. Without a
+    request_context each function behaves as before.
+
 - February 28, 2026 (Gap 3): RELEVANCE-RANKED KNOWLEDGE SEARCH
   PROBLEM: search_knowledge_management_db() used LIKE %term% queries with no
     relevance scoring. Documents were returned in DB insertion order (by id),
@@ -96,6 +104,7 @@ import re
 import time
 import os
 from orchestration.ai_clients import call_claude_sonnet, call_claude_opus
+from orchestration.request_context import RequestContext
 from database import get_db
 from config import DATABASE
 
@@ -927,7 +936,8 @@ def check_knowledge_base_unified(user_request, project_knowledge_base):
     }
 
 
-def analyze_task_with_sonnet(user_request, knowledge_base=None, file_paths=None, file_contents=None):
+def analyze_task_with_sonnet(user_request, knowledge_base=None, file_paths=None, file_contents=None,
+                             request_context=None):
     """
     Sonnet analyzes task WITH unified knowledge + system capabilities + FILE ATTACHMENTS.
 
@@ -950,13 +960,16 @@ def analyze_task_with_sonnet(user_request, knowledge_base=None, file_paths=None,
 
     UPDATED February 20, 2026:
     - Added SPECIALIST_ROUTING_RULES and research_agent to valid specialists.
+
+    request_context (RequestContext): shares the knowledge search, learning
+    context and capabilities with the later stages of the same request.
     """
 
-    from orchestration.system_capabilities import get_system_capabilities_prompt
-    capabilities = get_system_capabilities_prompt()
+    ctx = request_context or RequestContext(user_request, knowledge_base=knowledge_base)
+    capabilities = ctx.capabilities
 
-    kb_check = check_knowledge_base_unified(user_request, knowledge_base)
-    learning_context = get_learning_context()
+    kb_check = ctx.knowledge_check(user_request)
+    learning_context = ctx.learning_context()
 
     analysis_prompt = f"""{capabilities}
 
@@ -1103,7 +1116,7 @@ Respond ONLY with valid JSON:
 }"""
 
     start_time = time.time()
-    api_response = call_claude_sonnet(analysis_prompt)
+    api_response = call_claude_sonnet(analysis_prompt, capabilities=capabilities)
     execution_time = time.time() - start_time
 
     if isinstance(api_response, dict):
@@ -1183,7 +1196,8 @@ Respond ONLY with valid JSON:
         }
 
 
-def handle_with_opus(user_request, sonnet_analysis, knowledge_base=None, file_paths=None, file_contents=None):
+def handle_with_opus(user_request, sonnet_analysis, knowledge_base=None, file_paths=None, file_contents=None,
+                     request_context=None):
     """
     Opus handles complex requests WITH unified knowledge + system capabilities + FILES.
 
@@ -1197,13 +1211,16 @@ def handle_with_opus(user_request, sonnet_analysis, knowledge_base=None, file_pa
     UPDATED February 28, 2026 (Pass 1): KM DB returns real content excerpts.
 
     UPDATED February 20, 2026: Added SPECIALIST_ROUTING_RULES to Opus prompt.
+
+    When request_context is the one analyze_task_with_sonnet() used, the
+    knowledge search and learning context are not repeated.
     """
 
-    from orchestration.system_capabilities import get_system_capabilities_prompt
-    capabilities = get_system_capabilities_prompt()
+    ctx = request_context or RequestContext(user_request, knowledge_base=knowledge_base)
+    capabilities = ctx.capabilities
 
-    kb_check = check_knowledge_base_unified(user_request, knowledge_base)
-    learning_context = get_learning_context()
+    kb_check = ctx.knowledge_check(user_request)
+    learning_context = ctx.learning_context()
 
     opus_prompt = f"""{capabilities}
 
@@ -1297,7 +1314,7 @@ Respond in JSON:
 }}"""
 
     start_time = time.time()
-    api_response = call_claude_opus(opus_prompt)
+    api_response = call_claude_opus(opus_prompt, capabilities=capabilities)
     execution_time = time.time() - start_time
 
     if isinstance(api_response, dict):
@@ -1339,7 +1356,8 @@ Respond in JSON:
         }
 
 
-def execute_specialist_task(specialist_ai, task_description, knowledge_context="", file_paths=None, file_contents=None):
+def execute_specialist_task(specialist_ai, task_description, knowledge_context="", file_paths=None, file_contents=None,
+                            request_context=None):
     """
     Execute task with specialist AI.
 
@@ -1352,11 +1370,15 @@ def execute_specialist_task(specialist_ai, task_description, knowledge_context="
         knowledge_context (str): Optional knowledge context
         file_paths (list): Optional list of attached file paths
         file_contents (str): Optional extracted file contents
+        request_context (RequestContext): Optional; supplies the capabilities block
     """
     from orchestration.ai_clients import call_gpt4, call_deepseek, call_gemini
 
-    from orchestration.system_capabilities import get_system_capabilities_prompt
-    capabilities = get_system_capabilities_prompt()
+    if request_context is not None:
+        capabilities = request_context.capabilities
+    else:
+        from orchestration.system_capabilities import get_system_capabilities_prompt
+        capabilities = get_system_capabilities_prompt()
 
     specialist_map = {
         "research_agent": call_research_agent,
@@ -1397,7 +1419,10 @@ def execute_specialist_task(specialist_ai, task_description, knowledge_context="
         full_prompt += f"TASK: {task_description}{file_section}"
 
     start_time = time.time()
-    api_response = ai_function(full_prompt)
+    if specialist_ai.lower() == "research_agent":
+        api_response = ai_function(full_prompt)
+    else:
+        api_response = ai_function(full_prompt, capabilities=capabilities)
     execution_time = time.time() - start_time
 
     if isinstance(api_response, dict):
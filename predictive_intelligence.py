@@ -1,7 +1,21 @@
 """
 PREDICTIVE INTELLIGENCE ENGINE - Phase 2
 Created: February 2, 2026
-Last Updated: February 2, 2026
+Last Updated: October 18, 2026 - INCREMENTAL TASK SEQUENCE MODEL
+
+CHANGELOG:
+
+- October 18, 2026: INCREMENTAL TASK SEQUENCE MODEL
+  PROBLEM: analyze_task_sequences() reloaded 30 days of outcome_tracking
+    and recounted every 2- and 3-task sequence on each analyze_and_learn(),
+    so next-task knowledge only existed as the output of that batch job.
+  FIX: Sequences come from task_sequence_model.OUTCOME_SEQUENCES, a
+    persistent table of time-decayed transition counts that record_outcome()
+    extends as each outcome is recorded. analyze_task_sequences() reads the
+    sequences with a decayed weight of at least 2 (the old "seen at least
+    twice" rule). get_predictions() adds 'next_tasks', a keyed lookup on the
+    latest task history. Recent tasks are read newest-id first instead of
+    sorting the table by created_at.
 
 This module implements predictive capabilities that anticipate user needs
 and pre-stage resources before they're requested.
@@ -29,6 +43,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict, Counter
 import statistics
 
+from task_sequence_model import OUTCOME_SEQUENCES, fetch_outcome_rows
+
 
 class UserBehaviorAnalyzer:
     """
@@ -113,72 +129,43 @@ class UserBehaviorAnalyzer:
         """
         Analyze sequences of tasks to find patterns.
         Example: "User typically does X, then Y, then Z"
+        
+        days_back is accepted for existing callers; older sequences now fade
+        through the model's time decay instead of a fixed window.
         """
         db = sqlite3.connect(self.db_path)
-        db.row_factory = sqlite3.Row
-        cursor = db.cursor()
-        
-        cutoff_date = datetime.now() - timedelta(days=days_back)
-        
-        # Get tasks with their types and timestamps
-        cursor.execute('''
-            SELECT task_type, created_at, task_context
-            FROM outcome_tracking
-            WHERE created_at >= ?
-            ORDER BY created_at ASC
-        ''', (cutoff_date.isoformat(),))
-        
-        tasks = [dict(row) for row in cursor.fetchall()]
+        # Catch up on outcomes recorded outside OutcomeTracker.record_outcome()
+        OUTCOME_SEQUENCES.update(db, fetch_outcome_rows)
+        db.commit()
+        sequences_2 = OUTCOME_SEQUENCES.top_sequences(db, order=2, min_weight=2)
+        sequences_3 = OUTCOME_SEQUENCES.top_sequences(db, order=3, min_weight=2)
         db.close()
         
-        if len(tasks) < 3:
-            return []
-        
-        # Find sequences (2-task and 3-task patterns)
-        sequences_2 = []
-        sequences_3 = []
-        
-        for i in range(len(tasks) - 1):
-            # 2-task sequences
-            seq_2 = (tasks[i]['task_type'], tasks[i+1]['task_type'])
-            sequences_2.append(seq_2)
-            
-            # 3-task sequences
-            if i < len(tasks) - 2:
-                seq_3 = (tasks[i]['task_type'], tasks[i+1]['task_type'], tasks[i+2]['task_type'])
-                sequences_3.append(seq_3)
-        
-        # Count frequency of each sequence
-        seq_2_counts = Counter(sequences_2)
-        seq_3_counts = Counter(sequences_3)
-        
         patterns = []
         
-        # Analyze 2-task sequences
-        for seq, count in seq_2_counts.items():
-            if count >= 2:  # Seen at least twice
-                confidence = min(0.95, 0.50 + (count * 0.10))
-                patterns.append({
-                    'type': 'task_sequence_2',
-                    'sequence': list(seq),
-                    'description': f"After {seq[0]}, user typically does {seq[1]}",
-                    'frequency': count,
-                    'confidence': confidence,
-                    'prediction': f"Next likely task: {seq[1]}"
-                })
+        # Analyze 2-task sequences (decayed weight of at least 2)
+        for seq, weight, count in sequences_2:
+            confidence = min(0.95, 0.50 + (weight * 0.10))
+            patterns.append({
+                'type': 'task_sequence_2',
+                'sequence': list(seq),
+                'description': f"After {seq[0]}, user typically does {seq[1]}",
+                'frequency': round(weight),
+                'confidence': confidence,
+                'prediction': f"Next likely task: {seq[1]}"
+            })
         
         # Analyze 3-task sequences
-        for seq, count in seq_3_counts.items():
-            if count >= 2:
-                confidence = min(0.95, 0.60 + (count * 0.10))
-                patterns.append({
-                    'type': 'task_sequence_3',
-                    'sequence': list(seq),
-                    'description': f"Typical workflow: {seq[0]} → {seq[1]} → {seq[2]}",
-                    'frequency': count,
-                    'confidence': confidence,
-                    'prediction': f"After {seq[0]} and {seq[1]}, next is typically {seq[2]}"
-                })
+        for seq, weight, count in sequences_3:
+            confidence = min(0.95, 0.60 + (weight * 0.10))
+            patterns.append({
+                'type': 'task_sequence_3',
+                'sequence': list(seq),
+                'description': f"Typical workflow: {seq[0]} → {seq[1]} → {seq[2]}",
+                'frequency': round(weight),
+                'confidence': confidence,
+                'prediction': f"After {seq[0]} and {seq[1]}, next is typically {seq[2]}"
+            })
         
         return patterns
     
@@ -643,15 +630,22 @@ class PredictiveIntelligenceEngine:
         resources = self.resource_stager.predict_needed_resources(current_context)
         predictions['recommended_resources'] = resources
         
-        # Get recent tasks for suggestion context
         db = sqlite3.connect(self.db_path)
         db.row_factory = sqlite3.Row
         cursor = db.cursor()
         
+        # Likely next task types after the latest history
+        try:
+            predictions['next_tasks'] = OUTCOME_SEQUENCES.predict(db)
+        except sqlite3.Error as e:
+            print(f"⚠️ Next-task prediction unavailable: {e}")
+            predictions['next_tasks'] = []
+        
+        # Get recent tasks for suggestion context
         cursor.execute('''
             SELECT task_type, created_at
             FROM outcome_tracking
-            ORDER BY created_at DESC
+            ORDER BY id DESC
             LIMIT 5
         ''')
         
@@ -1,9 +1,16 @@
 """
 Progressive File Analyzer - Smart Large File Handling
 Created: January 31, 2026
-Last Updated: February 5, 2026
+Last Updated: October 18, 2026
 
 CHANGE LOG:
+- October 18, 2026 (v8): Shared dtype stage for chunks
+  * extract_excel_chunk() no longer forces dtype='object'. Each chunk goes
+    through dataframe_loader.optimize_dtypes(): low-cardinality text
+    becomes category, text dates become datetime64, int64 becomes int32.
+    The memory before/after is printed. The 'data' DataFrame in the
+    result now carries those dtypes.
+
 - February 5, 2026 (v7): CRITICAL FIX - Text preview size limits
   * Limited text preview to max 50 rows (not 100) to prevent GPT-4 timeout
   * Added max character limit (20,000 chars) on text preview
@@ -33,6 +40,8 @@ import pandas as pd
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from dataframe_loader import format_report, optimize_dtypes
+
 
 # File size thresholds (in bytes)
 SMALL_FILE_THRESHOLD = 5 * 1024 * 1024  # 5MB - analyze fully
@@ -44,6 +53,7 @@ class ProgressiveFileAnalyzer:
     """
     Smart file analyzer that handles large files progressively.
     
+    Updated October 18, 2026 (v8): Shared dtype stage instead of dtype='object'
     Updated February 5, 2026 (v7): Text preview size limits
     Updated February 5, 2026 (v6): Pandas read protection for huge files
     Updated February 5, 2026 (v5): Memory-efficient row counting with openpyxl
@@ -172,6 +182,10 @@ class ProgressiveFileAnalyzer:
         """
         Extract a specific chunk of rows from an Excel file.
         
+        UPDATED October 18, 2026 (v8):
+        - Chunks go through dataframe_loader.optimize_dtypes() instead of
+          being forced to dtype='object'; the memory report is printed
+        
         UPDATED February 5, 2026 (v7): 
         - Limited preview to 50 rows max (not 100) to prevent huge text
         - Added 20K character limit on text preview
@@ -179,7 +193,7 @@ class ProgressiveFileAnalyzer:
         UPDATED February 5, 2026 (v6): 
         - Added error handling for pandas memory issues
         - Automatically reduces chunk size if pandas fails
-        - Uses dtype='object' to prevent type inference overhead
+        - (v8: dtype='object' replaced by the shared dtype stage)
         
         UPDATED February 5, 2026 (v5): 
         - Uses openpyxl for row counting instead of reading entire file with pandas
@@ -266,25 +280,26 @@ class ProgressiveFileAnalyzer:
                     # skiprows needs a range: skip rows 1 through start_row (keep row 0 = header)
                     skip_range = range(1, start_row + 1)
                     
-                    # Use dtype='object' to prevent type inference (saves memory)
                     df = pd.read_excel(
                         file_path, 
                         sheet_name=sheet_name or 0, 
                         skiprows=skip_range, 
-                        nrows=safe_chunk_size,
-                        dtype='object'  # Prevent type inference overhead
+                        nrows=safe_chunk_size
                     )
                 else:
                     # First chunk - just read normally
                     df = pd.read_excel(
                         file_path, 
                         sheet_name=sheet_name or 0, 
-                        nrows=safe_chunk_size,
-                        dtype='object'  # Prevent type inference overhead
+                        nrows=safe_chunk_size
                     )
                 
                 print(f"✅ Successfully read {len(df):,} rows")
                 
+                # Shared dtype stage (v8): category/datetime/int32 instead of object
+                df, dtype_report = optimize_dtypes(df)
+                print(format_report(dtype_report))
+                
             except MemoryError as mem_err:
                 print(f"❌ MEMORY ERROR: pandas ran out of RAM reading chunk")
                 return {
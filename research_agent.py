@@ -1,7 +1,47 @@
 """
 Research Agent - Proactive Web Research for AI Swarm
 Created: January 23, 2026
-Last Updated: January 23, 2026
+Last Updated: October 18, 2026 - DAYS_BACK SENT TO TAVILY
+
+CHANGELOG:
+
+- October 18, 2026: DAYS_BACK SENT TO TAVILY
+  PROBLEM: search(days_back=N) never reached Tavily (it never had), so
+    "news from the last 7 days" searched all time, while the cache key
+    still split entries by days_back.
+  FIX: days_back becomes Tavily's time_range (TAVILY_TIME_RANGES: day,
+    week, month, year - the smallest one covering N days; more than a year
+    is sent as 'year', never as "no filter"). The cache is
+    keyed by that time_range, so it matches what was actually requested.
+  * Clarification of the entry below: coalescing is per process. Two
+    gunicorn workers that start the same search at the same moment can
+    both fetch it. The cache re-check after the claim only catches a search
+    that another worker has already finished.
+
+- October 18, 2026: CACHED, COALESCED AND CONCURRENT SEARCHES
+  PROBLEM: Every search() was a synchronous Tavily round trip (and a paid
+    search). The daily briefing, the alert_system monitors and the
+    research routes kept asking the same questions: the same regulation
+    query from the briefing and the regulatory monitor, the same
+    competitor query every run. get_daily_briefing() ran its searches one
+    after another.
+  FIX:
+  * research_cache table: successful responses keyed by a hash of the
+    normalized query (case and whitespace), depth, max_results, include and
+    exclude domains and days_back. Each search type has its own freshness
+    TTL (CACHE_TTL_SECONDS); research studies stay fresh for a week, news
+    for a few hours. Only real API calls are logged to research_logs.
+  * In-flight coalescing: when a search for the same key is already
+    running in this process, later callers wait for it instead of making
+    a second request.
+  * get_daily_briefing() runs its searches in parallel, so a briefing
+    takes one round trip instead of one per section.
+  * research_topic() still makes one search, so the cache and coalescing
+    are what it gains.
+  * Results carry 'cached': True/False. search(..., use_cache=False)
+    forces a fresh request, which is still stored in the cache.
+  * benchmarks/bench_research_agent.py runs against a local Tavily
+    stand-in.
 
 PURPOSE:
 This module adds real-time web research capabilities to the AI Swarm.
@@ -22,8 +62,13 @@ Author: Jim @ Shiftwork Solutions LLC (managed by Claude)
 """
 
 import os
+import copy
 import json
+import hashlib
+import threading
+import time
 import requests
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from database import get_db
 
@@ -31,6 +76,23 @@ from database import get_db
 TAVILY_API_KEY = os.environ.get('TAVILY_API_KEY')
 TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 
+# How long a cached result stays fresh, per search type (seconds)
+CACHE_TTL_SECONDS = {
+    'industry_news': 6 * 3600,
+    'client_news': 6 * 3600,
+    'regulations': 24 * 3600,
+    'research_studies': 7 * 24 * 3600,
+    'competitor_activity': 24 * 3600,
+    'leads': 12 * 3600,
+    'topic': 6 * 3600,
+    'general': 3600,
+}
+# Entries older than this are deleted when new results are stored
+CACHE_MAX_AGE_SECONDS = max(CACHE_TTL_SECONDS.values())
+
+# Tavily filters by these ranges; days_back maps to the smallest one covering it
+TAVILY_TIME_RANGES = ((1, 'day'), (7, 'week'), (31, 'month'), (366, 'year'))
+
 
 class ResearchAgent:
     """
@@ -42,6 +104,10 @@ class ResearchAgent:
         self.api_key = TAVILY_API_KEY
         self.is_available = bool(self.api_key)
         
+        # Searches running in this process, by cache key
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        
         # Define research domains relevant to shiftwork consulting
         self.research_domains = {
             'industry_news': {
@@ -77,7 +143,7 @@ class ResearchAgent:
             print("⚠️ Research Agent: TAVILY_API_KEY not configured")
     
     def search(self, query, search_depth="basic", max_results=5, include_domains=None, 
-               exclude_domains=None, days_back=None):
+               exclude_domains=None, days_back=None, search_type='general', use_cache=True):
         """
         Perform a web search using Tavily API.
         
@@ -87,10 +153,13 @@ class ResearchAgent:
             max_results: Number of results to return (1-10)
             include_domains: List of domains to search within
             exclude_domains: List of domains to exclude
-            days_back: Only return results from last N days
+            days_back: Only return results from last N days (rounded up to
+                       a day / week / month / year time_range; capped at a year)
+            search_type: Key into CACHE_TTL_SECONDS (how long results stay fresh)
+            use_cache: False skips the cache lookup (the result is still cached)
             
         Returns:
-            dict with 'success', 'results', 'summary', 'query'
+            dict with 'success', 'results', 'summary', 'query', 'cached'
         """
         if not self.is_available:
             return {
@@ -99,6 +168,48 @@ class ResearchAgent:
                 'results': []
             }
         
+        time_range = self._time_range(days_back)
+        key = self._cache_key(query, search_depth, max_results, include_domains,
+                              exclude_domains, time_range)
+        ttl = CACHE_TTL_SECONDS.get(search_type, CACHE_TTL_SECONDS['general'])
+        
+        if use_cache:
+            cached = self._cache_get(key, ttl)
+            if cached:
+                return cached
+        
+        with self._in_flight_lock:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = self._in_flight[key] = Future()
+                owner = True
+            else:
+                owner = False
+        
+        if not owner:
+            # Same search already running in another thread - share its result
+            return copy.deepcopy(pending.result())
+        
+        try:
+            # Another worker may have stored it between the lookup and the claim
+            result = self._cache_get(key, ttl) if use_cache else None
+            if result is None:
+                result = self._fetch(query, search_depth, max_results, include_domains,
+                                     exclude_domains, time_range, search_type)
+                if result['success']:
+                    self._cache_put(key, search_type, query, result)
+            pending.set_result(result)
+        except Exception as e:
+            pending.set_result({'success': False, 'error': str(e), 'results': []})
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+        
+        return copy.deepcopy(pending.result())
+    
+    def _fetch(self, query, search_depth, max_results, include_domains, exclude_domains,
+               time_range, search_type):
+        """One Tavily request; never raises"""
         try:
             payload = {
                 "api_key": self.api_key,
@@ -115,6 +226,9 @@ class ResearchAgent:
             if exclude_domains:
                 payload["exclude_domains"] = exclude_domains
             
+            if time_range:
+                payload["time_range"] = time_range
+            
             response = requests.post(TAVILY_SEARCH_URL, json=payload, timeout=30)
             response.raise_for_status()
             
@@ -132,14 +246,15 @@ class ResearchAgent:
                 })
             
             # Log the search
-            self._log_search(query, len(results))
+            self._log_search(query, len(results), search_type)
             
             return {
                 'success': True,
                 'query': query,
                 'summary': data.get('answer', ''),  # AI-generated summary
                 'results': results,
-                'result_count': len(results)
+                'result_count': len(results),
+                'cached': False
             }
             
         except requests.exceptions.RequestException as e:
@@ -169,7 +284,9 @@ class ResearchAgent:
             query=base_query,
             search_depth="advanced",
             max_results=5,
-            exclude_domains=["pinterest.com", "facebook.com", "twitter.com"]
+            exclude_domains=["pinterest.com", "facebook.com", "twitter.com"],
+            days_back=days_back,
+            search_type='industry_news'
         )
     
     def search_regulations(self, topic=None):
@@ -184,7 +301,8 @@ class ResearchAgent:
             query=base_query,
             search_depth="advanced",
             max_results=5,
-            include_domains=["osha.gov", "dol.gov", "shrm.org", "law.cornell.edu"]
+            include_domains=["osha.gov", "dol.gov", "shrm.org", "law.cornell.edu"],
+            search_type='regulations'
         )
     
     def search_research_studies(self, topic=None):
@@ -200,7 +318,8 @@ class ResearchAgent:
             search_depth="advanced",
             max_results=5,
             include_domains=["pubmed.gov", "nih.gov", "sciencedirect.com", 
-                           "journals.sagepub.com", "nature.com"]
+                           "journals.sagepub.com", "nature.com"],
+            search_type='research_studies'
         )
     
     def search_competitors(self):
@@ -211,7 +330,8 @@ class ResearchAgent:
             query="shift scheduling software workforce management consulting",
             search_depth="basic",
             max_results=10,
-            exclude_domains=["shiftworksolutions.com"]  # Exclude ourselves
+            exclude_domains=["shiftworksolutions.com"],  # Exclude ourselves
+            search_type='competitor_activity'
         )
     
     def search_potential_leads(self, industry=None):
@@ -227,7 +347,8 @@ class ResearchAgent:
             search_depth="advanced",
             max_results=10,
             include_domains=["linkedin.com", "reddit.com", "quora.com", 
-                           "manufacturingnet.com", "industryweek.com"]
+                           "manufacturingnet.com", "industryweek.com"],
+            search_type='leads'
         )
     
     def research_topic(self, topic, context=None):
@@ -256,7 +377,8 @@ class ResearchAgent:
         result = self.search(
             query=enhanced_query,
             search_depth="advanced",
-            max_results=7
+            max_results=7,
+            search_type='topic'
         )
         
         if result['success']:
@@ -281,8 +403,16 @@ class ResearchAgent:
             'sections': []
         }
         
+        # The sections are independent - search them in parallel
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            news_future = executor.submit(self.search_industry_news)
+            regs_future = executor.submit(self.search_regulations)
+            research_future = executor.submit(self.search_research_studies)
+            news = news_future.result()
+            regs = regs_future.result()
+            research = research_future.result()
+        
         # Industry News
-        news = self.search_industry_news()
         if news['success'] and news['results']:
             briefing['sections'].append({
                 'title': '📰 Industry News',
@@ -291,7 +421,6 @@ class ResearchAgent:
             })
         
         # Regulatory Updates
-        regs = self.search_regulations()
         if regs['success'] and regs['results']:
             briefing['sections'].append({
                 'title': '⚖️ Regulatory Updates',
@@ -300,7 +429,6 @@ class ResearchAgent:
             })
         
         # Research & Studies
-        research = self.search_research_studies()
         if research['success'] and research['results']:
             briefing['sections'].append({
                 'title': '🔬 New Research',
@@ -313,14 +441,79 @@ class ResearchAgent:
         
         return briefing
     
-    def _log_search(self, query, result_count):
+    @staticmethod
+    def _time_range(days_back):
+        """
+        Tavily time_range for days_back (None: no date filter).
+        Tavily's widest range is a year, so more than 366 days maps to 'year'.
+        """
+        if not days_back:
+            return None
+        for days, time_range in TAVILY_TIME_RANGES:
+            if days_back <= days:
+                return time_range
+        return TAVILY_TIME_RANGES[-1][1]
+    
+    @staticmethod
+    def _cache_key(query, search_depth, max_results, include_domains, exclude_domains, time_range):
+        """Hash of the normalized search parameters"""
+        normalized = [
+            ' '.join(query.lower().split()),
+            search_depth,
+            max_results,
+            sorted(d.lower() for d in include_domains or []),
+            sorted(d.lower() for d in exclude_domains or []),
+            time_range,
+        ]
+        return hashlib.sha256(json.dumps(normalized).encode('utf-8')).hexdigest()
+    
+    def _cache_get(self, key, ttl):
+        """Cached response if younger than ttl seconds, else None"""
+        try:
+            db = get_db()
+            row = db.execute('''
+                SELECT response, fetched_at FROM research_cache WHERE cache_key = ?
+            ''', (key,)).fetchone()
+            db.close()
+        except Exception as e:
+            print(f"Research cache read failed: {e}")
+            return None
+        
+        if row is None or time.time() - row['fetched_at'] > ttl:
+            return None
+        result = json.loads(row['response'])
+        result['cached'] = True
+        return result
+    
+    def _cache_put(self, key, search_type, query, result):
+        """Store a successful response and drop entries past every TTL"""
+        try:
+            now = time.time()
+            db = get_db()
+            db.execute('''
+                INSERT INTO research_cache (cache_key, search_type, query, response, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    search_type = excluded.search_type,
+                    query = excluded.query,
+                    response = excluded.response,
+                    fetched_at = excluded.fetched_at
+            ''', (key, search_type, query, json.dumps(result), now))
+            db.execute('DELETE FROM research_cache WHERE fetched_at < ?',
+                       (now - CACHE_MAX_AGE_SECONDS,))
+            db.commit()
+            db.close()
+        except Exception as e:
+            print(f"Research cache write failed: {e}")
+    
+    def _log_search(self, query, result_count, search_type=None):
         """Log search to database for analytics"""
         try:
             db = get_db()
             db.execute('''
-                INSERT INTO research_logs (query, result_count, searched_at)
-                VALUES (?, ?, ?)
-            ''', (query, result_count, datetime.now()))
+                INSERT INTO research_logs (query, result_count, searched_at, search_type)
+                VALUES (?, ?, ?, ?)
+            ''', (query, result_count, datetime.now(), search_type))
             db.commit()
             db.close()
         except Exception as e:
@@ -1,7 +1,18 @@
 """
 Excel Handler - Large File Analysis Workflows
 Created: February 10, 2026
-Last Updated: February 10, 2026
+Last Updated: October 18, 2026 - Task completion through mark_task_completed()
+
+CHANGELOG:
+- October 18, 2026: Task completion through mark_task_completed()
+  * Tasks are marked completed with database.mark_task_completed(), which
+    also extends the task-request sequences (improvement_engine)
+
+- October 18, 2026: Smart analyzer sessions run in analysis_sandbox
+  * handle_smart_excel_analysis() and handle_smart_analyzer_continuation()
+    open the conversation's workbook through get_analysis_sandbox(). The
+    dataframe stays in a sandbox process with CPU and memory limits, and
+    follow-up questions reuse it instead of reloading the file.
 
 Handles Excel file analysis with intelligent routing:
 - Small-medium files (under 100MB) with data questions -> Smart pandas analyzer
@@ -23,7 +34,7 @@ from datetime import datetime
 from flask import jsonify, session
 import pandas as pd
 
-from database import get_db, add_message
+from database import get_db, add_message, mark_task_completed
 from progressive_file_analyzer import get_progressive_analyzer
 from routes.utils import convert_markdown_to_html
 
@@ -181,8 +192,7 @@ BE SPECIFIC. Use actual numbers from the data."""
             formatted_output = convert_markdown_to_html(full_response)
                       
             total_time = time.time() - overall_start
-            db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                      ('completed', 'gpt4_progressive_excel', total_time, task_id))
+            mark_task_completed(db, task_id, 'gpt4_progressive_excel', total_time)
             db.commit()
             db.close()
             
@@ -237,9 +247,7 @@ def handle_excel_smart_analysis(file_path, user_request, conversation_id, projec
         Flask JSON response
     """
     try:
-        import sys
-        sys.path.insert(0, os.path.dirname(__file__))
-        from smart_excel_analyzer import SmartExcelAnalyzer
+        from analysis_sandbox import get_analysis_sandbox
         from orchestration.ai_clients import call_gpt4
         from database import create_conversation, save_smart_analyzer_state
         
@@ -250,8 +258,8 @@ def handle_excel_smart_analysis(file_path, user_request, conversation_id, projec
             conversation_id = create_conversation(mode=mode, project_id=project_id)
             print(f"Created new conversation: {conversation_id}")
         
-        # Load and profile the file
-        analyzer = SmartExcelAnalyzer(file_path)
+        # Load and profile the file in this conversation's sandbox session
+        analyzer = get_analysis_sandbox().session(conversation_id, file_path)
         profile_result = analyzer.load_and_profile()
         
         if not profile_result['success']:
@@ -396,8 +404,7 @@ What would you like to know next? I have the complete dataset loaded and can ans
                     formatted_output = convert_markdown_to_html(full_response)
                     
                     total_time = time.time() - overall_start
-                    db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                              ('completed', 'smart_pandas_analyzer', total_time, task_id))
+                    mark_task_completed(db, task_id, 'smart_pandas_analyzer', total_time)
                     db.commit()
                     db.close()
                     
@@ -438,8 +445,7 @@ Please rephrase your question or ask me to show you something specific from the
                     formatted_output = convert_markdown_to_html(fallback_response)
                     
                     total_time = time.time() - overall_start
-                    db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                              ('completed', 'smart_pandas_analyzer', total_time, task_id))
+                    mark_task_completed(db, task_id, 'smart_pandas_analyzer', total_time)
                     db.commit()
                     db.close()
                     
@@ -473,8 +479,7 @@ What would you like to analyze?"""
                 formatted_output = convert_markdown_to_html(profile_response)
                 
                 total_time = time.time() - overall_start
-                db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                          ('completed', 'smart_pandas_analyzer', total_time, task_id))
+                mark_task_completed(db, task_id, 'smart_pandas_analyzer', total_time)
                 db.commit()
                 db.close()
                 
@@ -519,10 +524,7 @@ def handle_smart_analyzer_continuation(user_request, conversation_id, project_id
         Flask JSON response or None if not a continuation
     """
     try:
-        import sys
-        import os
-        sys.path.insert(0, os.path.dirname(__file__))
-        from smart_excel_analyzer import SmartExcelAnalyzer
+        from analysis_sandbox import get_analysis_sandbox
         from orchestration.ai_clients import call_gpt4
         from database import get_smart_analyzer_state
         
@@ -530,16 +532,18 @@ def handle_smart_analyzer_continuation(user_request, conversation_id, project_id
         if not analyzer_state:
             return None
         
-        print(f"Smart analyzer continuation - reloading file: {analyzer_state['file_name']}")
+        print(f"Smart analyzer continuation - file: {analyzer_state['file_name']}")
         
+        # The sandbox still holds the dataframe from the last question unless
+        # the session was evicted or the sandbox restarted
         file_path = analyzer_state['file_path']
-        analyzer = SmartExcelAnalyzer(file_path)
+        analyzer = get_analysis_sandbox().session(conversation_id, file_path)
         load_result = analyzer.load_and_profile()
         
         if not load_result['success']:
             return jsonify({'success': False, 'error': f"Could not reload file: {load_result.get('error')}"}), 500
         
-        print(f"File reloaded: {len(analyzer.df):,} rows")
+        print(f"File {'resident' if analyzer.resident else 'reloaded'}: {analyzer.row_count:,} rows")
         
         db = get_db()
         cursor = db.execute('INSERT INTO tasks (user_request, status, conversation_id) VALUES (?, ?, ?)',
@@ -636,8 +640,7 @@ What else would you like to know?"""
                 formatted_output = convert_markdown_to_html(full_response)
                 
                 total_time = time.time() - overall_start
-                db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                          ('completed', 'smart_pandas_analyzer_continuation', total_time, task_id))
+                mark_task_completed(db, task_id, 'smart_pandas_analyzer_continuation', total_time)
                 db.commit()
                 db.close()
                 
@@ -645,7 +648,7 @@ What else would you like to know?"""
                            {'orchestrator': 'smart_pandas_analyzer_continuation',
                             'execution_time': total_time,
                             'pandas_code': pandas_code,
-                            'rows_processed': len(analyzer.df),
+                            'rows_processed': analyzer.row_count,
                             'download_created': download_created})
                 
                 return jsonify({
@@ -675,13 +678,12 @@ Code attempted:
 
 Could you rephrase your question?
 
-Available columns: {', '.join(analyzer.df.columns)}"""
+Available columns: {', '.join(analyzer.columns)}"""
                 
                 formatted_output = convert_markdown_to_html(error_response)
                 
                 total_time = time.time() - overall_start
-                db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                          ('completed', 'smart_pandas_analyzer_error', total_time, task_id))
+                mark_task_completed(db, task_id, 'smart_pandas_analyzer_error', total_time)
                 db.commit()
                 db.close()
                 
@@ -798,8 +800,7 @@ DELIVER ACTUAL ANALYSIS WITH REAL NUMBERS FROM THIS DATA."""
             formatted_output = convert_markdown_to_html(full_response)
             
             total_time = time.time() - overall_start
-            db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                      ('completed', 'gpt4_progressive_excel', total_time, task_id))
+            mark_task_completed(db, task_id, 'gpt4_progressive_excel', total_time)
             db.commit()
             db.close()
             
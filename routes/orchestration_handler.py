@@ -1,10 +1,55 @@
 """
 Orchestration Handler - Main AI Task Processing (REFACTORED)
 Created: January 31, 2026
-Last Updated: February 28, 2026 - SIMPLIFIED SURVEY BUILDER FORM
+Last Updated: October 18, 2026 - TASK COMPLETION THROUGH mark_task_completed()
 
 CHANGELOG:
 
+- October 18, 2026: TASK COMPLETION THROUGH mark_task_completed()
+  Every branch marks its task completed with database.mark_task_completed(),
+    which also extends the task-request sequences used by the improvement
+    report's bundling suggestions.
+
+- October 18, 2026: FILE UPLOADS NO LONGER FAIL ON 'os'
+  The survey branch of orchestrate() had a local "import os", which made
+    os local to the whole function. Every request with attached files then
+    failed with "cannot access local variable 'os'" before the survey
+    branch ran. The load test's upload scenario failed on every request.
+    The local import (and an unused tempfile import) is removed; the
+    module-level os is used.
+
+- October 18, 2026: PER-REQUEST CONTEXT MEMOIZATION
+  PATH 3 creates one RequestContext (orchestration/request_context.py) and
+    passes it to task analysis, Opus escalation, specialists and the final
+    model call. The unified KB check, project KB searches, learning context,
+    capabilities block and the projects row are each looked up once per
+    request. Before this, the projects row was read up to four times and the
+    same KB query was searched up to five times.
+
+- October 18, 2026: CONVERSATION SUMMARY OFF THE REQUEST PATH
+  PATH 3 only reads the latest rolling summary before calling the model.
+    The should_summarize() check and the Sonnet summarization call now run
+    on the summarizer's background worker, queued after the assistant
+    message is saved.
+
+- October 18, 2026: PER-WORKER ENHANCEDINTELLIGENCE
+  PATH 3 now uses get_enhanced_intelligence() (one instance per worker with
+    write-behind profile persistence) instead of constructing
+    EnhancedIntelligence() and reloading the user profile on every request.
+
+- October 18, 2026: TOKEN-BUDGETED CONTEXT PACKING
+  PROBLEM: PATH 1 and PATH 3 concatenated every context block (knowledge,
+    learning, avoidance, specialized, summary, project, history, ingested KB)
+    with no global budget; only ad hoc caps such as [:500] per history
+    message limited size, and the same KB excerpt often appeared twice.
+  FIX: Blocks are now fitted by orchestration/context_packer.py. The packer
+    ranks blocks by priority and relevance to the request, removes KB
+    paragraphs already present in a higher-ranked block, trims or drops
+    what does not fit config.CONTEXT_TOKEN_BUDGETS and logs it. The
+    conversation messages passed to the API are limited to the newest turns
+    within config.CONTEXT_HISTORY_TOKENS. Attached files and the user
+    request are never trimmed.
+
 - February 28, 2026 (Session 2): SIMPLIFIED SURVEY BUILDER FORM
   PROBLEM: Handler 3.6 Pass 1 form asked 5 questions including survey type,
     shift length, and distribution method — forcing category selection that
@@ -98,7 +143,7 @@ from database import (
     save_generated_document, get_schedule_context,
     save_schedule_context, get_client_profile_context,
     add_avoidance_pattern, get_avoidance_context,
-    update_client_profile, load_analysis_session
+    update_client_profile, load_analysis_session, mark_task_completed
 )
 
 from routes.handlers import (
@@ -135,8 +180,18 @@ from code_assistant_agent import get_code_assistant
 from orchestration.proactive_agent import ProactiveAgent
 from schedule_request_handler_combined import get_combined_schedule_handler
 from conversation_learning import learn_from_conversation
-from orchestration.task_analysis import get_learning_context
-from enhanced_intelligence import EnhancedIntelligence
+from orchestration.request_context import RequestContext
+from orchestration.context_packer import (
+    ContextPacker,
+    format_history,
+    fit_messages,
+    PRIORITY_REQUIRED,
+    PRIORITY_HIGH,
+    PRIORITY_MEDIUM,
+    PRIORITY_LOW
+)
+from config import CONTEXT_HISTORY_TOKENS
+from enhanced_intelligence import get_enhanced_intelligence
 from specialized_knowledge import get_specialized_knowledge
 from proactive_suggestions import get_proactive_suggestions
 from conversation_summarizer import get_conversation_summarizer
@@ -322,8 +377,7 @@ def orchestrate():
             except Exception as doc_err:
                 print(f"Contract doc generation error (non-critical): {doc_err}")
             total_time = time.time() - overall_start
-            db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                      ('completed', 'contract_handler', total_time, task_id))
+            mark_task_completed(db, task_id, 'contract_handler', total_time)
             db.commit()
             db.close()
             add_message(conversation_id, 'assistant', actual_output, task_id,
@@ -407,8 +461,6 @@ def orchestrate():
 
             try:
                 from survey_builder import SurveyBuilder
-                import os
-                import tempfile
 
                 builder = SurveyBuilder()
                 survey_obj = builder.create_survey(
@@ -486,10 +538,7 @@ def orchestrate():
 
             formatted_output = convert_markdown_to_html(actual_output)
             total_time = time.time() - overall_start
-            db.execute(
-                'UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                ('completed', 'survey_builder', total_time, task_id)
-            )
+            mark_task_completed(db, task_id, 'survey_builder', total_time)
             db.commit()
             db.close()
             add_message(conversation_id, 'assistant', actual_output, task_id,
@@ -668,10 +717,7 @@ I'll post the complete analysis here when finished, including detailed insights.
                     total_time = time.time() - overall_start
 
                     db = get_db()
-                    db.execute(
-                        'UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                        ('completed', 'introspection_engine', total_time, task_id)
-                    )
+                    mark_task_completed(db, task_id, 'introspection_engine', total_time)
                     db.commit()
                     db.close()
 
@@ -795,8 +841,7 @@ Be comprehensive and professional."""
                     actual_output = gpt_response.get('content', '')
                     formatted_output = convert_markdown_to_html(actual_output)
                     total_time = time.time() - overall_start
-                    db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                              ('completed', 'gpt4_file_handler', total_time, task_id))
+                    mark_task_completed(db, task_id, 'gpt4_file_handler', total_time)
                     db.commit()
                     db.close()
                     add_message(conversation_id, 'assistant', actual_output, task_id,
@@ -908,8 +953,7 @@ Be comprehensive and professional."""
                         except Exception as doc_error:
                             print(f"Could not save code file: {doc_error}")
                     response_html = convert_markdown_to_html(code_result['message'])
-                    db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                              ('completed', 'code_assistant', time.time() - overall_start, task_id))
+                    mark_task_completed(db, task_id, 'code_assistant', time.time() - overall_start)
                     db.commit()
                     add_message(conversation_id, 'assistant', code_result['message'], task_id,
                                {'document_created': True, 'document_type': 'py', 'document_id': doc_id,
@@ -957,8 +1001,7 @@ Be comprehensive and professional."""
                     category='schedule'
                 )
                 response_html = convert_markdown_to_html(schedule_result['message'])
-                db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                          ('completed', 'pattern_schedule_generator', time.time() - overall_start, task_id))
+                mark_task_completed(db, task_id, 'pattern_schedule_generator', time.time() - overall_start)
                 db.commit()
                 add_message(conversation_id, 'assistant', schedule_result['message'], task_id,
                            {'document_created': True, 'document_type': 'xlsx', 'document_id': doc_id,
@@ -1004,8 +1047,10 @@ Be comprehensive and professional."""
         # ================================================================
         try:
             print(f"Analyzing task: {user_request[:100]}...")
+            req_ctx = RequestContext(user_request, knowledge_base=knowledge_base, project_id=project_id)
             analysis = analyze_task_with_sonnet(user_request, knowledge_base=knowledge_base,
-                                                file_paths=file_paths, file_contents=file_contents)
+                                                file_paths=file_paths, file_contents=file_contents,
+                                                request_context=req_ctx)
             task_type = analysis.get('task_type', 'general')
             confidence = analysis.get('confidence', 0.5)
             escalate = analysis.get('escalate_to_opus', False)
@@ -1024,7 +1069,8 @@ Be comprehensive and professional."""
                 orchestrator = 'opus'
                 try:
                     opus_result = handle_with_opus(user_request, analysis, knowledge_base=knowledge_base,
-                                                   file_paths=file_paths, file_contents=file_contents)
+                                                   file_paths=file_paths, file_contents=file_contents,
+                                                   request_context=req_ctx)
                     opus_guidance = opus_result.get('strategic_analysis', '')
                     if opus_result.get('specialist_assignments'):
                         for assignment in opus_result.get('specialist_assignments', []):
@@ -1049,7 +1095,8 @@ Be comprehensive and professional."""
                     if specialist and specialist.lower() != 'none':
                         print(f"Executing specialist: {specialist}")
                         result = execute_specialist_task(specialist, specialist_task,
-                                                         file_paths=file_paths, file_contents=file_contents)
+                                                         file_paths=file_paths, file_contents=file_contents,
+                                                         request_context=req_ctx)
                         specialist_results.append(result)
                         if result.get('success') and result.get('output'):
                             specialist_output = result.get('output')
@@ -1086,11 +1133,12 @@ END KNOWLEDGE BASE - Answer using the above as your primary source.
                     print(f"Knowledge context retrieval failed: {e}")
                     return ""
 
-            knowledge_context = get_knowledge_context_for_prompt(knowledge_base, user_request)
+            # Memoized KB: the search for this query already ran in task analysis
+            knowledge_context = get_knowledge_context_for_prompt(req_ctx.knowledge_base, user_request)
 
             learning_context = ""
             try:
-                learning_context = get_learning_context()
+                learning_context = req_ctx.learning_context()
                 if learning_context:
                     print(f"Retrieved learning context ({len(learning_context)} chars)")
             except Exception as learn_ctx_error:
@@ -1099,9 +1147,7 @@ END KNOWLEDGE BASE - Answer using the above as your primary source.
             client_profile_context = ""
             if project_id:
                 try:
-                    db_temp = get_db()
-                    project = db_temp.execute('SELECT client_name FROM projects WHERE project_id = ?', (project_id,)).fetchone()
-                    db_temp.close()
+                    project = req_ctx.project()
                     if project and project['client_name']:
                         client_profile_context = get_client_profile_context(project['client_name'])
                         if client_profile_context:
@@ -1121,12 +1167,9 @@ END KNOWLEDGE BASE - Answer using the above as your primary source.
             try:
                 specialist_kb = get_specialized_knowledge()
                 industry = None
-                if project_id:
-                    db_temp = get_db()
-                    proj = db_temp.execute('SELECT industry FROM projects WHERE project_id = ?', (project_id,)).fetchone()
-                    db_temp.close()
-                    if proj:
-                        industry = proj['industry']
+                proj = req_ctx.project()
+                if proj:
+                    industry = proj['industry']
                 specialized_context = specialist_kb.build_expertise_context(user_request, industry)
                 if specialized_context:
                     print(f"Injected specialized knowledge for {industry or 'general'}")
@@ -1135,11 +1178,9 @@ END KNOWLEDGE BASE - Answer using the above as your primary source.
 
             summary_context = ""
             try:
-                summarizer = get_conversation_summarizer()
-                if summarizer.should_summarize(conversation_id):
-                    from orchestration.ai_clients import call_claude_sonnet
-                    summarizer.summarize_conversation(conversation_id, call_claude_sonnet)
-                summary_context = summarizer.get_conversation_context(conversation_id)
+                # Folding new messages into the summary happens after the
+                # response (summarize_in_background below), not here
+                summary_context = get_conversation_summarizer().get_conversation_context(conversation_id)
                 if summary_context:
                     print(f"Retrieved conversation summary")
             except Exception as summary_error:
@@ -1147,8 +1188,7 @@ END KNOWLEDGE BASE - Answer using the above as your primary source.
 
             intelligence = None
             try:
-                intelligence = EnhancedIntelligence()
-                print("EnhancedIntelligence initialized")
+                intelligence = get_enhanced_intelligence()
             except Exception as intel_error:
                 print(f"EnhancedIntelligence init failed (non-critical): {intel_error}")
 
@@ -1156,9 +1196,7 @@ END KNOWLEDGE BASE - Answer using the above as your primary source.
             if project_id:
                 try:
                     from database_file_management import get_file_stats_by_project
-                    db_temp = get_db()
-                    project = db_temp.execute('SELECT * FROM projects WHERE project_id = ?', (project_id,)).fetchone()
-                    db_temp.close()
+                    project = req_ctx.project()
                     if project:
                         file_stats = get_file_stats_by_project(project_id)
                         project_context = f"""
@@ -1178,19 +1216,22 @@ This project folder contains: {file_stats.get('total_files', 0)} files
                 except Exception as proj_ctx_error:
                     print(f"Could not load project context: {proj_ctx_error}")
 
+            # Full history text; the context packer trims it (oldest first)
+            # to the model budget instead of a fixed per-message [:500] cap.
             conversation_history = ""
             if conversation_context and len(conversation_context) > 1:
-                conversation_history = "\n\n=== CONVERSATION HISTORY ===\n"
-                for msg in conversation_context[:-1]:
-                    role_label = "User" if msg['role'] == 'user' else "Assistant"
-                    content_preview = msg['content'][:500] + '...' if len(msg['content']) > 500 else msg['content']
-                    conversation_history += f"{role_label}: {content_preview}\n"
-                conversation_history += "=== END CONVERSATION HISTORY ===\n\n"
+                conversation_history = format_history(conversation_context[:-1])
+            packer_model = 'opus' if orchestrator == 'opus' else 'sonnet'
 
             if research_agent_ran and specialist_output:
                 # PATH 1: Synthesize research results with Sonnet
                 print(f"Synthesizing research agent results with Sonnet...")
-                synthesis_prompt = f"""{project_context}{conversation_history}
+                packer = ContextPacker('sonnet', query=user_request)
+                packer.add('project', project_context, priority=PRIORITY_HIGH)
+                packer.add('history', conversation_history, priority=PRIORITY_MEDIUM, trim_from='head')
+                packer.add('research', specialist_output, priority=PRIORITY_REQUIRED)
+                packed = packer.pack()
+                synthesis_prompt = f"""{packed['project']}{packed['history']}
 USER QUESTION: {user_request}
 
 CURRENT WEB RESEARCH RESULTS (retrieved this moment via Tavily):
@@ -1212,7 +1253,8 @@ INSTRUCTIONS:
 Provide a complete, synthesized answer now:"""
                 print(f"Sending synthesis prompt to Sonnet ({len(synthesis_prompt)} chars)...")
                 response = call_claude_sonnet(synthesis_prompt, conversation_history=None,
-                                              files_attached=False, system_prompt=None)
+                                              files_attached=False, system_prompt=None,
+                                              capabilities=req_ctx.capabilities)
                 if isinstance(response, dict):
                     if response.get('error'):
                         print(f"Synthesis failed, using raw research output")
@@ -1281,7 +1323,25 @@ preferences, implementation, or change management:
                 except Exception as ikb_err:
                     print(f"Ingested KB query failed (non-critical): {ikb_err}")
 
-                completion_prompt = f"""{project_context}{file_context}{conversation_history}{learning_context}{client_profile_context}{avoidance_context}{specialized_context}{summary_context}{ingested_kb_context}{file_section}
+                # Fit every context block into the model's token budget. KB
+                # excerpts repeated across the project KB, specialized
+                # knowledge and ingested KB are sent once.
+                packer = ContextPacker(packer_model, query=user_request)
+                packer.add('knowledge', knowledge_context, priority=PRIORITY_HIGH, dedupe=True)
+                packer.add('project', project_context, priority=PRIORITY_HIGH)
+                packer.add('file_context', file_context, priority=PRIORITY_HIGH)
+                packer.add('ingested_kb', ingested_kb_context, priority=PRIORITY_HIGH, dedupe=True)
+                packer.add('specialized', specialized_context, priority=PRIORITY_MEDIUM, dedupe=True)
+                packer.add('client_profile', client_profile_context, priority=PRIORITY_MEDIUM)
+                packer.add('summary', summary_context, priority=PRIORITY_MEDIUM)
+                packer.add('history', conversation_history, priority=PRIORITY_MEDIUM, trim_from='head')
+                packer.add('learning', learning_context, priority=PRIORITY_LOW)
+                packer.add('avoidance', avoidance_context, priority=PRIORITY_LOW)
+                packer.add('files', file_section, priority=PRIORITY_REQUIRED)
+                packed = packer.pack()
+                knowledge_context = packed['knowledge']
+
+                completion_prompt = f"""{packed['project']}{packed['file_context']}{packed['history']}{packed['learning']}{packed['client_profile']}{packed['avoidance']}{packed['specialized']}{packed['summary']}{packed['ingested_kb']}{packed['files']}
 USER REQUEST: {user_request}
 
 Please complete this request fully. Provide the actual deliverable.
@@ -1297,12 +1357,16 @@ Be comprehensive and professional."""
                 if knowledge_context or identity_block:
                     api_system_prompt = f"{knowledge_context}{identity_block}".strip()
 
+                api_history = fit_messages(conversation_context, CONTEXT_HISTORY_TOKENS)
+
                 if orchestrator == 'opus':
-                    response = call_claude_opus(completion_prompt, conversation_history=conversation_context,
-                                               files_attached=bool(file_contents), system_prompt=api_system_prompt)
+                    response = call_claude_opus(completion_prompt, conversation_history=api_history,
+                                               files_attached=bool(file_contents), system_prompt=api_system_prompt,
+                                               capabilities=req_ctx.capabilities)
                 else:
-                    response = call_claude_sonnet(completion_prompt, conversation_history=conversation_context,
-                                                  files_attached=bool(file_contents), system_prompt=api_system_prompt)
+                    response = call_claude_sonnet(completion_prompt, conversation_history=api_history,
+                                                  files_attached=bool(file_contents), system_prompt=api_system_prompt,
+                                                  capabilities=req_ctx.capabilities)
 
                 if isinstance(response, dict):
                     if response.get('error'):
@@ -1323,8 +1387,7 @@ Be comprehensive and professional."""
                     print(f"Consensus validation failed: {consensus_error}")
 
             total_time = time.time() - overall_start
-            db.execute('UPDATE tasks SET status = ?, assigned_orchestrator = ?, execution_time_seconds = ? WHERE id = ?',
-                      ('completed', orchestrator, total_time, task_id))
+            mark_task_completed(db, task_id, orchestrator, total_time)
             db.commit()
             db.close()
 
@@ -1332,6 +1395,12 @@ Be comprehensive and professional."""
                        {'orchestrator': orchestrator, 'knowledge_applied': knowledge_applied,
                         'execution_time': total_time})
 
+            try:
+                from orchestration.ai_clients import call_claude_sonnet
+                get_conversation_summarizer().summarize_in_background(conversation_id, call_claude_sonnet)
+            except Exception as summary_error:
+                print(f"Could not queue conversation summary: {summary_error}")
+
             suggestions = []
             if proactive:
                 try:
@@ -1348,9 +1417,7 @@ Be comprehensive and professional."""
 
             if project_id:
                 try:
-                    db_temp = get_db()
-                    project = db_temp.execute('SELECT client_name, industry FROM projects WHERE project_id = ?', (project_id,)).fetchone()
-                    db_temp.close()
+                    project = req_ctx.project()
                     if project and project['client_name']:
                         interaction_data = {'approach': orchestrator, 'approach_worked': True,
                                            'industry': project['industry'], 'preferences': {}}
@@ -1,9 +1,31 @@
 """
 Smart Excel Analyzer - Flexible analysis for ANY Excel file format
 Created: February 6, 2026
-Last Updated: February 7, 2026 - FIXED MULTI-PART QUERY HANDLING
+Last Updated: October 18, 2026 - TEXT COLUMNS STAY TEXT
 
 CHANGES IN THIS VERSION:
+- October 18, 2026: TEXT COLUMNS STAY TEXT
+  * The dataframe cache hands out text columns as text, not category, so
+    generated code can concatenate, assign new labels and count values as
+    it would on a plain read_excel frame. The observed=True instruction
+    for category columns is gone with them.
+
+- October 18, 2026: SHARED DTYPE STAGE
+  * The cache now compacts with dataframe_loader.optimize_dtypes(), the
+    stage shared with the labor and progressive loaders. Text dates
+    arrive as datetime64, so .dt works on them. Floats stay float64 (exact
+    totals), and the memory before/after is printed when a workbook is read.
+
+- October 18, 2026: WORKBOOKS LOAD THROUGH THE DATAFRAME CACHE
+  * load_and_profile() gets every sheet from dataframe_cache.load_workbook()
+    (one read_excel pass on a miss, instead of one per sheet). A workbook
+    seen before comes from memory or its columnar sidecar, so rebuilding
+    an analyzer no longer re-reads the .xlsx.
+  * Frames arrive with compact dtypes (category, int32, lossless float32).
+    The GPT instructions ask for observed=True when grouping by a category
+    column.
+  * self.cache_key is the file hash of the loaded workbook.
+
 - February 7, 2026: FIXED MULTI-PART QUERY BUG
   * Updated GPT-4 instructions to handle questions with multiple calculations
   * Now tells GPT-4 to combine results into single DataFrame using pd.DataFrame()
@@ -30,6 +52,8 @@ from datetime import datetime
 import json
 import re
 
+from dataframe_cache import get_dataframe_cache
+
 
 class SmartExcelAnalyzer:
     """
@@ -45,6 +69,7 @@ class SmartExcelAnalyzer:
             filepath: Path to Excel file
         """
         self.filepath = filepath
+        self.cache_key = None
         self.df = None
         self.profile = {}
         self.analysis_history = []
@@ -59,28 +84,22 @@ class SmartExcelAnalyzer:
             # Load entire file into memory
             print(f"📊 Loading Excel file: {self.filepath}")
             
-            # Check for multiple sheets
-            excel_file = pd.ExcelFile(self.filepath)
-            sheet_names = excel_file.sheet_names
+            # All sheets, from the dataframe cache when this file was seen before
+            workbook = get_dataframe_cache().load_workbook(self.filepath)
+            self.cache_key = workbook['key']
+            self.sheets = workbook['sheets']
+            sheet_names = list(self.sheets)
             num_sheets = len(sheet_names)
             
-            print(f"📋 Found {num_sheets} sheet(s): {', '.join(sheet_names)}")
+            print(f"📋 Found {num_sheets} sheet(s) ({workbook['source']}): {', '.join(sheet_names)}")
             
-            if num_sheets == 1:
-                # Single sheet - load it directly
-                self.df = pd.read_excel(self.filepath)
-                self.sheets = {sheet_names[0]: self.df}
-                self.active_sheet = sheet_names[0]
-            else:
-                # Multiple sheets - load all, use first as default
-                self.sheets = {}
+            if num_sheets > 1:
                 for sheet in sheet_names:
-                    self.sheets[sheet] = pd.read_excel(self.filepath, sheet_name=sheet)
                     print(f"  ✅ Loaded sheet '{sheet}': {len(self.sheets[sheet]):,} rows")
-                
-                # Use first sheet as default working dataframe
-                self.active_sheet = sheet_names[0]
-                self.df = self.sheets[self.active_sheet]
+            
+            # Use first sheet as default working dataframe
+            self.active_sheet = sheet_names[0]
+            self.df = self.sheets[self.active_sheet]
             
             # Clean column names
             self.df.columns = self.df.columns.str.strip()
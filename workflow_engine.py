@@ -1,7 +1,43 @@
 """
 Workflow Engine Module
 Created: January 22, 2026
-Last Updated: January 22, 2026 - SPRINT 3: Smart Automation
+Last Updated: October 18, 2026 - STEP CLOCK STARTS WHEN THE STEP RUNS
+
+CHANGELOG:
+
+- October 18, 2026: STEP CLOCK STARTS WHEN THE STEP RUNS
+  PROBLEM: A step's deadline was set when it was submitted to the thread
+    pool. A step still queued behind busy workers could time out before it
+    ever ran. A timed-out step's thread also kept its pool slot, so the
+    steps after it queued behind it. resume_execution() also did not know
+    the original params, so {{placeholders}} went through unsubstituted
+    unless the caller sent them again.
+  FIX: Each started step gets its own worker thread. The thread records
+    its start time, and the deadline counts from there. The scheduler still
+    runs at most WORKFLOW_MAX_PARALLEL steps. A timed-out step's thread is
+    abandoned and no longer counts, so it cannot hold back later steps.
+  - The params are saved in workflow_executions.params (column added by
+    add_workflow_tables). resume_execution() uses them, with any params
+    passed to it on top.
+
+- October 18, 2026: DAG PARALLEL STEP EXECUTION
+  PROBLEM: execute_workflow() ran steps strictly in sequence, so a workflow
+    with four independent ai.generate steps took the sum of four blocking
+    Sonnet calls (and usually hit the gunicorn timeout).
+  FIX: Steps may declare depends_on: [step ids]. A step without depends_on
+    depends on the step before it, so custom workflows keep their old
+    sequential behaviour; the pre-built workflows declare their real
+    dependencies. Ready steps run in a thread pool (WORKFLOW_MAX_PARALLEL),
+    each with a timeout (STEP_TIMEOUT_SECONDS, or step['timeout']) and
+    retries (step['retries'], AI steps default to AI_STEP_RETRIES).
+    Dependents receive upstream results as prompt context. A failed step
+    skips only its dependents; independent branches still finish.
+  - ai.* step results are memoized in-process (STEP_CACHE_SIZE entries,
+    STEP_CACHE_TTL_SECONDS) keyed by action, params and upstream results.
+  - resume_execution() / POST /api/workflow/resume re-runs a failed
+    execution, reusing results of steps already recorded as completed in
+    workflow_execution_steps.
+  - workflow_executions.status / completed_at are now set when a run ends.
 
 This module provides workflow automation:
 - Pre-built workflows (new client, schedule design, implementation)
@@ -16,6 +52,10 @@ Author: Jim @ Shiftwork Solutions LLC (managed by Claude)
 from flask import Blueprint, jsonify, request
 from database import get_db
 import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 from datetime import datetime
 from project_manager import ProjectManager
 from orchestration import analyze_task_with_sonnet
@@ -26,6 +66,20 @@ workflow_bp = Blueprint('workflow', __name__, url_prefix='/api/workflow')
 # Initialize managers
 pm = ProjectManager()
 
+# DAG execution settings
+WORKFLOW_MAX_PARALLEL = 3          # concurrent steps (LLM calls) per workflow run
+STEP_TIMEOUT_SECONDS = 150         # stay under the gunicorn request timeout
+AI_STEP_RETRIES = 1                # extra attempts for ai.* steps
+RETRY_BACKOFF_SECONDS = 2
+STEP_START_POLL_SECONDS = 0.5      # wait granularity until a submitted step has started
+UPSTREAM_CONTEXT_CHARS = 2000      # per upstream result passed into a prompt
+
+# Memoized ai.* step results
+STEP_CACHE_SIZE = 64
+STEP_CACHE_TTL_SECONDS = 3600
+_step_cache = OrderedDict()
+_step_cache_lock = threading.Lock()
+
 
 class WorkflowEngine:
     """Executes multi-step automated workflows"""
@@ -44,31 +98,36 @@ class WorkflowEngine:
                         'id': 'create_project',
                         'name': 'Create Project Structure',
                         'action': 'project.create',
-                        'params': {'client_name': '{{client_name}}', 'industry': '{{industry}}'}
+                        'params': {'client_name': '{{client_name}}', 'industry': '{{industry}}'},
+                        'depends_on': []
                     },
                     {
                         'id': 'request_data',
                         'name': 'Generate Data Collection Checklist',
                         'action': 'ai.generate',
-                        'params': {'template': 'data_collection', 'client': '{{client_name}}'}
+                        'params': {'template': 'data_collection', 'client': '{{client_name}}'},
+                        'depends_on': []
                     },
                     {
                         'id': 'create_survey',
                         'name': 'Prepare Employee Survey',
                         'action': 'ai.generate',
-                        'params': {'template': 'survey', 'facility_size': '{{employee_count}}'}
+                        'params': {'template': 'survey', 'facility_size': '{{employee_count}}'},
+                        'depends_on': []
                     },
                     {
                         'id': 'draft_contract',
                         'name': 'Draft Service Contract',
                         'action': 'ai.generate',
-                        'params': {'template': 'contract', 'client': '{{client_name}}'}
+                        'params': {'template': 'contract', 'client': '{{client_name}}'},
+                        'depends_on': []
                     },
                     {
                         'id': 'schedule_kickoff',
                         'name': 'Create Kickoff Meeting Agenda',
                         'action': 'ai.generate',
-                        'params': {'template': 'kickoff_agenda'}
+                        'params': {'template': 'kickoff_agenda'},
+                        'depends_on': []
                     }
                 ],
                 'estimated_time_minutes': 15
@@ -82,25 +141,29 @@ class WorkflowEngine:
                         'id': 'analyze_data',
                         'name': 'Analyze Current Schedules',
                         'action': 'ai.analyze',
-                        'params': {'type': 'schedule_analysis'}
+                        'params': {'type': 'schedule_analysis'},
+                        'depends_on': []
                     },
                     {
                         'id': 'create_options',
                         'name': 'Generate 3 Schedule Options',
                         'action': 'ai.generate',
-                        'params': {'template': 'schedules', 'count': 3}
+                        'params': {'template': 'schedules', 'count': 3},
+                        'depends_on': ['analyze_data']
                     },
                     {
                         'id': 'cost_comparison',
                         'name': 'Calculate Cost Comparisons',
                         'action': 'ai.calculate',
-                        'params': {'type': 'cost_analysis'}
+                        'params': {'type': 'cost_analysis'},
+                        'depends_on': ['create_options']
                     },
                     {
                         'id': 'create_presentation',
                         'name': 'Build Executive Presentation',
                         'action': 'ai.generate',
-                        'params': {'template': 'executive_summary'}
+                        'params': {'template': 'executive_summary'},
+                        'depends_on': ['create_options', 'cost_comparison']
                     }
                 ],
                 'estimated_time_minutes': 20
@@ -114,25 +177,29 @@ class WorkflowEngine:
                         'id': 'create_timeline',
                         'name': 'Build Implementation Timeline',
                         'action': 'ai.generate',
-                        'params': {'template': 'timeline', 'weeks': '{{timeline_weeks}}'}
+                        'params': {'template': 'timeline', 'weeks': '{{timeline_weeks}}'},
+                        'depends_on': []
                     },
                     {
                         'id': 'communications',
                         'name': 'Draft Employee Communications',
                         'action': 'ai.generate',
-                        'params': {'template': 'communications'}
+                        'params': {'template': 'communications'},
+                        'depends_on': ['create_timeline']
                     },
                     {
                         'id': 'training_materials',
                         'name': 'Create Training Materials',
                         'action': 'ai.generate',
-                        'params': {'template': 'training'}
+                        'params': {'template': 'training'},
+                        'depends_on': ['create_timeline']
                     },
                     {
                         'id': 'faq',
                         'name': 'Build FAQ Document',
                         'action': 'ai.generate',
-                        'params': {'template': 'faq'}
+                        'params': {'template': 'faq'},
+                        'depends_on': ['communications']
                     }
                 ],
                 'estimated_time_minutes': 25
@@ -146,25 +213,29 @@ class WorkflowEngine:
                         'id': 'gather_metrics',
                         'name': 'Collect Project Metrics',
                         'action': 'data.collect',
-                        'params': {'project_id': '{{project_id}}'}
+                        'params': {'project_id': '{{project_id}}'},
+                        'depends_on': []
                     },
                     {
                         'id': 'analyze_progress',
                         'name': 'Analyze Progress',
                         'action': 'ai.analyze',
-                        'params': {'type': 'progress_analysis'}
+                        'params': {'type': 'progress_analysis'},
+                        'depends_on': ['gather_metrics']
                     },
                     {
                         'id': 'generate_report',
                         'name': 'Generate Report',
                         'action': 'ai.generate',
-                        'params': {'template': 'weekly_report'}
+                        'params': {'template': 'weekly_report'},
+                        'depends_on': ['analyze_progress']
                     },
                     {
                         'id': 'prepare_email',
                         'name': 'Draft Email',
                         'action': 'ai.generate',
-                        'params': {'template': 'client_email'}
+                        'params': {'template': 'client_email'},
+                        'depends_on': ['generate_report']
                     }
                 ],
                 'estimated_time_minutes': 10
@@ -175,6 +246,9 @@ class WorkflowEngine:
         """
         Execute a workflow
         
+        Steps run as a DAG: each step starts as soon as the steps it
+        depends on have completed, up to WORKFLOW_MAX_PARALLEL at a time.
+        
         Args:
             workflow_id: ID of workflow to execute
             params: Dictionary of parameters for workflow
@@ -186,49 +260,247 @@ class WorkflowEngine:
             return {'error': 'Workflow not found'}
         
         workflow = self.workflows[workflow_id]
-        params = params or {}
+        
+        try:
+            dependencies = self._resolve_dependencies(workflow['steps'])
+        except ValueError as e:
+            return {'error': str(e)}
         
         # Create execution record
-        execution_id = self._create_execution_record(workflow_id, workflow['name'])
+        execution_id = self._create_execution_record(workflow_id, workflow['name'], params or {})
         
-        results = []
+        return self._run_dag(execution_id, workflow, dependencies, params or {}, {})
+    
+    def resume_execution(self, execution_id, params=None):
+        """
+        Resume a failed execution.
         
-        for step in workflow['steps']:
-            # Replace parameters in step
-            step_params = self._replace_params(step['params'], params)
-            
-            # Execute step
+        Steps already recorded as completed keep their stored results; only
+        failed, skipped and never-run steps execute again.
+        
+        Args:
+            execution_id: ID from workflow_executions
+            params: Parameters to change; the rest come from the original run
+        """
+        db = get_db()
+        execution = db.execute(
+            'SELECT workflow_id, params FROM workflow_executions WHERE id = ?', (execution_id,)
+        ).fetchone()
+        rows = db.execute('''
+            SELECT step_id, result FROM workflow_execution_steps
+            WHERE execution_id = ? AND status = 'completed'
+            ORDER BY id
+        ''', (execution_id,)).fetchall()
+        db.close()
+        
+        if not execution:
+            return {'error': 'Execution not found'}
+        if execution['workflow_id'] not in self.workflows:
+            return {'error': 'Workflow not found'}
+        
+        workflow = self.workflows[execution['workflow_id']]
+        try:
+            dependencies = self._resolve_dependencies(workflow['steps'])
+        except ValueError as e:
+            return {'error': str(e)}
+        
+        try:
+            run_params = json.loads(execution['params'] or '{}')
+        except (TypeError, ValueError):
+            run_params = {}
+        run_params.update(params or {})
+        
+        completed = {}
+        for row in rows:
             try:
-                step_result = self._execute_step(step, step_params)
-                results.append({
-                    'step_id': step['id'],
-                    'name': step['name'],
-                    'status': 'completed',
-                    'result': step_result
-                })
-                
-                # Update execution record
-                self._update_execution_step(execution_id, step['id'], 'completed', step_result)
-                
-            except Exception as e:
-                results.append({
-                    'step_id': step['id'],
-                    'name': step['name'],
-                    'status': 'failed',
-                    'error': str(e)
-                })
-                
-                self._update_execution_step(execution_id, step['id'], 'failed', str(e))
-                break  # Stop on first failure
+                completed[row['step_id']] = json.loads(row['result'])
+            except (TypeError, ValueError):
+                completed[row['step_id']] = row['result']
+        
+        self._set_execution_status(execution_id, 'running')
+        return self._run_dag(execution_id, workflow, dependencies, run_params, completed)
+    
+    def _resolve_dependencies(self, steps):
+        """
+        Map step id -> list of step ids it depends on.
+        
+        A step without 'depends_on' depends on the step before it.
+        Raises ValueError for unknown dependencies or cycles.
+        """
+        dependencies = {}
+        previous = None
+        for step in steps:
+            if 'depends_on' in step:
+                dependencies[step['id']] = list(step['depends_on'])
+            else:
+                dependencies[step['id']] = [previous] if previous else []
+            previous = step['id']
+        
+        for step_id, deps in dependencies.items():
+            for dep in deps:
+                if dep not in dependencies:
+                    raise ValueError(f"Step '{step_id}' depends on unknown step '{dep}'")
+        
+        # Kahn's algorithm - every step must be reachable without a cycle
+        remaining = {step_id: set(deps) for step_id, deps in dependencies.items()}
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        visited = 0
+        while ready:
+            done = ready.pop()
+            visited += 1
+            for step_id, deps in remaining.items():
+                if done in deps:
+                    deps.discard(done)
+                    if not deps:
+                        ready.append(step_id)
+        if visited != len(dependencies):
+            raise ValueError('Workflow step dependencies contain a cycle')
+        
+        return dependencies
+    
+    def _run_dag(self, execution_id, workflow, dependencies, params, completed):
+        """Run every step not in `completed`, respecting dependencies"""
+        steps = {step['id']: step for step in workflow['steps']}
+        outcomes = {step_id: {'status': 'completed', 'result': result, 'reused': True}
+                    for step_id, result in completed.items() if step_id in steps}
+        pending = [step['id'] for step in workflow['steps'] if step['id'] not in outcomes]
+        running = {}    # future -> step id
+        started = {}    # step id -> time the worker thread began the step
+        
+        while pending or running:
+            # Skip steps whose dependencies failed; start steps that are ready
+            for step_id in list(pending):
+                deps = dependencies[step_id]
+                if any(outcomes.get(dep, {}).get('status') in ('failed', 'skipped') for dep in deps):
+                    pending.remove(step_id)
+                    outcomes[step_id] = {'status': 'skipped', 'error': 'Dependency failed'}
+                    continue
+                if len(running) >= WORKFLOW_MAX_PARALLEL:
+                    continue
+                if all(outcomes.get(dep, {}).get('status') == 'completed' for dep in deps):
+                    pending.remove(step_id)
+                    step = steps[step_id]
+                    step_params = self._replace_params(step['params'], params)
+                    upstream = {dep: outcomes[dep]['result'] for dep in deps}
+                    future = self._start_step(execution_id, step, step_params, upstream, started)
+                    running[future] = step_id
+            
+            if not running:
+                continue
+            
+            # Deadlines count from when a step started running, not when it was queued
+            deadlines = [started[step_id] + steps[step_id].get('timeout', STEP_TIMEOUT_SECONDS)
+                         for step_id in running.values() if step_id in started]
+            timeout = max(0, min(deadlines) - time.time()) if deadlines else None
+            if len(deadlines) < len(running):
+                timeout = STEP_START_POLL_SECONDS if timeout is None else min(timeout, STEP_START_POLL_SECONDS)
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            for future in list(running):
+                step_id = running[future]
+                limit = steps[step_id].get('timeout', STEP_TIMEOUT_SECONDS)
+                if future in done:
+                    del running[future]
+                    try:
+                        outcomes[step_id] = {'status': 'completed', 'result': future.result()}
+                        self._update_execution_step(execution_id, step_id, 'completed', outcomes[step_id]['result'])
+                    except Exception as e:
+                        outcomes[step_id] = {'status': 'failed', 'error': str(e)}
+                        self._update_execution_step(execution_id, step_id, 'failed', str(e))
+                elif step_id in started and time.time() >= started[step_id] + limit:
+                    # The worker thread cannot be killed; it is abandoned (its
+                    # result is discarded) and no longer counts against the limit
+                    del running[future]
+                    error = f"Step timed out after {limit}s"
+                    outcomes[step_id] = {'status': 'failed', 'error': error}
+                    self._update_execution_step(execution_id, step_id, 'failed', error)
+        
+        results = []
+        for step in workflow['steps']:
+            outcome = outcomes[step['id']]
+            entry = {
+                'step_id': step['id'],
+                'name': step['name'],
+                'status': outcome['status']
+            }
+            if outcome['status'] == 'completed':
+                entry['result'] = outcome['result']
+                if outcome.get('reused'):
+                    entry['resumed'] = True
+            else:
+                entry['error'] = outcome['error']
+            results.append(entry)
+        
+        status = 'completed' if all(r['status'] == 'completed' for r in results) else 'failed'
+        self._set_execution_status(execution_id, status)
         
         return {
             'execution_id': execution_id,
             'workflow': workflow['name'],
             'steps': results,
-            'status': 'completed' if all(r['status'] == 'completed' for r in results) else 'failed'
+            'status': status
         }
     
-    def _execute_step(self, step, params):
+    def _start_step(self, execution_id, step, params, upstream, started):
+        """Run a step on its own worker thread; the thread records its start in `started`"""
+        future = Future()
+        
+        def work():
+            started[step['id']] = time.time()
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._execute_step_with_retries(step, params, upstream))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=work, name=f"workflow-{execution_id}-{step['id']}", daemon=True).start()
+        return future
+    
+    def _execute_step_with_retries(self, step, params, upstream):
+        """Run one step (in a worker thread), retrying and memoizing ai.* steps"""
+        is_ai = step['action'].startswith('ai.')
+        cache_key = None
+        if is_ai:
+            cache_key = json.dumps([step['action'], params, upstream], sort_keys=True, default=str)
+            with _step_cache_lock:
+                cached = _step_cache.get(cache_key)
+                if cached and time.time() - cached[0] < STEP_CACHE_TTL_SECONDS:
+                    _step_cache.move_to_end(cache_key)
+                    return cached[1]
+        
+        attempts = 1 + step.get('retries', AI_STEP_RETRIES if is_ai else 0)
+        for attempt in range(attempts):
+            try:
+                result = self._execute_step(step, params, upstream)
+                break
+            except Exception as e:
+                if attempt + 1 >= attempts:
+                    raise
+                print(f"Workflow step {step['id']} failed (attempt {attempt + 1}/{attempts}): {e}")
+                time.sleep(RETRY_BACKOFF_SECONDS * (attempt + 1))
+        
+        if cache_key is not None and result:
+            with _step_cache_lock:
+                _step_cache[cache_key] = (time.time(), result)
+                _step_cache.move_to_end(cache_key)
+                while len(_step_cache) > STEP_CACHE_SIZE:
+                    _step_cache.popitem(last=False)
+        return result
+    
+    def _upstream_context(self, upstream):
+        """Format results of the steps this step depends on for a prompt"""
+        if not upstream:
+            return ""
+        parts = []
+        for step_id, result in upstream.items():
+            text = result if isinstance(result, str) else json.dumps(result, default=str)
+            if len(text) > UPSTREAM_CONTEXT_CHARS:
+                text = text[:UPSTREAM_CONTEXT_CHARS] + '...'
+            parts.append(f"[{step_id}]\n{text}")
+        return "\n\nResults from previous workflow steps:\n" + "\n\n".join(parts)
+    
+    def _execute_step(self, step, params, upstream=None):
         """Execute a single workflow step"""
         action_type, action_name = step['action'].split('.')
         
@@ -240,22 +512,24 @@ class WorkflowEngine:
                 )
         
         elif action_type == 'ai':
+            context = self._upstream_context(upstream)
+            
             if action_name == 'generate':
                 # Use AI to generate content
                 template = params.get('template')
-                prompt = self._build_prompt_from_template(template, params)
+                prompt = self._build_prompt_from_template(template, params) + context
                 result = analyze_task_with_sonnet(prompt, None)
                 return result.get('analysis', '')
             
             elif action_name == 'analyze':
                 analysis_type = params.get('type')
-                prompt = f"Perform {analysis_type} with the following context: {json.dumps(params)}"
+                prompt = f"Perform {analysis_type} with the following context: {json.dumps(params)}" + context
                 result = analyze_task_with_sonnet(prompt, None)
                 return result.get('analysis', '')
             
             elif action_name == 'calculate':
                 calc_type = params.get('type')
-                prompt = f"Calculate {calc_type} based on: {json.dumps(params)}"
+                prompt = f"Calculate {calc_type} based on: {json.dumps(params)}" + context
                 result = analyze_task_with_sonnet(prompt, None)
                 return result.get('analysis', '')
         
@@ -298,15 +572,15 @@ class WorkflowEngine:
                 result[key] = value
         return result
     
-    def _create_execution_record(self, workflow_id, workflow_name):
-        """Create database record for workflow execution"""
+    def _create_execution_record(self, workflow_id, workflow_name, params):
+        """Create database record for workflow execution (params kept for resume)"""
         db = get_db()
         
         cursor = db.execute('''
             INSERT INTO workflow_executions 
-            (workflow_id, workflow_name, status, started_at)
-            VALUES (?, ?, ?, ?)
-        ''', (workflow_id, workflow_name, 'running', datetime.now()))
+            (workflow_id, workflow_name, status, started_at, params)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (workflow_id, workflow_name, 'running', datetime.now(), json.dumps(params, default=str)))
         
         execution_id = cursor.lastrowid
         db.commit()
@@ -326,6 +600,19 @@ class WorkflowEngine:
         
         db.commit()
         db.close()
+    
+    def _set_execution_status(self, execution_id, status):
+        """Set overall execution status (completed_at once it has finished)"""
+        db = get_db()
+        
+        db.execute('''
+            UPDATE workflow_executions
+            SET status = ?, completed_at = ?
+            WHERE id = ?
+        ''', (status, None if status == 'running' else datetime.now(), execution_id))
+        
+        db.commit()
+        db.close()
 
 
 # Initialize engine
@@ -368,6 +655,27 @@ def execute_workflow():
     return jsonify(result)
 
 
+@workflow_bp.route('/resume', methods=['POST'])
+def resume_workflow():
+    """
+    Resume a failed workflow execution
+    
+    Body:
+        execution_id: ID of the execution to resume
+        params: Optional parameter changes (the original run's params are stored)
+    """
+    data = request.json or {}
+    execution_id = data.get('execution_id')
+    
+    if not execution_id:
+        return jsonify({'error': 'Missing execution_id'}), 400
+    
+    result = engine.resume_execution(execution_id, data.get('params', {}))
+    if result.get('error'):
+        return jsonify(result), 404
+    return jsonify(result)
+
+
 @workflow_bp.route('/executions', methods=['GET'])
 def get_executions():
     """Get workflow execution history"""